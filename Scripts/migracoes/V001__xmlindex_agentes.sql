@@ -0,0 +1,22 @@
+-- Índice XMLIndex estruturado sobre XML_AGENTES.
+-- As colunas do XMLTABLE abaixo devem ser idênticas às usadas em
+-- utils/consultas.py (XMLTABLE_AGENTES) para que o Oracle reescreva as
+-- consultas contra a tabela de conteúdo indexada.
+CREATE INDEX XIDX_XML_AGENTES ON XML_AGENTES (XML_CONTEUDO)
+  INDEXTYPE IS XDB.XMLINDEX
+  PARAMETERS ('XMLTABLE XML_AGENTES_CAMPOS ''/Agente''
+                 COLUMNS NOME        VARCHAR2(4000) PATH ''Nome'',
+                         TIPO_PESSOA VARCHAR2(100)  PATH ''TipoPessoa'',
+                         CPF         VARCHAR2(100)  PATH ''CPF'',
+                         CNPJ        VARCHAR2(100)  PATH ''CNPJ'',
+                         EMAIL       VARCHAR2(4000) PATH ''Email''')
+/
+
+CREATE INDEX IX_XML_AGENTES_NOME ON XML_AGENTES_CAMPOS (UPPER(NOME))
+/
+
+CREATE INDEX IX_XML_AGENTES_CPF ON XML_AGENTES_CAMPOS (CPF)
+/
+
+CREATE INDEX IX_XML_AGENTES_CNPJ ON XML_AGENTES_CAMPOS (CNPJ)
+/
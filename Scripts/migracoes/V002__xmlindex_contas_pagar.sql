@@ -0,0 +1,23 @@
+-- Índice XMLIndex estruturado sobre XML_CONTAS_PAGAR.
+-- As colunas do XMLTABLE abaixo devem ser idênticas às usadas em
+-- utils/consultas.py (XMLTABLE_CONTAS_PAGAR).
+-- Os valores ficam como texto: um AgenteID ou data malformados não podem
+-- impedir a gravação do documento.
+CREATE INDEX XIDX_XML_CONTAS_PAGAR ON XML_CONTAS_PAGAR (XML_CONTEUDO)
+  INDEXTYPE IS XDB.XMLINDEX
+  PARAMETERS ('XMLTABLE XML_CONTAS_PAGAR_CAMPOS ''/ContaPagar''
+                 COLUMNS AGENTE_ID       VARCHAR2(100) PATH ''AgenteID'',
+                         CNPJ_CPF        VARCHAR2(100) PATH ''CNPJ_CPF'',
+                         DATA_VENCIMENTO VARCHAR2(100) PATH ''DataVencimento''')
+/
+
+CREATE INDEX IX_XML_CONTAS_PAGAR_AGENTE ON XML_CONTAS_PAGAR_CAMPOS (AGENTE_ID)
+/
+
+CREATE INDEX IX_XML_CONTAS_PAGAR_DOC ON XML_CONTAS_PAGAR_CAMPOS (CNPJ_CPF)
+/
+
+CREATE INDEX IX_XML_CONTAS_PAGAR_VENC ON XML_CONTAS_PAGAR_CAMPOS (
+  TO_DATE(DATA_VENCIMENTO DEFAULT NULL ON CONVERSION ERROR, 'DD/MM/YYYY')
+)
+/
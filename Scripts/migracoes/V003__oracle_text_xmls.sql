@@ -0,0 +1,31 @@
+-- Índices Oracle Text (CONTEXT) para a busca por conteúdo (utils/db_utils.py,
+-- buscar_xmls). Só o texto dos elementos é indexado (AUTO_SECTION_GROUP),
+-- sem diferenciar acentos nem maiúsculas. O índice é sincronizado a cada
+-- COMMIT, então documentos recém-gravados já aparecem na busca.
+-- Requer o privilégio CTXAPP (GRANT CTXAPP TO <usuario>).
+BEGIN
+  CTX_DDL.CREATE_PREFERENCE('GERADOR_XML_LEXER', 'BASIC_LEXER');
+  CTX_DDL.SET_ATTRIBUTE('GERADOR_XML_LEXER', 'BASE_LETTER', 'YES');
+  CTX_DDL.SET_ATTRIBUTE('GERADOR_XML_LEXER', 'MIXED_CASE', 'NO');
+EXCEPTION
+  -- DRG-10701: preferência já existe
+  WHEN OTHERS THEN
+    IF SQLERRM NOT LIKE '%DRG-10701%' THEN
+      RAISE;
+    END IF;
+END;
+/
+
+CREATE INDEX XTXT_XML_AGENTES ON XML_AGENTES (XML_CONTEUDO)
+  INDEXTYPE IS CTXSYS.CONTEXT
+  PARAMETERS ('LEXER GERADOR_XML_LEXER
+               SECTION GROUP CTXSYS.AUTO_SECTION_GROUP
+               SYNC (ON COMMIT)')
+/
+
+CREATE INDEX XTXT_XML_CONTAS_PAGAR ON XML_CONTAS_PAGAR (XML_CONTEUDO)
+  INDEXTYPE IS CTXSYS.CONTEXT
+  PARAMETERS ('LEXER GERADOR_XML_LEXER
+               SECTION GROUP CTXSYS.AUTO_SECTION_GROUP
+               SYNC (ON COMMIT)')
+/
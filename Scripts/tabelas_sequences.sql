@@ -13,3 +13,7 @@ CREATE TABLE XML_CONTAS_PAGAR (
 );
 
 CREATE SEQUENCE SEQ_XML_CONTAS_PAGAR START WITH 1 INCREMENT BY 1;
+
+
+-- Índices e demais alterações de estrutura: Scripts/migracoes
+-- (aplicar com: python -m utils.migracoes <tns> <usuario>)
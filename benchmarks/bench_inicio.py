@@ -0,0 +1,57 @@
+"""
+benchmarks/bench_inicio.py
+Mede o tempo de abertura da aplicação (partida a frio), rodando-a várias
+vezes com --medir-inicio. Serve tanto para o main.py quanto para o executável
+gerado pelo PyInstaller, cujo tempo inclui a extração do pacote.
+
+Para cada execução registra o tempo total visto de fora (do lançamento do
+processo até ele terminar) e as marcas gravadas pelo próprio main.py:
+imports, janela_criada, janela_exibida e tela_inicial.
+
+Uso: python -m benchmarks.bench_inicio [repeticoes] [executavel]
+     (sem executavel: python main.py)
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MARCAS = ("imports", "janela_criada", "janela_exibida", "tela_inicial")
+
+
+def medir(comando, repeticoes):
+    """Roda o comando `repeticoes` vezes; retorna a lista de registros (com "externo")"""
+    registros = []
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivo = os.path.join(pasta, "inicio.jsonl")
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            subprocess.run(comando + [f"--medir-inicio={arquivo}"], cwd=RAIZ, check=True)
+            externo = time.perf_counter() - inicio
+            with open(arquivo, "r", encoding="utf-8") as f:
+                registro = json.loads(f.readlines()[-1])
+            registro["externo"] = round(externo, 4)
+            registros.append(registro)
+    return registros
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    comando = [sys.argv[2]] if len(sys.argv) > 2 else [sys.executable, "main.py"]
+
+    registros = medir(comando, repeticoes)
+    print(f"{' '.join(comando)}  ({repeticoes} execuções, mediana em segundos)")
+    for marca in MARCAS + ("externo",):
+        valores = [r[marca] for r in registros]
+        print(f"  {marca:<15} {statistics.median(valores):8.3f}   (mín {min(valores):.3f}, máx {max(valores):.3f})")
+    if any(r["oracledb_na_abertura"] for r in registros):
+        print("  ATENÇÃO: oracledb foi importado antes de a janela aparecer")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+benchmarks/bench_xml_pretty.py
+Compara o gerar_xml_pretty atual com o antigo round trip ElementTree + minidom
+e com o caminho genérico (sem serializador pré-compilado).
+Confere que a saída é idêntica byte a byte antes de medir; cada tempo é o
+melhor de REPETICOES_TIMEIT medições.
+
+Uso: python -m benchmarks.bench_xml_pretty [repeticoes]
+"""
+
+import sys
+import timeit
+from xml.etree.ElementTree import Element, SubElement, tostring
+from xml.dom.minidom import parseString
+
+from utils.xml_utils import gerar_xml_pretty, _partes_xml
+
+
+def gerar_xml_pretty_minidom(root_tag, dados_dict):
+    """Implementação anterior, mantida aqui apenas como referência"""
+    root = Element(root_tag)
+    for chave, valor in dados_dict.items():
+        SubElement(root, chave).text = valor or ""
+    xml_bytes = tostring(root, 'utf-8')
+    return parseString(xml_bytes).toprettyxml(indent="  ")
+
+
+AGENTE = {
+    "Nome": "Comércio & Serviços <Irmãos> \"Silva\" Ltda",
+    "TipoPessoa": "Pessoa Jurídica",
+    "TipoAgente": "Fornecedor",
+    "Endereco": "Rua das Acácias, 123 - Centro",
+    "Telefone": "(11) 98765-4321",
+    "Email": "contato@silva.com.br",
+    "CNPJ": "12.345.678/0001-95",
+}
+
+CONTA_PAGAR = {
+    "AgenteID": "42",
+    "AgenteNome": "Comércio & Serviços <Irmãos> \"Silva\" Ltda",
+    "CNPJ_CPF": "12.345.678/0001-95",
+    "EmailAgente": "contato@silva.com.br",
+    "Descricao": "Compra de materiais\r\nNF 1234",
+    "Valor": "1520.75",
+    "DataEmissao": "01/10/2025",
+    "DataVencimento": "",
+}
+
+
+# Mesmos documentos sem caracteres especiais nem campos vazios
+AGENTE_SIMPLES = dict(AGENTE, Nome="Comercio e Servicos Irmaos Silva Ltda")
+CONTA_PAGAR_SIMPLES = dict(CONTA_PAGAR, AgenteNome=AGENTE_SIMPLES["Nome"],
+                           Descricao="Compra de materiais NF 1234", DataVencimento="31/10/2025")
+# Sem caracteres especiais e sem o Endereco (opcional): caso mais comum de agente
+AGENTE_SEM_ENDERECO = dict(AGENTE_SIMPLES, Endereco="")
+
+REPETICOES_TIMEIT = 5
+
+
+def _medir(funcao, repeticoes):
+    """Melhor tempo por documento, em microssegundos"""
+    return min(timeit.repeat(funcao, number=repeticoes, repeat=REPETICOES_TIMEIT)) / repeticoes * 1e6
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    casos = (("especiais", "Agente", AGENTE), ("simples", "Agente", AGENTE_SIMPLES),
+             ("sem Endereco", "Agente", AGENTE_SEM_ENDERECO),
+             ("especiais", "ContaPagar", CONTA_PAGAR), ("simples", "ContaPagar", CONTA_PAGAR_SIMPLES))
+    for caso, root_tag, dados in casos:
+        esperado = gerar_xml_pretty_minidom(root_tag, dados)
+        for obtido in (gerar_xml_pretty(root_tag, dados), "".join(_partes_xml(root_tag, dados))):
+            if obtido != esperado:
+                raise SystemExit(f"Saída divergente para {root_tag}:\n{esperado!r}\n{obtido!r}")
+
+        t_antigo = _medir(lambda: gerar_xml_pretty_minidom(root_tag, dados), repeticoes)
+        t_generico = _medir(lambda: "".join(_partes_xml(root_tag, dados)), repeticoes)
+        t_novo = _medir(lambda: gerar_xml_pretty(root_tag, dados), repeticoes)
+        print(f"{root_tag:<10} {caso:<13} minidom: {t_antigo:8.2f} us/doc   "
+              f"genérico: {t_generico:8.2f} us/doc   "
+              f"pré-compilado: {t_novo:8.2f} us/doc   "
+              f"ganho: {t_antigo / t_novo:5.1f}x ({t_generico / t_novo:.2f}x sobre o genérico)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+benchmarks/dados.py
+Conjuntos de dados sintéticos e fixos (mesma semente, mesmos registros) para
+os benchmarks.
+
+Os conjuntos grandes repetem em ciclo uma base de UNICOS registros distintos:
+o custo por registro é o mesmo e 1M de linhas não precisa de 1M de objetos.
+"""
+
+import random
+from functools import lru_cache
+from itertools import cycle, islice
+
+from utils.xml_utils import PESSOA_FISICA, PESSOA_JURIDICA, gerar_xml_pretty, normalizar_agente
+
+TAMANHOS = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+UNICOS = 10_000
+SEMENTE = 20250101
+
+_NOMES = ("Ana", "Bruno", "Carla", "Diego", "Elisa", "Fábio", "Gabriela", "Heitor", "Íris", "João")
+_SOBRENOMES = ("Silva", "Souza", "Oliveira", "Pereira", "Conceição", "Araújo", "Gonçalves", "Lima")
+_RAMOS = ("Comércio", "Serviços", "Transportes", "Alimentos", "Tecnologia", "Construções")
+_RUAS = ("Rua das Acácias", "Av. Brasil", "Rua XV de Novembro", "Travessa São João", "Rua do Porto")
+
+
+def _digito(numeros, pesos):
+    resto = sum(n * p for n, p in zip(numeros, pesos)) % 11
+    return 0 if resto < 2 else 11 - resto
+
+
+def _cpf(rnd):
+    d = [rnd.randrange(10) for _ in range(9)]
+    d.append(_digito(d, range(10, 1, -1)))
+    d.append(_digito(d, range(11, 1, -1)))
+    s = "".join(map(str, d))
+    return f"{s[:3]}.{s[3:6]}.{s[6:9]}-{s[9:]}"
+
+
+def _cnpj(rnd):
+    d = [rnd.randrange(10) for _ in range(8)] + [0, 0, 0, 1]
+    d.append(_digito(d, (5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)))
+    d.append(_digito(d, (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)))
+    s = "".join(map(str, d))
+    return f"{s[:2]}.{s[2:5]}.{s[5:8]}/{s[8:12]}-{s[12:]}"
+
+
+@lru_cache(maxsize=None)
+def agentes_base():
+    """UNICOS agentes distintos (um terço pessoas jurídicas), sempre os mesmos"""
+    rnd = random.Random(SEMENTE)
+    agentes = []
+    for i in range(UNICOS):
+        juridica = i % 3 == 0
+        sobrenome = rnd.choice(_SOBRENOMES)
+        if juridica:
+            nome = f"{rnd.choice(_RAMOS)} {sobrenome} & Cia Ltda"
+        else:
+            nome = f"{rnd.choice(_NOMES)} {rnd.choice(_SOBRENOMES)} {sobrenome}"
+        registro = {
+            "Nome": nome,
+            "TipoPessoa": PESSOA_JURIDICA if juridica else PESSOA_FISICA,
+            "TipoAgente": rnd.choice(("Fornecedor", "Cliente")),
+            "Endereco": f"{rnd.choice(_RUAS)}, {rnd.randrange(1, 5000)}",
+            "Telefone": f"(11) 9{rnd.randrange(1000, 9999)}-{rnd.randrange(1000, 9999)}",
+            "Email": f"contato{i}@{sobrenome.lower()}.com.br",
+            ("CNPJ" if juridica else "CPF"): _cnpj(rnd) if juridica else _cpf(rnd),
+        }
+        agentes.append(normalizar_agente(registro))
+    return agentes
+
+
+@lru_cache(maxsize=None)
+def xmls_agentes_base():
+    return [gerar_xml_pretty("Agente", agente) for agente in agentes_base()]
+
+
+@lru_cache(maxsize=None)
+def contas_base():
+    """Uma conta a pagar por agente da base"""
+    rnd = random.Random(SEMENTE + 1)
+    contas = []
+    for i, agente in enumerate(agentes_base()):
+        contas.append({
+            "AgenteID": str(i + 1),
+            "AgenteNome": agente["Nome"],
+            "CNPJ_CPF": agente.get("CNPJ") or agente.get("CPF"),
+            "EmailAgente": agente["Email"],
+            "Descricao": f"NF {rnd.randrange(1, 99999)} - materiais",
+            "Valor": f"{rnd.randrange(100, 10_000_000) / 100:.2f}",
+            "DataEmissao": f"{rnd.randrange(1, 29):02d}/{rnd.randrange(1, 13):02d}/2025",
+            "DataVencimento": f"{rnd.randrange(1, 29):02d}/{rnd.randrange(1, 13):02d}/2026",
+        })
+    return contas
+
+
+def repetir(base, quantidade):
+    """Os primeiros `quantidade` itens da base repetida em ciclo"""
+    return islice(cycle(base), quantidade)
+
+
+def agentes(quantidade):
+    return repetir(agentes_base(), quantidade)
+
+
+def contas(quantidade):
+    return repetir(contas_base(), quantidade)
+
+
+def xmls_agentes(quantidade):
+    return repetir(xmls_agentes_base(), quantidade)
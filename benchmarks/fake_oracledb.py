@@ -0,0 +1,391 @@
+"""
+benchmarks/fake_oracledb.py
+Substituto em processo do python-oracledb, para os benchmarks e os testes.
+
+Guarda as tabelas XML_* em memória e responde às consultas montadas em
+utils/consultas.py (reconhecidas pelo texto do SQL). Cada ida e volta ao
+"servidor" espera LATENCIA segundos: o execute, cada executemany e cada bloco
+de `arraysize` linhas buscado além das `prefetchrows` iniciais, como no
+driver real. Assim os benchmarks medem o custo do lado do cliente e o
+número de idas e voltas de cada caminho de acesso.
+
+Também imita a API assíncrona (connect_async, create_pool_async) usada por
+utils/db_async.py; lá a latência é esperada com asyncio.sleep.
+
+Uso (antes de importar utils.db_utils ou utils.db_async):
+    from benchmarks import fake_oracledb
+    fake_oracledb.instalar(latencia=0.0005)
+"""
+
+import asyncio
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+LATENCIA = 0.0
+# Total de idas e voltas desde o último zerar_contagem (não depende da máquina)
+IDAS_E_VOLTAS = 0
+
+DB_TYPE_CLOB = object()
+DB_TYPE_LONG = object()
+DB_TYPE_NUMBER = object()
+POOL_GETMODE_WAIT = 0
+PURITY_SELF = 1
+
+
+class Error(Exception):
+    pass
+
+
+class DatabaseError(Error):
+    pass
+
+
+class ProgrammingError(Error):
+    pass
+
+
+def instalar(latencia=0.0):
+    """Registra este módulo como `oracledb` e define a latência por ida e volta"""
+    global LATENCIA
+    LATENCIA = latencia
+    sys.modules["oracledb"] = sys.modules[__name__]
+    return sys.modules[__name__]
+
+
+def _ida_e_volta():
+    global IDAS_E_VOLTAS
+    IDAS_E_VOLTAS += 1
+    if LATENCIA:
+        time.sleep(LATENCIA)
+
+
+async def _ida_e_volta_async():
+    global IDAS_E_VOLTAS
+    IDAS_E_VOLTAS += 1
+    if LATENCIA:
+        await asyncio.sleep(LATENCIA)
+
+
+def zerar_contagem():
+    global IDAS_E_VOLTAS
+    IDAS_E_VOLTAS = 0
+
+
+# ---------- BANCO EM MEMÓRIA ----------
+def _campos_agente(xml_texto):
+    """Colunas do XMLTABLE de agentes (None em todas se o XML é inválido)"""
+    try:
+        raiz = ET.fromstring(xml_texto)
+    except ET.ParseError:
+        return (None,) * 5
+    if raiz.tag != "Agente":
+        return (None,) * 5
+    return tuple(raiz.findtext(tag) for tag in ("Nome", "TipoPessoa", "CPF", "CNPJ", "Email"))
+
+
+class Tabela:
+    """Documentos com IDs 1..n (a sequência nunca reutiliza IDs)"""
+
+    def __init__(self):
+        self.docs = []
+        self.campos = []    # projeção do XMLTABLE de agentes, calculada sob demanda
+        # IDs gravados por outra sessão e ainda sem commit (invisíveis nas listagens)
+        self.nao_confirmados = set()
+
+    def inserir(self, xml_texto):
+        self.docs.append(xml_texto)
+        return len(self.docs)
+
+    def projetar(self):
+        # Documentos iguais (os conjuntos de dados se repetem) são projetados uma vez só
+        projetados = {}
+        for i in range(len(self.campos), len(self.docs)):
+            doc = self.docs[i]
+            campos = projetados.get(doc)
+            if campos is None:
+                campos = projetados[doc] = _campos_agente(doc)
+            self.campos.append(campos)
+
+    def ids_antes(self, apos_id, limite):
+        """IDs em ordem decrescente, menores que apos_id (todos se None)"""
+        fim = len(self.docs) if apos_id is None else min(max(int(apos_id) - 1, 0), len(self.docs))
+        return range(fim, max(fim - limite, 0), -1)
+
+
+class Banco:
+    def __init__(self):
+        self.tabelas = {}
+        # True simula o Oracle rejeitando a extração com XMLTABLE (caminho de contingência)
+        self.xmltable_indisponivel = False
+        # SQL de cada consulta executada, na ordem (para os testes)
+        self.consultas = []
+
+    def tabela(self, nome):
+        return self.tabelas.setdefault(nome.upper(), Tabela())
+
+    def popular(self, nome, docs):
+        """Carrega documentos sem custo de latência (preparação dos benchmarks)"""
+        tabela = self.tabela(nome)
+        tabela.docs.extend(docs)
+        if nome.upper() == "XML_AGENTES":
+            tabela.projetar()
+        return tabela
+
+    def executar(self, sql, binds):
+        """Retorna um iterável de linhas para o SQL de utils/consultas.py"""
+        self.consultas.append(sql)
+        if "FROM DUAL" in sql:
+            return [(1,)]
+        m = re.search(r"INSERT INTO (\w+)", sql)
+        if m:
+            novo_id = self.tabela(m.group(1)).inserir(binds["xml"])
+            if "id" in binds:
+                binds["id"].valor = novo_id
+            return []
+        if "CONTAINS(" in sql:
+            raise DatabaseError("ORA-20000: Oracle Text error:\nDRG-10599: column is not indexed")
+        tabela = self.tabela(re.search(r"FROM (\w+)", sql).group(1))
+
+        if "LEFT OUTER JOIN XMLTABLE('/Agente'" in sql:
+            if self.xmltable_indisponivel:
+                raise DatabaseError("ORA-19279: XPTY0004 - XQuery dynamic type mismatch: expected singleton sequence")
+            return self._listar_agentes(tabela, binds.get("desde_id"))
+        if "DBMS_LOB.SUBSTR" in sql:
+            tamanho = binds["tamanho"]
+            return [(i, tabela.docs[i - 1][:tamanho]) for i in tabela.ids_antes(binds.get("apos_id"), binds["limite"])]
+        if "WHERE ID = :id" in sql:
+            i = int(binds["id"])
+            return [(tabela.docs[i - 1],)] if 0 < i <= len(tabela.docs) else []
+        if "WHERE ID > :desde_id" in sql:
+            inicio = int(binds["desde_id"])
+            return ((i + 1, tabela.docs[i]) for i in range(max(inicio, 0), len(tabela.docs))
+                    if i + 1 not in tabela.nao_confirmados)
+        if "COUNT(*)" in sql or re.search(r"ORDER BY ID\s*$", sql):
+            # Intervalo de IDs (limites inclusivos e opcionais), em ordem crescente
+            inicio = max(int(binds.get("id_de", 1)), 1)
+            fim = min(int(binds.get("id_ate", len(tabela.docs))), len(tabela.docs))
+            if "COUNT(*)" in sql:
+                return [(max(fim - inicio + 1, 0),)]
+            return ((i, tabela.docs[i - 1]) for i in range(inicio, fim + 1))
+        if "FETCH FIRST :limite" in sql and "XML_TEXTO" in sql:
+            return [(i, tabela.docs[i - 1]) for i in tabela.ids_antes(binds.get("apos_id"), binds["limite"])]
+        if "ORDER BY ID DESC" in sql:
+            return ((i, tabela.docs[i - 1]) for i in range(len(tabela.docs), 0, -1))
+        raise DatabaseError(f"fake_oracledb: consulta não suportada:\n{sql}")
+
+    @staticmethod
+    def _listar_agentes(tabela, desde_id):
+        tabela.projetar()
+        fim = int(desde_id) if desde_id is not None else 0
+        for i in range(len(tabela.docs), fim, -1):
+            if i in tabela.nao_confirmados:
+                continue
+            campos = tabela.campos[i - 1]
+            xml = tabela.docs[i - 1] if campos[0] is None and campos[1] is None else None
+            yield (i,) + campos + (xml,)
+
+
+BANCO = Banco()
+
+
+def reiniciar():
+    """Descarta todas as tabelas"""
+    global BANCO
+    BANCO = Banco()
+    return BANCO
+
+
+# ---------- API DO DRIVER ----------
+class Var:
+    def __init__(self):
+        self.valor = None
+
+    def getvalue(self, pos=0):
+        return [self.valor]
+
+
+class ErroLote:
+    def __init__(self, offset, message):
+        self.offset = offset
+        self.message = message
+
+
+class Cursor:
+    def __init__(self):
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.outputtypehandler = None
+        self._linhas = iter(())
+        self._entregues = 0
+        self._erros = []
+
+    def var(self, tipo, arraysize=1):
+        return Var()
+
+    def setinputsizes(self, *args, **kwargs):
+        pass
+
+    def execute(self, sql, binds=None, **kwargs):
+        _ida_e_volta()
+        self._linhas = iter(BANCO.executar(sql, binds or kwargs))
+        self._entregues = 0
+
+    def executemany(self, sql, linhas, batcherrors=False):
+        _ida_e_volta()
+        self._gravar_lote(sql, linhas, batcherrors)
+
+    def _gravar_lote(self, sql, linhas, batcherrors):
+        self._erros = []
+        for offset, linha in enumerate(linhas):
+            xml = linha[0] if isinstance(linha, (tuple, list)) else linha["xml"]
+            # O parse do XMLType é custo do servidor: aqui só documentos vazios são rejeitados
+            if not xml or not xml.strip():
+                if not batcherrors:
+                    raise DatabaseError("ORA-19032: Expected XML tag")
+                self._erros.append(ErroLote(offset, "ORA-19032: Expected XML tag"))
+                continue
+            BANCO.executar(sql, {"xml": xml})
+
+    def getbatcherrors(self):
+        return self._erros
+
+    def _avancar(self):
+        """Próxima linha e se ela exigiu uma ida ao "servidor" (StopIteration no fim)"""
+        linha = next(self._linhas)
+        self._entregues += 1
+        # As primeiras linhas vêm com o execute; as demais, em blocos de arraysize
+        alem = self._entregues - max(self.prefetchrows, 1)
+        return linha, alem > 0 and (alem - 1) % self.arraysize == 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        linha, buscar = self._avancar()
+        if buscar:
+            _ida_e_volta()
+        return linha
+
+    def fetchone(self):
+        return next(self, None)
+
+    def fetchall(self):
+        return list(self)
+
+    def close(self):
+        pass
+
+
+class Connection:
+    def cursor(self):
+        return Cursor()
+
+    def commit(self):
+        _ida_e_volta()
+
+    def rollback(self):
+        _ida_e_volta()
+
+    def close(self):
+        pass
+
+
+class ConnectionPool:
+    def __init__(self, **parametros):
+        self.parametros = parametros
+
+    def acquire(self):
+        return Connection()
+
+    def release(self, conn):
+        pass
+
+    def close(self, force=False):
+        pass
+
+
+# ---------- API ASSÍNCRONA ----------
+class AsyncCursor(Cursor):
+    async def execute(self, sql, binds=None, **kwargs):
+        await _ida_e_volta_async()
+        self._linhas = iter(BANCO.executar(sql, binds or kwargs))
+        self._entregues = 0
+
+    async def executemany(self, sql, linhas, batcherrors=False):
+        await _ida_e_volta_async()
+        self._gravar_lote(sql, linhas, batcherrors)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            linha, buscar = self._avancar()
+        except StopIteration:
+            raise StopAsyncIteration from None
+        if buscar:
+            await _ida_e_volta_async()
+        return linha
+
+    async def fetchone(self):
+        try:
+            return await self.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    async def fetchall(self):
+        return [linha async for linha in self]
+
+
+class AsyncConnection:
+    def cursor(self):
+        return AsyncCursor()
+
+    async def commit(self):
+        await _ida_e_volta_async()
+
+    async def rollback(self):
+        await _ida_e_volta_async()
+
+    async def close(self):
+        pass
+
+
+class AsyncConnectionPool:
+    def __init__(self, **parametros):
+        self.parametros = parametros
+        self.emprestadas = 0
+
+    async def acquire(self):
+        self.emprestadas += 1
+        return AsyncConnection()
+
+    async def release(self, conn):
+        self.emprestadas -= 1
+
+    async def close(self, force=False):
+        pass
+
+
+async def connect_async(**parametros):
+    await _ida_e_volta_async()
+    return AsyncConnection()
+
+
+def create_pool_async(**parametros):
+    return AsyncConnectionPool(**parametros)
+
+
+def connect(**parametros):
+    _ida_e_volta()
+    return Connection()
+
+
+def create_pool(**parametros):
+    return ConnectionPool(**parametros)
+
+
+def init_oracle_client(**parametros):
+    pass
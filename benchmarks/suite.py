@@ -0,0 +1,297 @@
+"""
+benchmarks/suite.py
+Suíte de benchmarks: geração de XML, parse dos agentes e caminhos de acesso
+a dados de utils/db_utils.py, com os conjuntos fixos de benchmarks/dados.py
+(1k, 100k e 1M de linhas).
+
+O banco é o substituto em processo de benchmarks/fake_oracledb.py, com
+latência simulada por ida e volta (--latencia). Além do tempo, cada caso
+registra quantas idas e voltas fez ao "servidor": esse número não depende da
+máquina e denuncia regressões de acesso mesmo com latência zero.
+
+Os resultados podem ser gravados em JSON (--saida) e comparados com um
+resultado anterior (--baseline): casos mais lentos que a tolerância, ou com
+mais idas e voltas, são apontados como regressão e o código de saída é 1.
+
+Uso: python -m benchmarks.suite [--tamanhos 1k,100k] [--casos ...] [--latencia 0.0005]
+                                [--repeticoes 3] [--saida atual.json]
+                                [--baseline base.json] [--tolerancia 0.15]
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+
+from benchmarks import dados, fake_oracledb
+
+TAMANHO_LOTE = 500
+TAMANHO_PAGINA = 200
+# Casos de uma operação por ida e volta ficam limitados a esta quantidade
+LIMITE_UNITARIOS = 10_000
+
+CASOS = {}
+
+
+def caso(nome, limite=None):
+    """
+    Registra um caso. A função recebe a quantidade de linhas, prepara os
+    dados (fora da medição) e retorna (executar, itens).
+    """
+    def registrar(funcao):
+        CASOS[nome] = (funcao, limite)
+        return funcao
+    return registrar
+
+
+def _popular_agentes(quantidade):
+    fake_oracledb.reiniciar().popular("XML_AGENTES", dados.xmls_agentes(quantidade))
+
+
+# ---------- XML ----------
+@caso("gerar_xml_pretty_agente")
+def _gerar_agente(quantidade):
+    from utils.xml_utils import gerar_xml_pretty
+    registros = list(dados.agentes(quantidade))
+
+    def executar():
+        for registro in registros:
+            gerar_xml_pretty("Agente", registro)
+    return executar, quantidade
+
+
+@caso("gerar_xml_pretty_conta")
+def _gerar_conta(quantidade):
+    from utils.xml_utils import gerar_xml_pretty
+    registros = list(dados.contas(quantidade))
+
+    def executar():
+        for registro in registros:
+            gerar_xml_pretty("ContaPagar", registro)
+    return executar, quantidade
+
+
+@caso("parse_agente")
+def _parse_agente(quantidade):
+    # ET.fromstring por documento: o parse de listar_agentes (no cliente),
+    # da seleção de agentes e do cache
+    from utils.consultas import dados_agente
+    xmls = list(dados.xmls_agentes(quantidade))
+
+    def executar():
+        for id_val, xml in enumerate(xmls, 1):
+            dados_agente(id_val, xml)
+    return executar, quantidade
+
+
+# ---------- ACESSO A DADOS ----------
+@caso("salvar_xml", limite=LIMITE_UNITARIOS)
+def _salvar_xml(quantidade):
+    from utils.cache_agentes import CACHE_AGENTES
+    from utils.db_utils import salvar_xml
+    fake_oracledb.reiniciar()
+    CACHE_AGENTES.limpar()
+    conn = fake_oracledb.connect()
+    xmls = list(dados.xmls_agentes(quantidade))
+
+    def executar():
+        for xml in xmls:
+            salvar_xml(conn, "XML_AGENTES", xml)
+    return executar, quantidade
+
+
+@caso("salvar_xmls_lote")
+def _salvar_lote(quantidade):
+    from utils.db_utils import salvar_xmls_lote
+    fake_oracledb.reiniciar()
+    conn = fake_oracledb.connect()
+    xmls = list(dados.xmls_agentes(quantidade))
+
+    def executar():
+        salvar_xmls_lote(conn, "XML_AGENTES", xmls, TAMANHO_LOTE)
+    return executar, quantidade
+
+
+@caso("obter_xml", limite=LIMITE_UNITARIOS)
+def _obter_xml(quantidade):
+    from utils.db_utils import obter_xml
+    _popular_agentes(quantidade)
+    conn = fake_oracledb.connect()
+
+    def executar():
+        for id_val in range(1, quantidade + 1):
+            obter_xml(conn, "XML_AGENTES", id_val)
+    return executar, quantidade
+
+
+@caso("iterar_xmls")
+def _iterar_xmls(quantidade):
+    from utils.db_utils import iterar_xmls
+    _popular_agentes(quantidade)
+    conn = fake_oracledb.connect()
+
+    def executar():
+        for _ in iterar_xmls(conn, "XML_AGENTES"):
+            pass
+    return executar, quantidade
+
+
+@caso("previews_paginados")
+def _previews_paginados(quantidade):
+    from utils.db_utils import listar_previews_pagina
+    _popular_agentes(quantidade)
+    conn = fake_oracledb.connect()
+
+    def executar():
+        apos_id = None
+        while True:
+            pagina = listar_previews_pagina(conn, "XML_AGENTES", apos_id, TAMANHO_PAGINA)
+            if len(pagina) < TAMANHO_PAGINA:
+                break
+            apos_id = pagina[-1][0]
+    return executar, quantidade
+
+
+@caso("listar_agentes")
+def _listar_agentes(quantidade):
+    from utils.db_utils import listar_agentes
+    _popular_agentes(quantidade)
+    conn = fake_oracledb.connect()
+
+    def executar():
+        listar_agentes(conn)
+    return executar, quantidade
+
+
+@caso("listar_agentes_cliente")
+def _listar_agentes_cliente(quantidade):
+    # Caminho de contingência: XML completo + parse no cliente
+    from utils.db_utils import _listar_agentes_cliente
+    _popular_agentes(quantidade)
+    conn = fake_oracledb.connect()
+
+    def executar():
+        _listar_agentes_cliente(conn)
+    return executar, quantidade
+
+
+# ---------- EXECUÇÃO ----------
+def medir(nome, quantidade, repeticoes):
+    """Melhor tempo entre as repetições (cada uma com os dados preparados de novo)"""
+    funcao, limite = CASOS[nome]
+    if limite:
+        quantidade = min(quantidade, limite)
+    melhor = None
+    for _ in range(repeticoes):
+        executar, itens = funcao(quantidade)
+        fake_oracledb.zerar_contagem()
+        inicio = time.perf_counter()
+        executar()
+        decorrido = time.perf_counter() - inicio
+        idas_e_voltas = fake_oracledb.IDAS_E_VOLTAS
+        if melhor is None or decorrido < melhor:
+            melhor = decorrido
+    return {
+        "itens": itens,
+        "segundos": round(melhor, 6),
+        "us_por_item": round(melhor / itens * 1e6, 3),
+        "idas_e_voltas": idas_e_voltas,
+    }
+
+
+def executar_suite(tamanhos, casos, repeticoes, ao_medir=None):
+    resultados = {}
+    for rotulo in tamanhos:
+        for nome in casos:
+            chave = f"{nome}/{rotulo}"
+            resultados[chave] = medir(nome, dados.TAMANHOS[rotulo], repeticoes)
+            if ao_medir:
+                ao_medir(chave, resultados[chave])
+    return resultados
+
+
+def comparar(atual, baseline, tolerancia):
+    """
+    Compara os casos presentes nos dois resultados. Retorna uma lista de
+    tuplas (chave, razão de tempo, idas e voltas antes, depois, regrediu).
+    """
+    comparacoes = []
+    for chave, medida in atual.items():
+        anterior = baseline.get(chave)
+        if anterior is None:
+            continue
+        razao = medida["us_por_item"] / max(anterior["us_por_item"], 1e-9)
+        regrediu = razao > 1 + tolerancia or medida["idas_e_voltas"] > anterior["idas_e_voltas"]
+        comparacoes.append((chave, razao, anterior["idas_e_voltas"], medida["idas_e_voltas"], regrediu))
+    return comparacoes
+
+
+def _imprimir_medida(chave, medida):
+    print(f"{chave:<36} {medida['itens']:>9} itens  {medida['segundos']:9.3f} s  "
+          f"{medida['us_por_item']:10.2f} us/item  {medida['idas_e_voltas']:>8} idas e voltas", flush=True)
+
+
+def _lista(valor, validos):
+    itens = [v.strip() for v in valor.split(",") if v.strip()]
+    desconhecidos = [v for v in itens if v not in validos]
+    if desconhecidos:
+        raise argparse.ArgumentTypeError(f"desconhecido(s): {', '.join(desconhecidos)} "
+                                         f"(opções: {', '.join(validos)})")
+    return itens
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite",
+                                     description="Benchmarks de XML e de acesso a dados.")
+    parser.add_argument("--tamanhos", default="1k,100k", type=lambda v: _lista(v, list(dados.TAMANHOS)),
+                        help=f"conjuntos de dados ({', '.join(dados.TAMANHOS)}; padrão: 1k,100k)")
+    parser.add_argument("--casos", default=",".join(CASOS), type=lambda v: _lista(v, list(CASOS)),
+                        help="casos a executar (padrão: todos)")
+    parser.add_argument("--latencia", type=float, default=0.0,
+                        help="latência simulada por ida e volta, em segundos (padrão: 0)")
+    parser.add_argument("--repeticoes", type=int, default=3, help="repetições por caso (padrão: 3)")
+    parser.add_argument("--saida", help="grava os resultados neste arquivo JSON")
+    parser.add_argument("--baseline", help="resultado JSON anterior para comparação")
+    parser.add_argument("--tolerancia", type=float, default=0.15,
+                        help="aumento de tempo aceito antes de apontar regressão (padrão: 0.15)")
+    args = parser.parse_args(argv)
+
+    # Antes de qualquer import de utils.db_utils
+    fake_oracledb.instalar(args.latencia)
+
+    resultados = executar_suite(args.tamanhos, args.casos, args.repeticoes, ao_medir=_imprimir_medida)
+    documento = {
+        "meta": {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "latencia_s": args.latencia,
+            "repeticoes": args.repeticoes,
+            "registros_distintos": dados.UNICOS,
+        },
+        "resultados": resultados,
+    }
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(documento, f, indent=2, ensure_ascii=False)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline["meta"].get("latencia_s") != args.latencia:
+        print("Atenção: a baseline foi medida com outra latência.", file=sys.stderr)
+
+    regressoes = 0
+    print(f"\nComparação com {args.baseline} (tolerância {args.tolerancia:.0%}):")
+    for chave, razao, antes, depois, regrediu in comparar(resultados, baseline["resultados"], args.tolerancia):
+        regressoes += regrediu
+        marca = "REGRESSÃO" if regrediu else "ok"
+        print(f"  {chave:<36} {razao:6.2f}x  idas e voltas {antes} -> {depois}  {marca}")
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
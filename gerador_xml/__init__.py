@@ -0,0 +1,6 @@
+"""
+gerador_xml
+Linha de comando do Gerador de XMLs, sem interface gráfica (não importa PyQt5).
+
+Uso: python -m gerador_xml --help
+"""
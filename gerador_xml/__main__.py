@@ -0,0 +1,5 @@
+import sys
+
+from gerador_xml.cli import main
+
+sys.exit(main())
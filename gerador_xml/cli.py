@@ -0,0 +1,278 @@
+"""
+gerador_xml/cli.py
+Subcomandos:
+  gerar     valida e gera os XMLs (Agente ou ContaPagar) a partir de CSV/JSONL,
+            em vários processos (ver utils/pipeline.py)
+  carregar  valida, gera os XMLs e grava no Oracle em lotes (executemany)
+  exportar  exporta os XMLs gravados para um diretório ou arquivo
+            .zip/.tar.gz/.tar.zst (ver utils/exportacao.py)
+  importar  valida arquivos XML de um diretório ou arquivo compactado, em
+            vários processos, e grava no Oracle (ver utils/importacao.py)
+
+Exemplos:
+  python -m gerador_xml gerar agente agentes.csv -o agentes.xml
+  python -m gerador_xml gerar agente agentes.csv --shards saida/ --processos 8
+  python -m gerador_xml carregar conta_pagar contas.jsonl --lote 1000
+  python -m gerador_xml exportar agente agentes.zip --de 1000 --ate 50000
+  python -m gerador_xml importar recebidos/ --rejeitados rejeitados.csv
+
+A vazão (documentos/s) é informada na saída de erro. A senha do Oracle vem
+da variável GERADOR_XML_SENHA ou é pedida no terminal; TNS e usuário, se não
+informados, vêm do config.json usado pela interface.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from getpass import getpass
+from itertools import islice
+
+from utils.exportacao import (
+    ESCRITORES_PADRAO, FORMATOS as FORMATOS_EXPORTACAO, TAMANHO_BLOCO as TAMANHO_BLOCO_EXPORTACAO, exportar_xmls,
+)
+from utils.importacao import TABELAS, TAMANHO_BLOCO_PADRAO as TAMANHO_BLOCO_IMPORTACAO, importar_xmls
+from utils.pipeline import TAMANHO_BLOCO_PADRAO, TIPOS, gerar_paralelo, preparar_bloco
+from utils.registros import FORMATOS, ler_registros
+from utils.xml_utils import gerar_xml_pretty
+
+CONFIG_PATH = "config.json"
+VARIAVEL_SENHA = "GERADOR_XML_SENHA"
+
+
+def _ler_config():
+    if os.path.exists(CONFIG_PATH):
+        with open(CONFIG_PATH, "r") as f:
+            return json.load(f)
+    return {}
+
+
+def _relatar(acao, total, inicio, tamanho_bytes=None):
+    """Escreve na saída de erro o total processado e a vazão"""
+    decorrido = max(time.perf_counter() - inicio, 1e-9)
+    mensagem = f"{total} documento(s) {acao} em {decorrido:.2f} s ({total / decorrido:,.0f} docs/s"
+    if tamanho_bytes is not None:
+        mensagem += f", {tamanho_bytes / decorrido / 1024 / 1024:,.1f} MB/s"
+    print(mensagem + ")", file=sys.stderr)
+
+
+def _relatar_rejeitado(linha, mensagem):
+    print(f"linha {linha}: {mensagem}", file=sys.stderr)
+
+
+def _registros(args):
+    """Registros do arquivo de entrada, sob demanda: (linha, registro)"""
+    return ler_registros(args.entrada, args.formato, args.delimitador)
+
+
+# ---------- GERAR ----------
+def comando_gerar(args):
+    # JSONL segue sem parse: cada processo converte as próprias linhas
+    registros = ler_registros(args.entrada, args.formato, args.delimitador, bruto=True)
+    parametros = {
+        "processos": args.processos,
+        "tamanho_bloco": args.bloco,
+        "validar": not args.sem_validacao,
+        "ao_rejeitar": _relatar_rejeitado,
+    }
+    inicio = time.perf_counter()
+    if args.shards:
+        resumo = gerar_paralelo(args.tipo, registros, diretorio_shards=args.shards, **parametros)
+        tamanho = sum(os.path.getsize(caminho) for caminho in resumo["shards"])
+        _relatar(f"gerados em {len(resumo['shards'])} arquivo(s)", resumo["gerados"], inicio, tamanho)
+    elif args.saida == "-":
+        resumo = gerar_paralelo(args.tipo, registros, destino=sys.stdout, **parametros)
+        sys.stdout.flush()
+        _relatar("gerados", resumo["gerados"], inicio)
+    else:
+        with open(args.saida, "w", encoding="utf-8", newline="\n") as f:
+            resumo = gerar_paralelo(args.tipo, registros, destino=f, **parametros)
+        _relatar("gerados", resumo["gerados"], inicio, os.path.getsize(args.saida))
+    if resumo["rejeitados"]:
+        print(f"{resumo['rejeitados']} registro(s) rejeitado(s).", file=sys.stderr)
+        return 1
+    return 0
+
+
+# ---------- CARREGAR ----------
+def _conectar(args):
+    # Importado aqui: só quem grava no banco carrega o driver e o Oracle Client
+    from utils.db_utils import conectar_oracle
+
+    cfg = _ler_config()
+    tns = args.tns or cfg.get("tns")
+    usuario = args.usuario or cfg.get("usuario")
+    if not tns or not usuario:
+        raise SystemExit("Informe --tns e --usuario (ou preencha o config.json).")
+    senha = os.environ.get(VARIAVEL_SENHA) or getpass(f"Senha de {usuario}@{tns}: ")
+    return conectar_oracle(usuario, senha, tns)
+
+
+def comando_carregar(args):
+    from utils.db_utils import desconectar_oracle, salvar_xmls_lote
+
+    root_tag = TIPOS[args.tipo][0]
+    tabela = args.tabela or TABELAS[args.tipo]
+    conn = _conectar(args)
+    gravados = rejeitados = 0
+    inicio = time.perf_counter()
+    try:
+        registros = _registros(args)
+        while True:
+            bloco = list(islice(registros, args.lote))
+            if not bloco:
+                break
+            validos, invalidos = preparar_bloco(args.tipo, bloco, not args.sem_validacao)
+            docs = []
+            for linha, dados in validos:
+                try:
+                    docs.append((linha, gerar_xml_pretty(root_tag, dados)))
+                except (ValueError, TypeError) as e:
+                    invalidos.append((linha, str(e)))
+            for linha, erro in sorted(invalidos):
+                rejeitados += 1
+                _relatar_rejeitado(linha, erro)
+            if not docs:
+                continue
+            erros = salvar_xmls_lote(conn, tabela, [doc for _, doc in docs], args.lote)
+            for (linha, _), erro in zip(docs, erros):
+                if erro is None:
+                    gravados += 1
+                else:
+                    rejeitados += 1
+                    _relatar_rejeitado(linha, erro)
+    finally:
+        desconectar_oracle(conn)
+    _relatar(f"gravados em {tabela}", gravados, inicio)
+    if rejeitados:
+        print(f"{rejeitados} documento(s) rejeitado(s).", file=sys.stderr)
+        return 1
+    return 0
+
+
+# ---------- EXPORTAR ----------
+def comando_exportar(args):
+    from utils.db_utils import desconectar_oracle
+
+    tabela = args.tabela or TABELAS[args.tipo]
+    conn = _conectar(args)
+    inicio = time.perf_counter()
+    try:
+        resumo = exportar_xmls(conn, tabela, args.destino, args.formato, args.de, args.ate,
+                               args.bloco, args.escritores)
+    finally:
+        desconectar_oracle(conn)
+    _relatar(f"exportados de {tabela} para {args.destino}", resumo["exportados"], inicio, resumo["bytes"])
+    return 0
+
+
+# ---------- IMPORTAR ----------
+def comando_importar(args):
+    from utils.db_utils import desconectar_oracle
+
+    def relatar_rejeitado(nome, etapa, motivo):
+        print(f"{nome} ({etapa}): {motivo}", file=sys.stderr)
+
+    conn = _conectar(args)
+    inicio = time.perf_counter()
+    try:
+        resumo = importar_xmls(conn, args.origem, args.rejeitados, args.tipo, args.processos, args.bloco,
+                               args.lote, not args.sem_validacao,
+                               ao_rejeitar=None if args.silencioso else relatar_rejeitado)
+    finally:
+        desconectar_oracle(conn)
+    for tabela, gravados in sorted(resumo["gravados"].items()):
+        print(f"{gravados} documento(s) gravados em {tabela}", file=sys.stderr)
+    _relatar("lidos", resumo["lidos"], inicio)
+    if resumo["rejeitados"]:
+        destino = f" (ver {args.rejeitados})" if args.rejeitados else ""
+        print(f"{resumo['rejeitados']} arquivo(s) rejeitado(s){destino}.", file=sys.stderr)
+        return 1
+    return 0
+
+
+# ---------- ARGUMENTOS ----------
+def _adicionar_entrada(parser):
+    parser.add_argument("tipo", choices=sorted(TIPOS), help="tipo de documento")
+    parser.add_argument("entrada", help="arquivo CSV ou JSONL (- para a entrada padrão, em JSONL)")
+    parser.add_argument("--formato", choices=FORMATOS, help="formato da entrada (padrão: pela extensão)")
+    parser.add_argument("--delimitador", default=",", help="delimitador do CSV (padrão: ,)")
+    parser.add_argument("--sem-validacao", action="store_true",
+                        help="não aplica as regras de validação das telas")
+
+
+def _adicionar_conexao(parser):
+    parser.add_argument("--tns", help="host:porta/serviço (padrão: config.json)")
+    parser.add_argument("--usuario", help="usuário do Oracle (padrão: config.json)")
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m gerador_xml",
+        description="Gera XMLs de Agente/ContaPagar e carrega no Oracle sem abrir a interface.",
+    )
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    gerar = subcomandos.add_parser("gerar", help="gera os XMLs em um arquivo ou na saída padrão")
+    _adicionar_entrada(gerar)
+    gerar.add_argument("-o", "--saida", default="-", help="arquivo de saída (padrão: saída padrão)")
+    gerar.add_argument("--shards", metavar="DIRETORIO",
+                       help="grava um arquivo por bloco no diretório em vez de uma saída única")
+    gerar.add_argument("--processos", type=int, default=None,
+                       help="processos de geração (padrão: núcleos da máquina; 1 = sem paralelismo)")
+    gerar.add_argument("--bloco", type=int, default=TAMANHO_BLOCO_PADRAO,
+                       help=f"registros por bloco (padrão: {TAMANHO_BLOCO_PADRAO})")
+    gerar.set_defaults(funcao=comando_gerar)
+
+    carregar = subcomandos.add_parser("carregar", help="gera os XMLs e grava no Oracle em lotes")
+    _adicionar_entrada(carregar)
+    _adicionar_conexao(carregar)
+    carregar.add_argument("--tabela", help="tabela de destino (padrão: conforme o tipo)")
+    carregar.add_argument("--lote", type=int, default=500, help="documentos por executemany (padrão: 500)")
+    carregar.set_defaults(funcao=comando_carregar)
+
+    exportar = subcomandos.add_parser("exportar", help="exporta os XMLs gravados no Oracle")
+    exportar.add_argument("tipo", choices=sorted(TIPOS), help="tipo de documento")
+    exportar.add_argument("destino", help="diretório ou arquivo .zip, .tar.gz ou .tar.zst")
+    _adicionar_conexao(exportar)
+    exportar.add_argument("--tabela", help="tabela de origem (padrão: conforme o tipo)")
+    exportar.add_argument("--formato", choices=FORMATOS_EXPORTACAO,
+                          help="formato do destino (padrão: pela extensão; sem extensão, diretório)")
+    exportar.add_argument("--de", type=int, help="menor ID exportado")
+    exportar.add_argument("--ate", type=int, help="maior ID exportado")
+    exportar.add_argument("--bloco", type=int, default=TAMANHO_BLOCO_EXPORTACAO,
+                          help=f"documentos buscados por vez (padrão: {TAMANHO_BLOCO_EXPORTACAO})")
+    exportar.add_argument("--escritores", type=int, default=ESCRITORES_PADRAO,
+                          help=f"threads de gravação em diretório (padrão: {ESCRITORES_PADRAO})")
+    exportar.set_defaults(funcao=comando_exportar)
+
+    importar = subcomandos.add_parser("importar", help="valida arquivos XML e grava no Oracle em lotes")
+    importar.add_argument("origem", help="diretório ou arquivo .zip, .tar.gz ou .tar.zst com os XMLs")
+    _adicionar_conexao(importar)
+    importar.add_argument("--tipo", choices=sorted(TIPOS),
+                          help="aceita só este tipo (padrão: pela tag raiz de cada documento)")
+    importar.add_argument("--rejeitados", metavar="ARQUIVO", default="rejeitados.csv",
+                          help="relatório CSV dos arquivos rejeitados (padrão: rejeitados.csv)")
+    importar.add_argument("--silencioso", action="store_true",
+                          help="não lista cada rejeitado na saída de erro")
+    importar.add_argument("--processos", type=int, default=None,
+                          help="processos de parse e validação (padrão: núcleos da máquina; 1 = sem paralelismo)")
+    importar.add_argument("--bloco", type=int, default=TAMANHO_BLOCO_IMPORTACAO,
+                          help=f"arquivos por bloco enviado aos processos (padrão: {TAMANHO_BLOCO_IMPORTACAO})")
+    importar.add_argument("--lote", type=int, default=500, help="documentos por executemany (padrão: 500)")
+    importar.add_argument("--sem-validacao", action="store_true",
+                          help="não aplica as regras de validação das telas")
+    importar.set_defaults(funcao=comando_importar)
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    try:
+        return args.funcao(args)
+    except (OSError, ValueError, TypeError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
@@ -1,13 +1,50 @@
+import time
+
+# Marca o início antes dos imports pesados (ver --medir-inicio)
+_INICIO = time.perf_counter()
+
 import sys
 import json
 import os
+from datetime import datetime
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QStackedWidget, QLineEdit, QLabel, QMessageBox
 )
-from xml_screens.xml_agente import TelaAgente
-from xml_screens.xml_contas_pagar import TelaContasPagar
-from utils.db_utils import conectar_oracle, desconectar_oracle, testar_conexao
+from xml_screens.tarefas import GerenciadorTarefas
+from utils import metricas
+
+# Tamanho padrão do pool de conexões (pode ser ajustado em config.json, chave "pool")
+POOL_PADRAO = {"min": 1, "max": 4, "incremento": 1, "drcp": False}
+
+TELA_INICIAL = "agente"
+
+# Intervalo da exportação das métricas para o Prometheus (config.json, "metricas" -> "prometheus")
+INTERVALO_PROMETHEUS_MS = 15000
+
+# Medição do tempo de abertura: main.py --medir-inicio[=arquivo.jsonl]
+OPCAO_MEDIR_INICIO = "--medir-inicio"
+ARQUIVO_MEDICAO_PADRAO = "medicao_inicio.jsonl"
+
+
+# ======================================================
+# Telas (criadas na primeira navegação)
+# ======================================================
+# Os módulos das telas, e o driver Oracle que eles importam, só são carregados
+# quando a tela é aberta. Imports explícitos (e não por nome) para que o
+# PyInstaller continue encontrando os módulos.
+def criar_tela_agente(parent):
+    from xml_screens.xml_agente import TelaAgente
+    return TelaAgente(parent)
+
+
+def criar_tela_contas(parent):
+    from xml_screens.xml_contas_pagar import TelaContasPagar
+    return TelaContasPagar(parent)
+
+
+TELAS = {"agente": criar_tela_agente, "contas": criar_tela_contas}
 
 
 class MainWindow(QMainWindow):
@@ -17,8 +54,14 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("Gerador de XMLs com Oracle")
         self.resize(900, 750)
 
-        self.conn = None
+        self.pool = None
         self.config_path = "config.json"
+        # Antes de as telas importarem db_utils/xml_utils (ver utils/metricas.py)
+        cfg_metricas = self.ler_config().get("metricas", {})
+        metricas.configurar(cfg_metricas)
+        self.arquivo_prometheus = cfg_metricas.get("prometheus")
+        # Operações de banco rodam fora da thread da interface
+        self.tarefas = GerenciadorTarefas(self)
 
         # ==========================
         # Topo - Área de conexão
@@ -54,15 +97,14 @@ class MainWindow(QMainWindow):
         top_menu_layout.addWidget(self.btn_agente)
         top_menu_layout.addWidget(self.btn_contas)
         top_menu_layout.addStretch()
+        self.btn_metricas = QPushButton("Métricas")
+        top_menu_layout.addWidget(self.btn_metricas)
 
         # ==========================
         # Stack de telas
         # ==========================
         self.stack = QStackedWidget()
-        self.tela_agente = TelaAgente(self)
-        self.tela_contas = TelaContasPagar(self)
-        self.stack.addWidget(self.tela_agente)
-        self.stack.addWidget(self.tela_contas)
+        self.telas = {}
 
         # ==========================
         # Layout principal
@@ -77,12 +119,36 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(container)
 
         # Liga botões às telas
-        self.btn_agente.clicked.connect(lambda: self.stack.setCurrentWidget(self.tela_agente))
-        self.btn_contas.clicked.connect(lambda: self.stack.setCurrentWidget(self.tela_contas))
+        self.btn_agente.clicked.connect(lambda: self.mostrar_tela("agente"))
+        self.btn_contas.clicked.connect(lambda: self.mostrar_tela("contas"))
+        self.btn_metricas.clicked.connect(self.abrir_metricas)
+
+        if metricas.ativo() and self.arquivo_prometheus:
+            self.timer_prometheus = QTimer(self)
+            self.timer_prometheus.timeout.connect(self.exportar_metricas)
+            self.timer_prometheus.start(INTERVALO_PROMETHEUS_MS)
 
         # Tenta carregar última conexão
         self.carregar_config()
 
+    # ======================================================
+    # Telas
+    # ======================================================
+    def tela(self, nome):
+        """Retorna a tela `nome`, criando-a (e importando seu módulo) no primeiro uso"""
+        if nome not in self.telas:
+            tela = TELAS[nome](self)
+            self.stack.addWidget(tela)
+            self.telas[nome] = tela
+        return self.telas[nome]
+
+    def mostrar_tela(self, nome):
+        self.stack.setCurrentWidget(self.tela(nome))
+
+    def abrir_tela_inicial(self):
+        """Chamado logo depois de a janela aparecer"""
+        self.mostrar_tela(TELA_INICIAL)
+
     # ======================================================
     # Conexão Oracle
     # ======================================================
@@ -95,36 +161,147 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Erro", "Preencha todos os campos de conexão!")
             return
 
-        try:
-            self.conn = conectar_oracle(usuario, senha, tns)
-            if self.conn:
-                QMessageBox.information(self, "Conectado", "Conexão com Oracle estabelecida!")
-                self.salvar_config(tns, usuario)
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Falha ao conectar:\n{e}")
+        cfg_pool = dict(POOL_PADRAO, **self.ler_config().get("pool", {}))
+        self.fechar_pool()
+
+        def abrir_pool():
+            # O driver e o Oracle Client só são carregados ao conectar
+            from utils.db_utils import criar_pool, emprestar_conexao, fechar_pool, testar_conexao
+
+            pool = criar_pool(
+                usuario, senha, tns,
+                minimo=cfg_pool["min"], maximo=cfg_pool["max"],
+                incremento=cfg_pool["incremento"], drcp=cfg_pool["drcp"],
+            )
+            # Empresta uma conexão para validar credenciais e TNS antes de liberar as telas
+            try:
+                with emprestar_conexao(pool) as conn:
+                    if not testar_conexao(conn):
+                        raise RuntimeError("A conexão aberta não respondeu ao teste.")
+            except Exception:
+                fechar_pool(pool)
+                raise
+            return pool
+
+        def conectado(pool):
+            self.pool = pool
+            QMessageBox.information(self, "Conectado", "Conexão com Oracle estabelecida!")
+            self.salvar_config(tns, usuario)
+
+        self.btn_conectar.setEnabled(False)
+        self.tarefas.executar(
+            abrir_pool,
+            ao_concluir=conectado,
+            ao_falhar=lambda e: QMessageBox.critical(self, "Erro", f"Falha ao conectar:\n{e}"),
+            ao_finalizar=lambda: self.btn_conectar.setEnabled(True),
+        )
 
     def desconectar(self):
-        if self.conn:
-            desconectar_oracle(self.conn)
-            self.conn = None
+        if self.pool:
+            self.fechar_pool()
             QMessageBox.information(self, "Desconectado", "Conexão encerrada.")
         else:
             QMessageBox.warning(self, "Aviso", "Nenhuma conexão ativa.")
 
-    def carregar_config(self):
+    def fechar_pool(self):
+        if self.pool:
+            from utils.db_utils import fechar_pool
+            fechar_pool(self.pool)
+        self.pool = None
+
+    def closeEvent(self, event):
+        # Não deixa tarefas usando conexões de um pool que será fechado
+        self.tarefas.aguardar()
+        self.fechar_pool()
+        self.exportar_metricas()
+        super().closeEvent(event)
+
+    # ======================================================
+    # Métricas
+    # ======================================================
+    def abrir_metricas(self):
+        from xml_screens.painel_metricas import abrir_painel_metricas
+        abrir_painel_metricas(self)
+
+    def exportar_metricas(self):
+        if not (metricas.ativo() and self.arquivo_prometheus):
+            return
+        try:
+            metricas.exportar_prometheus(self.arquivo_prometheus)
+        except OSError:
+            pass  # a exportação é periódica: tenta de novo no próximo ciclo
+
+    def ler_config(self):
         if os.path.exists(self.config_path):
             with open(self.config_path, "r") as f:
-                cfg = json.load(f)
-                self.tns_input.setText(cfg.get("tns", ""))
-                self.user_input.setText(cfg.get("usuario", ""))
+                return json.load(f)
+        return {}
+
+    def carregar_config(self):
+        cfg = self.ler_config()
+        self.tns_input.setText(cfg.get("tns", ""))
+        self.user_input.setText(cfg.get("usuario", ""))
 
     def salvar_config(self, tns, usuario):
+        cfg = self.ler_config()
+        cfg.update({"tns": tns, "usuario": usuario})
         with open(self.config_path, "w") as f:
-            json.dump({"tns": tns, "usuario": usuario}, f, indent=4)
+            json.dump(cfg, f, indent=4)
 
 
-if __name__ == "__main__":
+# ======================================================
+# Medição do tempo de abertura
+# ======================================================
+def arquivo_medicao(argv):
+    """Arquivo indicado em --medir-inicio[=arquivo], ou None se a opção não foi passada"""
+    for arg in argv[1:]:
+        if arg == OPCAO_MEDIR_INICIO:
+            return ARQUIVO_MEDICAO_PADRAO
+        if arg.startswith(OPCAO_MEDIR_INICIO + "="):
+            return arg.split("=", 1)[1] or ARQUIVO_MEDICAO_PADRAO
+    return None
+
+
+def registrar_medicao(arquivo, marcas):
+    """Acrescenta uma linha JSON com os tempos (em segundos desde o início) ao arquivo"""
+    registro = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "executavel": os.path.basename(sys.executable),
+        "empacotado": bool(getattr(sys, "frozen", False)),
+        # O driver não deve ter sido carregado antes de a janela aparecer
+        "oracledb_na_abertura": marcas.pop("oracledb_na_abertura"),
+    }
+    registro.update({nome: round(t - _INICIO, 4) for nome, t in marcas.items()})
+    with open(arquivo, "a", encoding="utf-8") as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+
+def main():
+    marcas = {"imports": time.perf_counter()}
+    medicao = arquivo_medicao(sys.argv)
     app = QApplication(sys.argv)
     window = MainWindow()
+    marcas["janela_criada"] = time.perf_counter()
     window.show()
-    sys.exit(app.exec_())
+
+    if medicao:
+        # Os timers de 0 ms rodam em ordem, depois de a janela ser exibida
+        def janela_exibida():
+            marcas["janela_exibida"] = time.perf_counter()
+            marcas["oracledb_na_abertura"] = "oracledb" in sys.modules
+
+        def tela_inicial_pronta():
+            marcas["tela_inicial"] = time.perf_counter()
+            registrar_medicao(medicao, marcas)
+            app.quit()
+
+        QTimer.singleShot(0, janela_exibida)
+        QTimer.singleShot(0, window.abrir_tela_inicial)
+        QTimer.singleShot(0, tela_inicial_pronta)
+    else:
+        QTimer.singleShot(0, window.abrir_tela_inicial)
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
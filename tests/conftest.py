@@ -0,0 +1,19 @@
+"""
+Configuração comum dos testes: o driver Oracle é o substituto em memória de
+benchmarks/fake_oracledb.py, registrado antes de qualquer import de
+utils.db_utils ou utils.db_async.
+"""
+
+import pytest
+
+from benchmarks import fake_oracledb
+
+fake_oracledb.instalar()
+
+
+@pytest.fixture
+def banco():
+    """Banco vazio e contagem de idas e voltas zerada"""
+    banco = fake_oracledb.reiniciar()
+    fake_oracledb.zerar_contagem()
+    return banco
@@ -0,0 +1,93 @@
+"""Testes de utils/cache_agentes.py sobre benchmarks/fake_oracledb.py"""
+
+from utils import db_utils
+from utils.cache_agentes import CacheAgentes
+
+
+def _conectar():
+    return db_utils.conectar_oracle("usuario", "senha", "host:1521/servico")
+
+
+def test_transmitir_xml_do_lru_usa_o_mesmo_tamanho_de_pedaco(banco):
+    documento = "<Agente><Nome>" + "x" * 2500 + "</Nome></Agente>"
+    banco.popular("XML_AGENTES", [documento])
+    cache = CacheAgentes()
+    conn = _conectar()
+
+    do_banco = []
+    assert cache.transmitir_xml(conn, 1, do_banco.append, tamanho=1000) == len(documento)
+    do_lru = []
+    assert cache.transmitir_xml(None, 1, do_lru.append, tamanho=1000) == len(documento)
+
+    assert "".join(do_lru) == documento
+    assert [len(p) for p in do_lru] == [len(p) for p in do_banco]
+    assert max(len(p) for p in do_lru) <= 1000
+
+
+def test_transmitir_xml_nao_guarda_documento_maior_que_o_lru(banco):
+    banco.popular("XML_AGENTES", ["<Agente>" + "x" * 500 + "</Agente>"])
+    cache = CacheAgentes(limite_caracteres_xml=100)
+    conn = _conectar()
+    pedacos = []
+
+    cache.transmitir_xml(conn, 1, pedacos.append, tamanho=64)
+
+    assert len(pedacos) > 1
+    assert cache._caracteres_xml == 0
+
+
+def _agentes(inicio, fim):
+    return [f"<Agente><Nome>Agente {i}</Nome><CPF>{i:011d}</CPF></Agente>" for i in range(inicio, fim + 1)]
+
+
+def test_atualizar_rele_a_janela_abaixo_do_ultimo_id(banco):
+    tabela = banco.popular("XML_AGENTES", _agentes(1, 10))
+    # O ID 9 foi reservado por outra sessão, que só confirma depois do 10
+    tabela.nao_confirmados.add(9)
+    cache = CacheAgentes(janela_revisao=5)
+    conn = _conectar()
+
+    assert [a["id"] for a in cache.atualizar(conn)] == [10, 8, 7, 6, 5, 4, 3, 2, 1]
+    assert cache.ultimo_id == 10
+
+    tabela.nao_confirmados.clear()
+    banco.popular("XML_AGENTES", _agentes(11, 12))
+    agentes = cache.atualizar(conn)
+
+    assert [a["id"] for a in agentes] == list(range(12, 0, -1))
+    assert cache.ultimo_id == 12
+    # Só a janela (IDs 6..10) e os novos foram relidos
+    assert "desde_id" in banco.consultas[-1]
+
+
+def test_atualizar_nao_guarda_agentes_acima_do_limite(banco):
+    banco.popular("XML_AGENTES", _agentes(1, 10))
+    cache = CacheAgentes(limite_agentes=5)
+    conn = _conectar()
+
+    assert cache.atualizar(conn) == []
+    assert cache.excedido and not cache.carregado
+    assert cache.indice() is None
+    # Só o COUNT(*): os agentes não foram lidos
+    assert len(banco.consultas) == 1 and "COUNT(*)" in banco.consultas[0]
+
+    # Excedido, as próximas atualizações não consultam o banco
+    assert cache.atualizar(conn) == []
+    assert len(banco.consultas) == 1
+
+
+def test_atualizar_descarta_agentes_ao_passar_do_limite(banco):
+    banco.popular("XML_AGENTES", _agentes(1, 4))
+    cache = CacheAgentes(limite_agentes=5)
+    conn = _conectar()
+
+    assert len(cache.atualizar(conn)) == 4
+    banco.popular("XML_AGENTES", _agentes(5, 6))
+
+    assert cache.atualizar(conn) == []
+    assert cache.excedido and cache.agentes() == []
+
+    # recarregar descarta o estado e lê a tabela de novo (aqui, com um limite maior)
+    cache.limite_agentes = 10
+    assert len(cache.recarregar(conn)) == 6
+    assert cache.carregado and not cache.excedido
@@ -0,0 +1,29 @@
+"""Testes de gerador_xml/cli.py (em subprocesso, para observar os módulos importados)"""
+
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _executar(codigo):
+    return subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+
+
+def test_cli_sem_validacao_nao_importa_numpy(tmp_path):
+    entrada = tmp_path / "agentes.jsonl"
+    entrada.write_text('{"Nome": "Ana", "TipoPessoa": "Pessoa Física", "CPF": "529.982.247-25"}\n',
+                       encoding="utf-8")
+    saida = tmp_path / "agentes.xml"
+
+    resultado = _executar(
+        "import sys\n"
+        "from gerador_xml.cli import main\n"
+        "assert 'numpy' not in sys.modules\n"
+        f"main(['gerar', 'agente', {str(entrada)!r}, '-o', {str(saida)!r}, '--processos', '1', '--sem-validacao'])\n"
+        "print('numpy' in sys.modules, 'utils.validacao' in sys.modules)\n"
+    )
+
+    assert resultado.stdout.split() == ["False", "False"]
+    assert "<Nome>Ana</Nome>" in saida.read_text(encoding="utf-8")
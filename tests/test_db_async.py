@@ -0,0 +1,162 @@
+"""Testes de utils/db_async.py sobre a API assíncrona de benchmarks/fake_oracledb.py"""
+
+import asyncio
+
+import pytest
+
+from benchmarks import fake_oracledb
+from utils import db_async
+from utils.consultas import dados_agente
+from utils.xml_utils import PESSOA_FISICA, gerar_xml_pretty
+
+
+def _xml_agente(nome, cpf):
+    return gerar_xml_pretty("Agente", {
+        "Nome": nome, "TipoPessoa": PESSOA_FISICA, "TipoAgente": "Cliente", "Endereco": "Rua A, 1",
+        "Telefone": "(11) 91234-5678", "Email": f"{nome.lower()}@exemplo.com.br", "CPF": cpf,
+    })
+
+
+def _xml_conta(numero):
+    return f"<ContaPagar><Descricao>{numero}</Descricao></ContaPagar>"
+
+
+def _conectar():
+    return db_async.conectar_oracle("usuario", "senha", "host:1521/servico")
+
+
+# ---------- salvar_xmls_lote ----------
+def test_salvar_xmls_lote_devolve_erro_por_documento(banco):
+    docs = ["<A/>", "", "<B/>", "  ", "<C/>"]
+
+    async def cenario():
+        conn = await _conectar()
+        fake_oracledb.zerar_contagem()
+        return await db_async.salvar_xmls_lote(conn, "XML_AGENTES", docs, batch_size=2)
+
+    erros = asyncio.run(cenario())
+
+    assert erros[0] is None and erros[2] is None and erros[4] is None
+    assert "ORA-19032" in erros[1] and "ORA-19032" in erros[3]
+    # Os rejeitados não derrubam o lote: os demais foram gravados
+    assert banco.tabela("XML_AGENTES").docs == ["<A/>", "<B/>", "<C/>"]
+    # 3 lotes: um executemany e um commit por lote
+    assert fake_oracledb.IDAS_E_VOLTAS == 6
+
+
+# ---------- iterar_xmls ----------
+def test_iterar_xmls_busca_em_blocos_de_arraysize(banco):
+    banco.popular("XML_CONTAS_PAGAR", [_xml_conta(i) for i in range(1, 1001)])
+
+    async def cenario():
+        conn = await _conectar()
+        fake_oracledb.zerar_contagem()
+        return [item async for item in db_async.iterar_xmls(conn, "XML_CONTAS_PAGAR",
+                                                             arraysize=100, prefetchrows=101)]
+
+    linhas = asyncio.run(cenario())
+
+    assert [id_val for id_val, _ in linhas] == list(range(1000, 0, -1))
+    assert linhas[0][1] == _xml_conta(1000)
+    # execute (com as 101 primeiras linhas) + 9 blocos de 100 para as 899 restantes
+    assert fake_oracledb.IDAS_E_VOLTAS == 10
+
+
+def test_iterar_xmls_desde_id_em_ordem_crescente(banco):
+    banco.popular("XML_CONTAS_PAGAR", [_xml_conta(i) for i in range(1, 11)])
+
+    async def cenario():
+        conn = await _conectar()
+        return [id_val async for id_val, _ in db_async.iterar_xmls(conn, "XML_CONTAS_PAGAR", desde_id=7)]
+
+    assert asyncio.run(cenario()) == [8, 9, 10]
+
+
+# ---------- listar_agentes ----------
+def test_listar_agentes_cai_para_parse_no_cliente(banco):
+    xmls = [
+        _xml_agente("Ana", "529.982.247-25"),
+        "<Agente><Nome>quebrado</Agente>",
+        _xml_agente("Bruno", "111.444.777-35"),
+    ]
+    banco.popular("XML_AGENTES", xmls)
+    banco.xmltable_indisponivel = True
+
+    async def cenario():
+        conn = await _conectar()
+        return await db_async.listar_agentes(conn)
+
+    agentes = asyncio.run(cenario())
+
+    assert agentes == [dados_agente(3, xmls[2]), dados_agente(2, xmls[1]), dados_agente(1, xmls[0])]
+    assert [a["valido"] for a in agentes] == [True, False, True]
+
+
+def test_listar_agentes_no_cliente_le_so_as_linhas_novas(banco):
+    banco.popular("XML_AGENTES", [_xml_agente(f"Agente{i}", "529.982.247-25") for i in range(1, 1001)])
+    banco.xmltable_indisponivel = True
+
+    async def cenario():
+        conn = await _conectar()
+        fake_oracledb.zerar_contagem()
+        return await db_async.listar_agentes(conn, desde_id=997)
+
+    agentes = asyncio.run(cenario())
+
+    assert [a["id"] for a in agentes] == [1000, 999, 998]
+    assert "WHERE ID > :desde_id" in banco.consultas[-1]
+    # Consulta XMLTABLE rejeitada + uma consulta pela PK
+    assert fake_oracledb.IDAS_E_VOLTAS == 2
+
+
+# ---------- executar_concorrente ----------
+def test_executar_concorrente_limita_e_mantem_a_ordem(banco):
+    ativos = 0
+    maximo = 0
+
+    async def dobrar(conn, item):
+        nonlocal ativos, maximo
+        ativos += 1
+        maximo = max(maximo, ativos)
+        # Os primeiros itens terminam por último
+        await asyncio.sleep(0.001 * (10 - item))
+        ativos -= 1
+        return item * 2
+
+    async def cenario():
+        pool = db_async.criar_pool("usuario", "senha", "host:1521/servico", maximo=3)
+        resultados = await db_async.executar_concorrente(pool, dobrar, iter(range(10)), concorrencia=3)
+        return pool, resultados
+
+    pool, resultados = asyncio.run(cenario())
+
+    assert resultados == [item * 2 for item in range(10)]
+    assert maximo == 3
+    assert pool.emprestadas == 0
+
+
+def test_executar_concorrente_cancela_as_demais_na_falha(banco):
+    iniciados = []
+    concluidos = []
+
+    async def processar(conn, item):
+        iniciados.append(item)
+        if item == 1:
+            await asyncio.sleep(0.01)
+            raise ValueError("falhou o item 1")
+        await asyncio.sleep(1)
+        concluidos.append(item)
+        return item
+
+    async def cenario():
+        pool = db_async.criar_pool("usuario", "senha", "host:1521/servico", maximo=3)
+        with pytest.raises(ValueError, match="item 1"):
+            await db_async.executar_concorrente(pool, processar, range(10), concorrencia=3)
+        return pool
+
+    pool = asyncio.run(cenario())
+
+    # Nenhum item novo começa depois da falha e os que estavam em andamento são cancelados
+    assert sorted(iniciados) == [0, 1, 2]
+    assert concluidos == []
+    assert pool.emprestadas == 0
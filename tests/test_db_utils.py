@@ -0,0 +1,124 @@
+"""Testes de utils/db_utils.py sobre benchmarks/fake_oracledb.py"""
+
+import pytest
+
+from benchmarks import fake_oracledb
+from utils import db_utils
+
+
+class LobFalso:
+    """
+    CLOB com a semântica do Oracle: offset (a partir de 1) e quantidade em
+    unidades UTF-16; nunca devolve meio par substituto.
+    """
+
+    def __init__(self, texto, chunk=4):
+        self.unidades = texto.encode("utf-16-le")
+        self.chunk = chunk
+        self.leituras = []
+
+    def getchunksize(self):
+        return self.chunk
+
+    def read(self, offset, amount):
+        self.leituras.append((offset, amount))
+        inicio = (offset - 1) * 2
+        fim = min(inicio + amount * 2, len(self.unidades))
+        # Termina em um substituto alto: deixa o par inteiro para a próxima leitura
+        if fim < len(self.unidades) and 0xD800 <= int.from_bytes(self.unidades[fim - 2:fim], "little") <= 0xDBFF:
+            fim -= 2
+        return self.unidades[inicio:fim].decode("utf-16-le")
+
+
+def test_ler_lob_em_pedacos_com_caracteres_fora_do_bmp():
+    texto = "<Agente><Nome>" + "Ana 😀 李 𠀋 " * 50 + "</Nome></Agente>"
+    lob = LobFalso(texto)
+
+    pedacos = list(db_utils.ler_lob_em_pedacos(lob, tamanho=8))
+
+    assert "".join(pedacos) == texto
+    # Cada leitura começa onde a anterior terminou, contando em unidades UTF-16
+    for (offset, _), (proximo, _), pedaco in zip(lob.leituras, lob.leituras[1:], pedacos):
+        assert proximo == offset + len(pedaco.encode("utf-16-le")) // 2
+
+
+def test_ler_lob_em_pedacos_arredonda_para_o_chunk():
+    lob = LobFalso("x" * 100, chunk=16)
+
+    pedacos = list(db_utils.ler_lob_em_pedacos(lob, tamanho=40))
+
+    assert [len(p) for p in pedacos] == [32, 32, 32, 4]
+
+
+def test_ler_lob_em_pedacos_aceita_texto_e_none():
+    assert list(db_utils.ler_lob_em_pedacos("abcdefg", tamanho=3)) == ["abc", "def", "g"]
+    assert list(db_utils.ler_lob_em_pedacos(None)) == []
+
+
+def test_transmitir_xml_entrega_pedacos(banco, tmp_path):
+    documento = "<Agente>" + "é😀" * 1000 + "</Agente>"
+    banco.popular("XML_CONTAS_PAGAR", [documento])
+    conn = db_utils.conectar_oracle("usuario", "senha", "host:1521/servico")
+    pedacos = []
+
+    assert db_utils.transmitir_xml(conn, "XML_CONTAS_PAGAR", 1, pedacos.append, tamanho=500) == len(documento)
+    assert len(pedacos) > 1 and "".join(pedacos) == documento
+    assert db_utils.transmitir_xml(conn, "XML_CONTAS_PAGAR", 2, pedacos.append) is None
+
+    caminho = tmp_path / "conta.xml"
+    assert db_utils.salvar_xml_em_arquivo(conn, "XML_CONTAS_PAGAR", 1, str(caminho)) == len(documento)
+    assert caminho.read_text(encoding="utf-8") == documento
+    assert db_utils.salvar_xml_em_arquivo(conn, "XML_CONTAS_PAGAR", 2, str(tmp_path / "nada.xml")) is None
+    assert not (tmp_path / "nada.xml").exists()
+
+
+def test_listar_agentes_guarda_os_valores_do_xml(banco):
+    # Sem Nome/TipoPessoa e XML inválido: campos vazios, nunca os textos de exibição da tela
+    banco.popular("XML_AGENTES", [
+        "<Agente><CPF>529.982.247-25</CPF><Email>a@exemplo.com.br</Email></Agente>",
+        "<Agente><Nome>quebrado</Agente>",
+    ])
+    conn = db_utils.conectar_oracle("usuario", "senha", "host:1521/servico")
+
+    for indisponivel in (False, True):
+        banco.xmltable_indisponivel = indisponivel
+        sem_nome, invalido = sorted(db_utils.listar_agentes(conn), key=lambda a: a["id"])
+
+        assert (sem_nome["nome"], sem_nome["tipo_pessoa"], sem_nome["valido"]) == ("", "", True)
+        assert sem_nome["documento"] == "529.982.247-25"
+        assert (invalido["nome"], invalido["tipo_pessoa"], invalido["valido"]) == ("", "", False)
+
+
+def test_listar_agentes_no_cliente_le_so_as_linhas_novas(banco):
+    banco.popular("XML_AGENTES", [f"<Agente><Nome>Agente {i}</Nome></Agente>" for i in range(1, 1001)])
+    banco.xmltable_indisponivel = True
+    conn = db_utils.conectar_oracle("usuario", "senha", "host:1521/servico")
+    fake_oracledb.zerar_contagem()
+
+    agentes = db_utils.listar_agentes(conn, desde_id=995)
+
+    assert [a["id"] for a in agentes] == [1000, 999, 998, 997, 996]
+    assert agentes[0]["nome"] == "Agente 1000"
+    assert "WHERE ID > :desde_id" in banco.consultas[-1]
+    # Consulta XMLTABLE rejeitada + uma consulta pela PK (sem varrer as 995 linhas antigas)
+    assert fake_oracledb.IDAS_E_VOLTAS == 2
+
+
+def test_salvar_xml_em_arquivo_preserva_o_arquivo_existente(banco, tmp_path, monkeypatch):
+    banco.popular("XML_CONTAS_PAGAR", ["<ContaPagar><Valor>10.00</Valor></ContaPagar>"])
+    conn = db_utils.conectar_oracle("usuario", "senha", "host:1521/servico")
+    caminho = tmp_path / "existente.xml"
+    caminho.write_text("conteúdo anterior", encoding="utf-8")
+
+    # ID inexistente (ex.: excluído depois de aberto o visualizador)
+    assert db_utils.salvar_xml_em_arquivo(conn, "XML_CONTAS_PAGAR", 2, str(caminho)) is None
+    assert caminho.read_text(encoding="utf-8") == "conteúdo anterior"
+
+    # Falha no meio da leitura
+    def falhar(*args):
+        raise fake_oracledb.DatabaseError("ORA-03113: end-of-file on communication channel")
+    monkeypatch.setattr(db_utils, "transmitir_xml", falhar)
+    with pytest.raises(fake_oracledb.DatabaseError):
+        db_utils.salvar_xml_em_arquivo(conn, "XML_CONTAS_PAGAR", 1, str(caminho))
+    assert caminho.read_text(encoding="utf-8") == "conteúdo anterior"
+    assert [p.name for p in tmp_path.iterdir()] == ["existente.xml"]
@@ -0,0 +1,26 @@
+"""Testes de utils/xml_utils.py: o serializador pré-compilado contra o caminho genérico"""
+
+import pytest
+
+from utils.xml_utils import CAMPOS_AGENTE_PF, CAMPOS_CONTA_PAGAR, _partes_xml, gerar_xml_pretty
+
+VALORES = ["Ana", "", None, "Comércio & Serviços <Irmãos> \"Silva\"", "linha 1\r\nlinha 2\rfim",
+           "coluna\tcoluna\nlinha", "emoji 😀 e 𠀋", "100% > 50%"]
+
+
+@pytest.mark.parametrize("root_tag, campos", [("Agente", CAMPOS_AGENTE_PF), ("ContaPagar", CAMPOS_CONTA_PAGAR)])
+def test_serializador_igual_ao_caminho_generico(root_tag, campos):
+    # Cada valor em cada posição, inclusive campos vazios seguidos e no começo e no fim
+    for deslocamento in range(len(VALORES)):
+        dados = {campo: VALORES[(i + deslocamento) % len(VALORES)] for i, campo in enumerate(campos)}
+        assert gerar_xml_pretty(root_tag, dados) == "".join(_partes_xml(root_tag, dados))
+    vazios = dict.fromkeys(campos, "")
+    assert gerar_xml_pretty(root_tag, vazios) == "".join(_partes_xml(root_tag, vazios))
+
+
+def test_serializador_rejeita_o_que_o_caminho_generico_rejeita():
+    dados = dict.fromkeys(CAMPOS_AGENTE_PF, "x")
+    with pytest.raises(ValueError):
+        gerar_xml_pretty("Agente", dict(dados, Nome="controle \x01"))
+    with pytest.raises(TypeError):
+        gerar_xml_pretty("Agente", dict(dados, Telefone=11987654321))
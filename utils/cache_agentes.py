@@ -0,0 +1,244 @@
+"""
+utils/cache_agentes.py
+Cache em memória dos agentes de XML_AGENTES (id, nome, tipo, CPF/CNPJ e e-mail).
+
+A primeira atualização lê a tabela inteira; as seguintes buscam apenas as
+linhas com ID maior que o último já visto menos JANELA_REVISAO (consulta pela
+PK), então reabrir a seleção de agentes não refaz o scan nem o parse da
+tabela. A janela existe porque os IDs da sequência não são confirmados em
+ordem: uma sessão pode gravar o ID 100 e confirmar depois de outra ter
+confirmado o 101. Linhas confirmadas com ID até JANELA_REVISAO abaixo do
+maior já visto ainda entram no cache; mais atrasadas que isso, só com
+recarregar. Agentes gravados por salvar_xml entram no cache na hora.
+
+Memória: os XMLs completos ficam em um LRU limitado por quantidade de
+caracteres; os dados dos agentes (algumas centenas de bytes cada), por
+quantidade de agentes (LIMITE_AGENTES). Se a tabela passa do limite, o cache
+descarta os agentes e `excedido` fica True: a seleção de agentes volta a
+buscar no banco (buscar_agentes).
+
+Os agentes só são incluídos pela aplicação (não há alteração nem exclusão);
+para refletir mudanças feitas direto no banco use recarregar.
+"""
+
+import threading
+from collections import OrderedDict
+
+from utils.consultas import dados_agente
+from utils.indice_agentes import IndiceAgentes
+
+LIMITE_CARACTERES_XML = 8 * 1024 * 1024
+LIMITE_AGENTES = 200_000
+# IDs abaixo do maior já visto relidos a cada atualização (confirmações fora de ordem)
+JANELA_REVISAO = 500
+
+
+class CacheAgentes:
+    """Cache de agentes com atualização incremental por ID; seguro entre threads"""
+
+    def __init__(self, limite_caracteres_xml=LIMITE_CARACTERES_XML, limite_agentes=LIMITE_AGENTES,
+                 janela_revisao=JANELA_REVISAO):
+        self.limite_caracteres_xml = limite_caracteres_xml
+        self.limite_agentes = limite_agentes
+        self.janela_revisao = janela_revisao
+        self._trava = threading.RLock()
+        self._agentes = {}
+        self._lista = None          # agentes ordenados por ID decrescente (refeita sob demanda)
+        self._indice = None         # IndiceAgentes de _lista (refeito sob demanda)
+        self._ultimo_id = None      # maior ID lido do banco
+        self._carregado = False
+        self._excedido = False      # tabela maior que limite_agentes: agentes não ficam em cache
+        self._xmls = OrderedDict()  # LRU: id -> XML completo
+        self._caracteres_xml = 0
+
+    @property
+    def ultimo_id(self):
+        return self._ultimo_id
+
+    @property
+    def carregado(self):
+        """True depois da primeira leitura do banco (se a tabela coube no cache)"""
+        return self._carregado and not self._excedido
+
+    @property
+    def excedido(self):
+        """True se XML_AGENTES tem mais agentes que limite_agentes"""
+        return self._excedido
+
+    # ---------- AGENTES ----------
+    def atualizar(self, conn):
+        """
+        Busca no banco os agentes com ID maior que o último visto (menos a
+        janela de revisão) e retorna a lista completa (mesmo formato de
+        db_utils.listar_agentes). Com a tabela acima de limite_agentes, não
+        consulta nada e retorna [].
+        """
+        # Importado aqui: o módulo pode ser usado sem carregar o Oracle Client
+        from utils.db_utils import contar_xmls, listar_agentes
+
+        with self._trava:
+            if self._excedido:
+                return []
+            ultimo_id = self._ultimo_id
+        if ultimo_id is None:
+            # Primeira carga: confere o tamanho da tabela antes de trazer os agentes
+            if contar_xmls(conn, "XML_AGENTES") > self.limite_agentes:
+                with self._trava:
+                    self._exceder()
+                return []
+            novos = listar_agentes(conn)
+        else:
+            novos = listar_agentes(conn, desde_id=max(ultimo_id - self.janela_revisao, 0))
+        with self._trava:
+            if self._ultimo_id == ultimo_id and not self._excedido:
+                # Os relidos da janela substituem os mesmos IDs
+                self._incluir(novos)
+                if novos:
+                    self._ultimo_id = max(ultimo_id or 0, max(a["id"] for a in novos))
+                self._carregado = True
+                if len(self._agentes) > self.limite_agentes:
+                    self._exceder()
+            return self.agentes()
+
+    def recarregar(self, conn):
+        """Descarta os agentes em cache e lê a tabela inteira de novo"""
+        with self._trava:
+            self._descartar_agentes()
+        return self.atualizar(conn)
+
+    def agentes(self):
+        """Agentes em cache, em ordem decrescente de ID (sem consultar o banco)"""
+        with self._trava:
+            if self._lista is None:
+                self._lista = sorted(self._agentes.values(), key=lambda a: a["id"], reverse=True)
+            return list(self._lista)
+
+    def indice(self):
+        """
+        Índice de busca dos agentes em cache; só é reconstruído se a lista
+        mudou. None se o cache foi excedido (a busca deve ir ao banco).
+        """
+        with self._trava:
+            if self._excedido:
+                return None
+            if self._indice is None:
+                self._indice = IndiceAgentes(self.agentes())
+            return self._indice
+
+    def atualizar_indice(self, conn):
+        """atualizar seguido de indice (para rodar de uma vez em segundo plano)"""
+        self.atualizar(conn)
+        return self.indice()
+
+    def obter(self, id_val):
+        """Agente em cache com o ID informado, ou None"""
+        with self._trava:
+            return self._agentes.get(id_val)
+
+    def registrar(self, id_val, xml_conteudo):
+        """
+        Inclui no cache um agente recém-gravado. O último ID visto não muda,
+        para que agentes gravados por outras sessões antes deste não sejam pulados.
+        """
+        with self._trava:
+            if not self._excedido:
+                self._incluir([dados_agente(id_val, xml_conteudo)])
+                if len(self._agentes) > self.limite_agentes:
+                    self._exceder()
+            self._guardar_xml(id_val, xml_conteudo)
+
+    def limpar(self):
+        with self._trava:
+            self._descartar_agentes()
+            self._xmls.clear()
+            self._caracteres_xml = 0
+
+    def _descartar_agentes(self):
+        self._agentes.clear()
+        self._lista = None
+        self._indice = None
+        self._ultimo_id = None
+        self._carregado = False
+        self._excedido = False
+
+    def _exceder(self):
+        self._descartar_agentes()
+        self._excedido = True
+
+    def _incluir(self, agentes):
+        for agente in agentes:
+            self._agentes[agente["id"]] = agente
+        if agentes:
+            self._lista = None
+            self._indice = None
+
+    # ---------- XML COMPLETO (LRU) ----------
+    def obter_xml(self, conn, id_val):
+        """XML completo do agente: do LRU ou, se ausente, do banco (e guardado no LRU)"""
+        with self._trava:
+            xml = self._xmls.get(id_val)
+            if xml is not None:
+                self._xmls.move_to_end(id_val)
+                return xml
+
+        from utils.db_utils import obter_xml
+
+        xml = obter_xml(conn, "XML_AGENTES", id_val)
+        if xml is not None:
+            with self._trava:
+                self._guardar_xml(id_val, xml)
+        return xml
+
+    def transmitir_xml(self, conn, id_val, consumidor, tamanho=None):
+        """
+        Como db_utils.transmitir_xml, nos mesmos pedaços de `tamanho`
+        caracteres (padrão: TAMANHO_PEDACO_LOB) também quando o documento vem
+        do LRU. Do banco, guarda no LRU apenas documentos que cabem nele.
+        """
+        from utils.db_utils import TAMANHO_PEDACO_LOB, ler_lob_em_pedacos, transmitir_xml
+
+        tamanho = tamanho or TAMANHO_PEDACO_LOB
+        with self._trava:
+            xml = self._xmls.get(id_val)
+            if xml is not None:
+                self._xmls.move_to_end(id_val)
+        if xml is not None:
+            for pedaco in ler_lob_em_pedacos(xml, tamanho):
+                consumidor(pedaco)
+            return len(xml)
+
+        pedacos = []
+        guardados = 0
+
+        def repassar(pedaco):
+            nonlocal pedacos, guardados
+            if pedacos is not None:
+                guardados += len(pedaco)
+                if guardados <= self.limite_caracteres_xml:
+                    pedacos.append(pedaco)
+                else:
+                    # Maior que o LRU: deixa de acumular (o documento não seria guardado)
+                    pedacos = None
+            consumidor(pedaco)
+
+        total = transmitir_xml(conn, "XML_AGENTES", id_val, repassar, tamanho)
+        if pedacos is not None and total is not None:
+            with self._trava:
+                self._guardar_xml(id_val, "".join(pedacos))
+        return total
+
+    def _guardar_xml(self, id_val, xml):
+        if len(xml) > self.limite_caracteres_xml:
+            return
+        anterior = self._xmls.pop(id_val, None)
+        if anterior is not None:
+            self._caracteres_xml -= len(anterior)
+        self._xmls[id_val] = xml
+        self._caracteres_xml += len(xml)
+        while self._caracteres_xml > self.limite_caracteres_xml:
+            _, removido = self._xmls.popitem(last=False)
+            self._caracteres_xml -= len(removido)
+
+
+# Instância usada pelas telas e por salvar_xml
+CACHE_AGENTES = CacheAgentes()
@@ -0,0 +1,331 @@
+"""
+utils/consultas.py
+SQL e conversão de linhas compartilhados por utils/db_utils.py (síncrono)
+e utils/db_async.py (asyncio).
+Não abre conexões nem inicializa o Oracle Client.
+"""
+
+import re
+import xml.etree.ElementTree as ET
+
+import oracledb
+
+# ---------- XMLTABLE DOS ÍNDICES ----------
+# Os XMLTABLE abaixo devem ser idênticos aos dos índices estruturados criados
+# em Scripts/migracoes (V001 e V002): assim o Oracle responde a partir das
+# tabelas de conteúdo indexadas em vez de avaliar o XML linha a linha.
+XMLTABLE_AGENTES = """XMLTABLE('/Agente' PASSING a.XML_CONTEUDO
+                 COLUMNS NOME        VARCHAR2(4000) PATH 'Nome',
+                         TIPO_PESSOA VARCHAR2(100)  PATH 'TipoPessoa',
+                         CPF         VARCHAR2(100)  PATH 'CPF',
+                         CNPJ        VARCHAR2(100)  PATH 'CNPJ',
+                         EMAIL       VARCHAR2(4000) PATH 'Email') x"""
+
+XMLTABLE_CONTAS_PAGAR = """XMLTABLE('/ContaPagar' PASSING c.XML_CONTEUDO
+                 COLUMNS AGENTE_ID       VARCHAR2(100) PATH 'AgenteID',
+                         CNPJ_CPF        VARCHAR2(100) PATH 'CNPJ_CPF',
+                         DATA_VENCIMENTO VARCHAR2(100) PATH 'DataVencimento') x"""
+
+# Mesma expressão do índice IX_XML_CONTAS_PAGAR_VENC
+DATA_VENCIMENTO = "TO_DATE(x.DATA_VENCIMENTO DEFAULT NULL ON CONVERSION ERROR, 'DD/MM/YYYY')"
+
+
+# ---------- CONVERSÕES ----------
+def texto_lob(valor):
+    """Converte o valor lido (LOB, string ou None) em string"""
+    if hasattr(valor, "read"):
+        return valor.read()
+    return str(valor) if valor is not None else ""
+
+
+def clob_como_texto(cursor, metadata):
+    """Output type handler: traz CLOBs já como string, sem uma leitura de LOB por linha"""
+    if metadata.type_code is oracledb.DB_TYPE_CLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG, arraysize=cursor.arraysize)
+
+
+def montar_preview(trecho, tamanho):
+    """Aplica o corte do preview (o SQL traz um caractere a mais para indicar truncamento)"""
+    trecho = trecho or ""
+    if len(trecho) > tamanho:
+        return trecho[:tamanho] + "..."
+    return trecho
+
+
+def formatar_documento(documento: str):
+    """Converte CPF/CNPJ em qualquer formato para as máscaras usadas nos XMLs: (cpf, cnpj)"""
+    d = re.sub(r"\D", "", documento or "")
+    if len(d) == 11:
+        return f"{d[:3]}.{d[3:6]}.{d[6:9]}-{d[9:]}", None
+    if len(d) == 14:
+        return None, f"{d[:2]}.{d[2:5]}.{d[5:8]}/{d[8:12]}-{d[12:]}"
+    return None, None
+
+
+def montar_agente(id_val, nome, tipo_pessoa, documento, email, valido=True):
+    """Dicionário do agente com os valores do XML (textos de exibição ficam na tela de seleção)"""
+    return {
+        "id": id_val,
+        "nome": nome or "",
+        "tipo_pessoa": tipo_pessoa or "",
+        "documento": documento or "",
+        "email": email or "",
+        "valido": valido,
+    }
+
+
+def dados_agente(id_val, xml_text):
+    """Extrai no cliente os campos de um agente a partir do XML completo"""
+    nome = tipo_pessoa = documento = email = ""
+    valido = True
+    try:
+        root = ET.fromstring(xml_text)
+        nome = root.findtext("Nome", "").strip()
+        tipo_pessoa = root.findtext("TipoPessoa", "").strip()
+        documento = root.findtext("CNPJ", root.findtext("CPF", "")).strip()
+        email = root.findtext("Email", "").strip()
+    except Exception:
+        nome = tipo_pessoa = documento = email = ""
+        valido = False
+    return montar_agente(id_val, nome, tipo_pessoa, documento, email, valido)
+
+
+def agente_da_linha(linha):
+    """Converte uma linha de SQL_LISTAR_AGENTES/sql_buscar_agentes em dicionário"""
+    id_val, nome, tipo_pessoa, cpf, cnpj, email = linha[:6]
+    xml_val = linha[6] if len(linha) > 6 else None
+    if xml_val is not None:
+        return dados_agente(id_val, texto_lob(xml_val))
+    return montar_agente(
+        id_val, (nome or "").strip(), (tipo_pessoa or "").strip(),
+        (cnpj or cpf or "").strip(), (email or "").strip(),
+    )
+
+
+def conta_da_linha(linha):
+    """Converte uma linha de sql_listar_contas_pagar em dicionário"""
+    id_val, agente, doc, venc = linha
+    return {"id": id_val, "agente_id": agente, "cnpj_cpf": doc or "", "data_vencimento": venc or ""}
+
+
+# ---------- SQL ----------
+def sql_inserir_xml(tabela: str, retornar_id: bool = False):
+    """INSERT usado na gravação de um ou vários documentos (com retornar_id, devolve o ID em :id)"""
+    retorno = "RETURNING ID INTO :id" if retornar_id else ""
+    return f"""
+        INSERT INTO {tabela} (ID, XML_CONTEUDO)
+        VALUES (SEQ_{tabela}.NEXTVAL, XMLType(:xml))
+        {retorno}
+    """
+
+
+def sql_listar_xmls(tabela: str):
+    return f"""
+        SELECT ID,
+               XMLSERIALIZE(CONTENT XML_CONTEUDO AS CLOB) AS XML_TEXTO
+        FROM {tabela}
+        ORDER BY ID DESC
+    """
+
+
+def sql_xmls_desde(tabela: str):
+    """Documentos com ID maior que :desde_id, em ordem crescente de ID"""
+    return f"""
+        SELECT ID,
+               XMLSERIALIZE(CONTENT XML_CONTEUDO AS CLOB) AS XML_TEXTO
+        FROM {tabela}
+        WHERE ID > :desde_id
+        ORDER BY ID
+    """
+
+
+def _filtro_intervalo(id_de, id_ate):
+    """Cláusula WHERE e binds de um intervalo de IDs (limites inclusivos, opcionais)"""
+    condicoes, binds = [], {}
+    if id_de is not None:
+        condicoes.append("ID >= :id_de")
+        binds["id_de"] = id_de
+    if id_ate is not None:
+        condicoes.append("ID <= :id_ate")
+        binds["id_ate"] = id_ate
+    filtro = "WHERE " + " AND ".join(condicoes) if condicoes else ""
+    return filtro, binds
+
+
+def sql_xmls_intervalo(tabela: str, id_de=None, id_ate=None):
+    """Documentos de um intervalo de IDs, em ordem crescente: retorna (sql, binds)"""
+    filtro, binds = _filtro_intervalo(id_de, id_ate)
+    sql = f"""
+        SELECT ID,
+               XMLSERIALIZE(CONTENT XML_CONTEUDO AS CLOB) AS XML_TEXTO
+        FROM {tabela}
+        {filtro}
+        ORDER BY ID
+    """
+    return sql, binds
+
+
+def sql_contar_xmls(tabela: str, id_de=None, id_ate=None):
+    """Quantidade de documentos do intervalo (só o índice da PK): retorna (sql, binds)"""
+    filtro, binds = _filtro_intervalo(id_de, id_ate)
+    return f"SELECT COUNT(*) FROM {tabela} {filtro}", binds
+
+
+def sql_pagina_xmls(tabela: str, apos_id, limite: int):
+    """Página por chave (ID decrescente): retorna (sql, binds)"""
+    filtro = "WHERE ID < :apos_id" if apos_id is not None else ""
+    sql = f"""
+        SELECT ID,
+               XMLSERIALIZE(CONTENT XML_CONTEUDO AS CLOB) AS XML_TEXTO
+        FROM {tabela}
+        {filtro}
+        ORDER BY ID DESC
+        FETCH FIRST :limite ROWS ONLY
+    """
+    binds = {"limite": limite}
+    if apos_id is not None:
+        binds["apos_id"] = apos_id
+    return sql, binds
+
+
+def sql_pagina_previews(tabela: str, apos_id, limite: int, tamanho: int):
+    """Página de previews cortados no servidor: retorna (sql, binds)"""
+    filtro = "WHERE ID < :apos_id" if apos_id is not None else ""
+    sql = f"""
+        SELECT ID,
+               DBMS_LOB.SUBSTR(XMLSERIALIZE(CONTENT XML_CONTEUDO AS CLOB), :tamanho, 1) AS PREVIEW
+        FROM {tabela}
+        {filtro}
+        ORDER BY ID DESC
+        FETCH FIRST :limite ROWS ONLY
+    """
+    # Um caractere a mais indica se o documento foi truncado
+    binds = {"limite": limite, "tamanho": tamanho + 1}
+    if apos_id is not None:
+        binds["apos_id"] = apos_id
+    return sql, binds
+
+
+def sql_obter_xml(tabela: str):
+    return f"""
+        SELECT XMLSERIALIZE(CONTENT XML_CONTEUDO AS CLOB)
+        FROM {tabela}
+        WHERE ID = :id
+    """
+
+
+def consulta_texto(termo: str):
+    """
+    Converte o termo digitado em consulta Oracle Text: todas as palavras
+    devem aparecer, cada uma entre chaves (sem operadores nem curingas).
+    Retorna None se não sobrar nenhuma palavra.
+    """
+    palavras = [p.replace("{", "").replace("}", "") for p in (termo or "").split()]
+    palavras = [p for p in palavras if p]
+    if not palavras:
+        return None
+    return " AND ".join("{" + p + "}" for p in palavras)
+
+
+def sql_buscar_xmls(tabela: str, termo: str, limite: int, deslocamento: int, tamanho: int):
+    """
+    Busca por conteúdo no índice CONTEXT (Scripts/migracoes/V003), ordenada
+    por relevância: retorna (sql, binds) ou None se o termo é vazio.
+    """
+    consulta = consulta_texto(termo)
+    if consulta is None:
+        return None
+    sql = f"""
+        SELECT ID, SCORE(1) AS RELEVANCIA,
+               DBMS_LOB.SUBSTR(XMLSERIALIZE(CONTENT XML_CONTEUDO AS CLOB), :tamanho, 1) AS PREVIEW
+        FROM {tabela}
+        WHERE CONTAINS(XML_CONTEUDO, :consulta, 1) > 0
+        ORDER BY RELEVANCIA DESC, ID DESC
+        OFFSET :deslocamento ROWS FETCH NEXT :limite ROWS ONLY
+    """
+    binds = {"consulta": consulta, "limite": limite, "deslocamento": deslocamento, "tamanho": tamanho + 1}
+    return sql, binds
+
+
+def sem_indice_texto(erro) -> bool:
+    """True se o erro do banco indica que a coluna não tem índice Oracle Text"""
+    # ORA-20000 com DRG-10599: a coluna não está indexada (migração V003 não aplicada)
+    return "DRG-10599" in str(erro)
+
+
+def sql_listar_agentes(desde_id=None):
+    """
+    Agentes com os campos projetados por XMLTABLE, opcionalmente só os de
+    ID maior que `desde_id`: retorna (sql, binds).
+    Linhas cujo XML não tem a raiz /Agente voltam com o documento completo
+    para o parse no cliente.
+    """
+    filtro = "WHERE a.ID > :desde_id" if desde_id is not None else ""
+    sql = f"""
+        SELECT a.ID, x.NOME, x.TIPO_PESSOA, x.CPF, x.CNPJ, x.EMAIL,
+               CASE WHEN x.NOME IS NULL AND x.TIPO_PESSOA IS NULL
+                    THEN XMLSERIALIZE(CONTENT a.XML_CONTEUDO AS CLOB)
+               END AS XML_TEXTO
+        FROM XML_AGENTES a
+        LEFT OUTER JOIN {XMLTABLE_AGENTES}
+            ON 1 = 1
+        {filtro}
+        ORDER BY a.ID DESC
+    """
+    return sql, ({"desde_id": desde_id} if desde_id is not None else {})
+
+
+def sql_buscar_agentes(nome: str = None, documento: str = None, limite: int = 50):
+    """Busca por prefixo do nome e/ou CPF/CNPJ: retorna (sql, binds) ou None se não há filtro válido"""
+    condicoes = []
+    binds = {"limite": limite}
+    if nome:
+        prefixo = nome.strip().upper().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        condicoes.append("UPPER(x.NOME) LIKE :prefixo ESCAPE '\\'")
+        binds["prefixo"] = prefixo + "%"
+    if documento:
+        cpf, cnpj = formatar_documento(documento)
+        if cpf:
+            condicoes.append("x.CPF = :cpf")
+            binds["cpf"] = cpf
+        elif cnpj:
+            condicoes.append("x.CNPJ = :cnpj")
+            binds["cnpj"] = cnpj
+        else:
+            return None
+    if not condicoes:
+        return None
+
+    sql = f"""
+        SELECT a.ID, x.NOME, x.TIPO_PESSOA, x.CPF, x.CNPJ, x.EMAIL
+        FROM XML_AGENTES a, {XMLTABLE_AGENTES}
+        WHERE {" AND ".join(condicoes)}
+        ORDER BY a.ID DESC
+        FETCH FIRST :limite ROWS ONLY
+    """
+    return sql, binds
+
+
+def sql_listar_contas_pagar(agente_id=None, vencimento_de=None, vencimento_ate=None, limite: int = 500):
+    """Contas por agente e/ou intervalo de vencimento: retorna (sql, binds)"""
+    condicoes = []
+    binds = {"limite": limite}
+    if agente_id is not None:
+        condicoes.append("x.AGENTE_ID = :agente_id")
+        binds["agente_id"] = str(agente_id)
+    if vencimento_de is not None:
+        condicoes.append(f"{DATA_VENCIMENTO} >= :vencimento_de")
+        binds["vencimento_de"] = vencimento_de
+    if vencimento_ate is not None:
+        condicoes.append(f"{DATA_VENCIMENTO} <= :vencimento_ate")
+        binds["vencimento_ate"] = vencimento_ate
+    filtro = ("WHERE " + " AND ".join(condicoes)) if condicoes else ""
+
+    sql = f"""
+        SELECT c.ID, x.AGENTE_ID, x.CNPJ_CPF, x.DATA_VENCIMENTO
+        FROM XML_CONTAS_PAGAR c, {XMLTABLE_CONTAS_PAGAR}
+        {filtro}
+        ORDER BY c.ID DESC
+        FETCH FIRST :limite ROWS ONLY
+    """
+    return sql, binds
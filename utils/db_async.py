@@ -0,0 +1,361 @@
+"""
+utils/db_async.py
+Versão asyncio de utils/db_utils.py, usando a API assíncrona do
+python-oracledb (connect_async / create_pool_async).
+Fornece: conectar_oracle, desconectar_oracle, testar_conexao,
+         criar_pool, fechar_pool, emprestar_conexao,
+         salvar_xml, salvar_xmls_lote, listar_xmls, iterar_xmls,
+         listar_xmls_pagina, listar_previews_pagina, obter_xml, buscar_xmls,
+         listar_agentes, buscar_agentes, listar_contas_pagar,
+         executar_concorrente, salvar_xmls_concorrente, obter_xmls_concorrente.
+
+As funções têm os mesmos parâmetros e retornos de db_utils, mas são
+corrotinas (iterar_xmls é um gerador assíncrono).
+
+A API assíncrona só existe no modo thin: este módulo não importa db_utils,
+que inicializa o Oracle Client (modo thick) na primeira conexão. Não use os
+dois módulos no mesmo processo.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from itertools import islice
+
+import oracledb
+
+from utils.consultas import (
+    agente_da_linha, clob_como_texto, conta_da_linha, dados_agente, montar_preview,
+    sem_indice_texto, sql_buscar_agentes, sql_buscar_xmls, sql_inserir_xml,
+    sql_listar_agentes, sql_listar_contas_pagar, sql_listar_xmls, sql_obter_xml,
+    sql_pagina_previews, sql_pagina_xmls, sql_xmls_desde, texto_lob,
+)
+from utils.indice_texto import TAMANHO_PREVIEW, indice_da_tabela
+
+CONCORRENCIA_PADRAO = 4
+
+
+# ---------- FUNÇÕES DE CONEXÃO ----------
+async def conectar_oracle(usuario: str, senha: str, tns: str):
+    """Abre e retorna uma oracledb.AsyncConnection (tns no formato "host:port/service_name")"""
+    return await oracledb.connect_async(user=usuario, password=senha, dsn=tns)
+
+
+async def desconectar_oracle(conn):
+    """Fecha a conexão se existir"""
+    try:
+        if conn:
+            await conn.close()
+    except Exception:
+        pass
+
+
+async def testar_conexao(conn):
+    """Retorna True se a conexão está válida"""
+    try:
+        cur = conn.cursor()
+        try:
+            await cur.execute("SELECT 1 FROM DUAL")
+        finally:
+            cur.close()
+        return True
+    except Exception:
+        return False
+
+
+# ---------- POOL DE CONEXÕES ----------
+def criar_pool(usuario: str, senha: str, tns: str, minimo: int = 1, maximo: int = 4,
+               incremento: int = 1, drcp: bool = False, cclass: str = "GERADOR_XML"):
+    """
+    Cria um pool assíncrono oracledb.AsyncConnectionPool (mesmos parâmetros de
+    db_utils.criar_pool). Para as funções *_concorrente, use `maximo` maior ou
+    igual à concorrência desejada.
+    """
+    parametros = {
+        "user": usuario,
+        "password": senha,
+        "dsn": tns,
+        "min": minimo,
+        "max": maximo,
+        "increment": incremento,
+        "getmode": oracledb.POOL_GETMODE_WAIT,
+    }
+    if drcp:
+        parametros.update(server_type="pooled", cclass=cclass, purity=oracledb.PURITY_SELF)
+    return oracledb.create_pool_async(**parametros)
+
+
+async def fechar_pool(pool):
+    """Fecha o pool (e as conexões ainda emprestadas) se existir"""
+    try:
+        if pool:
+            await pool.close(force=True)
+    except Exception:
+        pass
+
+
+@asynccontextmanager
+async def emprestar_conexao(pool):
+    """
+    Empresta uma conexão do pool durante o bloco `async with` e a devolve ao final.
+    Transações não confirmadas são desfeitas na devolução.
+    """
+    conn = await pool.acquire()
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
+
+
+# ---------- FUNÇÕES DE XML ----------
+async def salvar_xml(conn, tabela: str, xml_conteudo: str):
+    """Insere um XML na tabela informada e retorna o ID gerado"""
+    cur = conn.cursor()
+    try:
+        id_var = cur.var(oracledb.DB_TYPE_NUMBER)
+        await cur.execute(sql_inserir_xml(tabela, retornar_id=True), {"xml": xml_conteudo, "id": id_var})
+        await conn.commit()
+        return int(id_var.getvalue()[0])
+    finally:
+        cur.close()
+
+
+async def salvar_xmls_lote(conn, tabela: str, docs, batch_size: int = 500):
+    """
+    Insere vários XMLs com array DML (executemany), um commit por lote.
+    Retorna uma lista com None (gravado) ou a mensagem de erro do Oracle
+    para cada documento, na ordem de entrada.
+    """
+    sql = sql_inserir_xml(tabela)
+    resultados = []
+    docs = iter(docs)
+    cur = conn.cursor()
+    try:
+        while True:
+            lote = [(doc,) for doc in islice(docs, batch_size)]
+            if not lote:
+                break
+            cur.setinputsizes(oracledb.DB_TYPE_CLOB)
+            await cur.executemany(sql, lote, batcherrors=True)
+            erros_lote = [None] * len(lote)
+            for erro in cur.getbatcherrors():
+                erros_lote[erro.offset] = erro.message
+            await conn.commit()
+            resultados.extend(erros_lote)
+        return resultados
+    finally:
+        cur.close()
+
+
+async def listar_xmls(conn, tabela: str):
+    """Retorna lista de tuplas (ID, xml_texto); para tabelas grandes prefira iterar_xmls"""
+    return [item async for item in iterar_xmls(conn, tabela)]
+
+
+async def iterar_xmls(conn, tabela: str, arraysize: int = 500, prefetchrows: int = 501, desde_id=None):
+    """
+    Gera (async for) tuplas (ID, xml_texto) em ordem decrescente de ID, em blocos de `arraysize`.
+    Com `desde_id`, só os documentos de ID maior, em ordem crescente.
+    """
+    cur = conn.cursor()
+    try:
+        cur.arraysize = arraysize
+        cur.prefetchrows = prefetchrows
+        cur.outputtypehandler = clob_como_texto
+        if desde_id is None:
+            await cur.execute(sql_listar_xmls(tabela))
+        else:
+            await cur.execute(sql_xmls_desde(tabela), {"desde_id": desde_id})
+        async for id_val, xml_val in cur:
+            yield id_val, texto_lob(xml_val)
+    finally:
+        cur.close()
+
+
+async def listar_xmls_pagina(conn, tabela: str, apos_id=None, limite: int = 200):
+    """Página de tuplas (ID, xml_texto) por chave; `apos_id` é o último ID da página anterior"""
+    sql, binds = sql_pagina_xmls(tabela, apos_id, limite)
+    cur = conn.cursor()
+    try:
+        cur.arraysize = limite
+        cur.prefetchrows = limite + 1
+        cur.outputtypehandler = clob_como_texto
+        await cur.execute(sql, binds)
+        return [(id_val, texto_lob(xml_val)) for id_val, xml_val in await cur.fetchall()]
+    finally:
+        cur.close()
+
+
+async def listar_previews_pagina(conn, tabela: str, apos_id=None, limite: int = 200, tamanho: int = 150):
+    """Como listar_xmls_pagina, mas com previews de `tamanho` caracteres cortados no servidor"""
+    sql, binds = sql_pagina_previews(tabela, apos_id, limite, tamanho)
+    cur = conn.cursor()
+    try:
+        cur.arraysize = limite
+        cur.prefetchrows = limite + 1
+        await cur.execute(sql, binds)
+        return [(id_val, montar_preview(trecho, tamanho)) for id_val, trecho in await cur.fetchall()]
+    finally:
+        cur.close()
+
+
+async def obter_xml(conn, tabela: str, id_val):
+    """Retorna o XML completo do registro com o ID informado (None se não existir)"""
+    cur = conn.cursor()
+    try:
+        cur.outputtypehandler = clob_como_texto
+        await cur.execute(sql_obter_xml(tabela), {"id": id_val})
+        row = await cur.fetchone()
+        return texto_lob(row[0]) if row else None
+    finally:
+        cur.close()
+
+
+# ---------- BUSCA POR CONTEÚDO (Oracle Text) ----------
+async def buscar_xmls(conn, tabela: str, termo: str, limite: int = 50, deslocamento: int = 0):
+    """Busca por conteúdo, ordenada por relevância (ver db_utils.buscar_xmls)"""
+    consulta = sql_buscar_xmls(tabela, termo, limite, deslocamento, TAMANHO_PREVIEW)
+    if consulta is None:
+        return []
+    cur = conn.cursor()
+    try:
+        cur.arraysize = limite
+        cur.prefetchrows = limite + 1
+        await cur.execute(*consulta)
+        return [(id_val, relevancia, montar_preview(trecho, TAMANHO_PREVIEW))
+                for id_val, relevancia, trecho in await cur.fetchall()]
+    except oracledb.DatabaseError as e:
+        if not sem_indice_texto(e):
+            raise
+    finally:
+        cur.close()
+    return await buscar_xmls_local(conn, tabela, termo, limite, deslocamento)
+
+
+async def buscar_xmls_local(conn, tabela: str, termo: str, limite: int = 50, deslocamento: int = 0):
+    """Como buscar_xmls, no índice em memória (só lê do banco os documentos novos)"""
+    indice = indice_da_tabela(tabela)
+    async for id_val, xml_texto in iterar_xmls(conn, tabela, desde_id=indice.ultimo_id or 0):
+        indice.adicionar(id_val, xml_texto)
+    return indice.buscar(termo, limite, deslocamento)
+
+
+# ---------- CONSULTAS POR CAMPO (XMLIndex) ----------
+async def buscar_agentes(conn, nome: str = None, documento: str = None, limite: int = 50):
+    """Busca agentes pelo início do nome e/ou CPF/CNPJ (ver db_utils.buscar_agentes)"""
+    consulta = sql_buscar_agentes(nome, documento, limite)
+    if consulta is None:
+        return []
+    cur = conn.cursor()
+    try:
+        await cur.execute(*consulta)
+        return [agente_da_linha(linha) for linha in await cur.fetchall()]
+    finally:
+        cur.close()
+
+
+async def listar_contas_pagar(conn, agente_id=None, vencimento_de=None, vencimento_ate=None, limite: int = 500):
+    """Lista contas a pagar por agente e/ou vencimento (ver db_utils.listar_contas_pagar)"""
+    cur = conn.cursor()
+    try:
+        await cur.execute(*sql_listar_contas_pagar(agente_id, vencimento_de, vencimento_ate, limite))
+        return [conta_da_linha(linha) for linha in await cur.fetchall()]
+    finally:
+        cur.close()
+
+
+# ---------- LISTAR AGENTES ----------
+async def listar_agentes(conn, desde_id=None):
+    """
+    Retorna lista de agentes de XML_AGENTES, sem o XML (mesmo formato e
+    parâmetros de db_utils.listar_agentes). Cai para o parse no cliente se o
+    Oracle rejeitar a extração com XMLTABLE.
+    """
+    cur = conn.cursor()
+    try:
+        cur.arraysize = 1000
+        cur.outputtypehandler = clob_como_texto
+        await cur.execute(*sql_listar_agentes(desde_id))
+        return [agente_da_linha(linha) async for linha in cur]
+    except oracledb.DatabaseError:
+        pass
+    finally:
+        cur.close()
+    # Com desde_id, só as linhas novas saem do banco, em ordem crescente de ID
+    agentes = [dados_agente(id_val, xml_text)
+               async for id_val, xml_text in iterar_xmls(conn, "XML_AGENTES", desde_id=desde_id)]
+    if desde_id is not None:
+        agentes.reverse()
+    return agentes
+
+
+# ---------- CONCORRÊNCIA LIMITADA ----------
+async def executar_concorrente(pool, funcao, itens, concorrencia: int = CONCORRENCIA_PADRAO):
+    """
+    Executa `await funcao(conn, item)` para cada item, com no máximo
+    `concorrencia` execuções ao mesmo tempo, cada uma com sua própria conexão
+    emprestada do pool. Os itens são consumidos sob demanda (aceita geradores).
+    Retorna os resultados na ordem dos itens; se uma execução falhar, as
+    demais são canceladas e a exceção é propagada.
+    """
+    semaforo = asyncio.Semaphore(concorrencia)
+    falhas = []
+
+    async def executar(item):
+        try:
+            async with emprestar_conexao(pool) as conn:
+                return await funcao(conn, item)
+        except Exception as e:
+            falhas.append(e)
+            raise
+        finally:
+            semaforo.release()
+
+    tarefas = []
+    try:
+        for item in itens:
+            # Só lê o próximo item quando houver vaga: a memória fica limitada
+            await semaforo.acquire()
+            if falhas:
+                raise falhas[0]
+            tarefas.append(asyncio.ensure_future(executar(item)))
+        return list(await asyncio.gather(*tarefas))
+    except BaseException:
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+        raise
+
+
+async def salvar_xmls_concorrente(pool, tabela: str, docs, concorrencia: int = CONCORRENCIA_PADRAO,
+                                  batch_size: int = 500):
+    """
+    Como salvar_xmls_lote, mas grava até `concorrencia` lotes de `batch_size`
+    documentos ao mesmo tempo, em conexões diferentes do pool.
+    Retorna None ou a mensagem de erro de cada documento, na ordem de entrada.
+    """
+    docs = iter(docs)
+
+    def lotes():
+        while True:
+            lote = list(islice(docs, batch_size))
+            if not lote:
+                return
+            yield lote
+
+    async def gravar(conn, lote):
+        return await salvar_xmls_lote(conn, tabela, lote, batch_size)
+
+    resultados = []
+    for erros_lote in await executar_concorrente(pool, gravar, lotes(), concorrencia):
+        resultados.extend(erros_lote)
+    return resultados
+
+
+async def obter_xmls_concorrente(pool, tabela: str, ids, concorrencia: int = CONCORRENCIA_PADRAO):
+    """Busca vários XMLs completos em paralelo; retorna {id: xml_texto ou None}"""
+    ids = list(ids)
+
+    async def obter(conn, id_val):
+        return await obter_xml(conn, tabela, id_val)
+
+    return dict(zip(ids, await executar_concorrente(pool, obter, ids, concorrencia)))
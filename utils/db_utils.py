@@ -1,26 +1,63 @@
 """
 utils/db_utils.py
 Implementação usando python-oracledb (import as oracledb).
-Fornece: conectar_oracle, desconectar_oracle, testar_conexao,
-         salvar_xml, listar_xmls, listar_agentes.
+Fornece: inicializar_cliente_oracle, conectar_oracle, desconectar_oracle,
+         testar_conexao, criar_pool, fechar_pool, emprestar_conexao,
+         salvar_xml, salvar_xmls_lote, listar_xmls, iterar_xmls,
+         iterar_xmls_intervalo, contar_xmls, listar_xmls_pagina,
+         listar_previews_pagina, obter_xml, transmitir_xml,
+         salvar_xml_em_arquivo, buscar_xmls, listar_agentes, buscar_agentes,
+         listar_contas_pagar.
+
+As consultas por campo (agentes por nome/CPF/CNPJ, contas por agente ou
+vencimento) usam os índices XMLIndex criados pelas migrações de
+Scripts/migracoes (ver utils/migracoes.py).
+O SQL fica em utils/consultas.py, compartilhado com utils/db_async.py.
 """
 
+import os
+import threading
 import oracledb
-import xml.etree.ElementTree as ET
 from contextlib import contextmanager
+from itertools import islice
+
+from utils.consultas import (
+    agente_da_linha, clob_como_texto, conta_da_linha, dados_agente, montar_preview,
+    sem_indice_texto, sql_buscar_agentes, sql_buscar_xmls, sql_contar_xmls, sql_inserir_xml,
+    sql_listar_agentes, sql_listar_contas_pagar, sql_listar_xmls, sql_obter_xml,
+    sql_pagina_previews, sql_pagina_xmls, sql_xmls_desde, sql_xmls_intervalo, texto_lob,
+)
+from utils.indice_texto import TAMANHO_PREVIEW, indice_da_tabela
+from utils.metricas import fase, instrumentar, tamanho_bytes
+
+# ---------- INSTANT CLIENT (thick mode) ----------
+# Caminho do Oracle Instant Client usado no modo thick
+ORACLE_CLIENT_LIB_DIR = r"C:\oracle\instantclient_19_28"
+
+_cliente_inicializado = False
+_trava_cliente = threading.Lock()
 
-# ---------- CONFIGURAÇÃO OPCIONAL DO INSTANT CLIENT (thick mode) ----------
-# Se precisar usar o Instant Client (modo thick), descomente e ajuste o caminho:
-# oracledb.init_oracle_client(lib_dir=r"C:\oracle\instantclient_19_11")
 
-# Inicializa o Oracle Client (modo thick)
-try:
-    oracledb.init_oracle_client(lib_dir=r"C:\oracle\instantclient_19_28")
-except oracledb.ProgrammingError:
-    # Já inicializado ou ambiente configurado
-    pass
+def inicializar_cliente_oracle(lib_dir: str = None):
+    """
+    Inicializa o Oracle Client (modo thick) uma única vez por processo.
+    Chamado na primeira conexão (conectar_oracle/criar_pool), e não na
+    importação do módulo: carregar as bibliotecas do Instant Client atrasaria
+    a abertura da janela.
+    """
+    global _cliente_inicializado
+    with _trava_cliente:
+        if _cliente_inicializado:
+            return
+        try:
+            oracledb.init_oracle_client(lib_dir=lib_dir or ORACLE_CLIENT_LIB_DIR)
+        except oracledb.ProgrammingError:
+            # Já inicializado ou ambiente configurado
+            pass
+        _cliente_inicializado = True
 
 # ---------- FUNÇÕES DE CONEXÃO ----------
+@instrumentar("conectar_oracle")
 def conectar_oracle(usuario: str, senha: str, tns: str):
     """
     Abre e retorna uma conexão oracledb.Connection.
@@ -28,6 +65,7 @@ def conectar_oracle(usuario: str, senha: str, tns: str):
       - "host:port/service_name"  (ex: "localhost:1521/XEPDB1")
       - um alias TNS (se Instant Client e tnsnames.ora estiverem configurados)
     """
+    inicializar_cliente_oracle()
     conn = oracledb.connect(user=usuario, password=senha, dsn=tns)
     return conn
 
@@ -41,8 +79,9 @@ def desconectar_oracle(conn):
         pass
 
 
+@instrumentar("testar_conexao")
 def testar_conexao(conn):
-    """Retorna True se a conexão está válida"""
+    """Retorna True se a conexão está válida (o tempo medido é o de uma ida e volta)"""
     try:
         cur = conn.cursor()
         cur.execute("SELECT 1 FROM DUAL")
@@ -52,96 +91,408 @@ def testar_conexao(conn):
         return False
 
 
+# ---------- POOL DE CONEXÕES ----------
+@instrumentar("criar_pool")
+def criar_pool(usuario: str, senha: str, tns: str, minimo: int = 1, maximo: int = 4,
+               incremento: int = 1, drcp: bool = False, cclass: str = "GERADOR_XML"):
+    """
+    Cria um pool de sessões oracledb.ConnectionPool.
+    Cada tela/tarefa empresta uma conexão com emprestar_conexao e a devolve ao
+    terminar, permitindo operações simultâneas. Sessões derrubadas são
+    detectadas e substituídas pelo pool na próxima aquisição.
+    Com drcp=True usa o Database Resident Connection Pooling do servidor
+    (o serviço precisa ter o DRCP habilitado).
+    """
+    parametros = {
+        "user": usuario,
+        "password": senha,
+        "dsn": tns,
+        "min": minimo,
+        "max": maximo,
+        "increment": incremento,
+        "getmode": oracledb.POOL_GETMODE_WAIT,
+    }
+    if drcp:
+        parametros.update(server_type="pooled", cclass=cclass, purity=oracledb.PURITY_SELF)
+    inicializar_cliente_oracle()
+    return oracledb.create_pool(**parametros)
+
+
+def fechar_pool(pool):
+    """Fecha o pool (e as conexões ainda emprestadas) se existir"""
+    try:
+        if pool:
+            pool.close(force=True)
+    except Exception:
+        pass
+
+
+@contextmanager
+def emprestar_conexao(pool):
+    """
+    Empresta uma conexão do pool durante o bloco `with` e a devolve ao final.
+    Transações não confirmadas são desfeitas na devolução.
+    """
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
 # ---------- FUNÇÕES DE XML ----------
+@instrumentar("salvar_xml")
 def salvar_xml(conn, tabela: str, xml_conteudo: str):
     """
-    Insere um XML na tabela informada.
+    Insere um XML na tabela informada e retorna o ID gerado.
     Atenção: tabela deve ter coluna XML_CONTEUDO do tipo XMLTYPE ou CLOB conforme o DB.
+    Agentes gravados aqui entram direto no cache de utils/cache_agentes.py.
+    """
+    sql = sql_inserir_xml(tabela, retornar_id=True)
+    cur = conn.cursor()
+    try:
+        id_var = cur.var(oracledb.DB_TYPE_NUMBER)
+        # Fases separadas: envio + conversão para XMLType no servidor, e o commit
+        with fase("salvar_xml.execute", num_bytes=tamanho_bytes(xml_conteudo)):
+            cur.execute(sql, {"xml": xml_conteudo, "id": id_var})
+        with fase("salvar_xml.commit"):
+            conn.commit()
+        novo_id = int(id_var.getvalue()[0])
+    finally:
+        cur.close()
+
+    if tabela.upper() == "XML_AGENTES":
+        from utils.cache_agentes import CACHE_AGENTES
+        CACHE_AGENTES.registrar(novo_id, xml_conteudo)
+    return novo_id
+
+
+def salvar_xmls_lote(conn, tabela: str, docs, batch_size: int = 500):
     """
-    sql = f"""
-        INSERT INTO {tabela} (ID, XML_CONTEUDO)
-        VALUES (SEQ_{tabela}.NEXTVAL, XMLType(:xml))
+    Insere vários XMLs na tabela com array DML (executemany), um commit por lote.
+    `docs` pode ser qualquer iterável de strings (inclusive um gerador).
+
+    Com batcherrors, um documento rejeitado pelo Oracle não derruba o lote:
+    as demais linhas são gravadas normalmente.
+    Retorna uma lista com um item por documento, na ordem de entrada:
+    None se foi gravado ou a mensagem de erro do Oracle se foi rejeitado.
     """
+    sql = sql_inserir_xml(tabela)
+    resultados = []
+    docs = iter(docs)
     cur = conn.cursor()
     try:
-        cur.execute(sql, {"xml": xml_conteudo})
-        conn.commit()
+        while True:
+            lote = [(doc,) for doc in islice(docs, batch_size)]
+            if not lote:
+                break
+            # CLOB permite documentos maiores que o limite de VARCHAR2 no bind
+            cur.setinputsizes(oracledb.DB_TYPE_CLOB)
+            cur.executemany(sql, lote, batcherrors=True)
+            erros_lote = [None] * len(lote)
+            for erro in cur.getbatcherrors():
+                erros_lote[erro.offset] = erro.message
+            conn.commit()
+            resultados.extend(erros_lote)
+        return resultados
     finally:
         cur.close()
 
 
+@instrumentar("listar_xmls", linhas=len, num_bytes=lambda xmls: sum(tamanho_bytes(x) for _, x in xmls))
 def listar_xmls(conn, tabela: str):
     """
     Retorna lista de tuplas (ID, xml_texto).
     Converte LOBs em string usando XMLSERIALIZE para compatibilidade.
+    Para tabelas grandes prefira iterar_xmls ou listar_xmls_pagina.
+    """
+    return list(iterar_xmls(conn, tabela))
+
+
+def iterar_xmls(conn, tabela: str, arraysize: int = 500, prefetchrows: int = 501, desde_id=None):
+    """
+    Gera tuplas (ID, xml_texto) em ordem decrescente de ID, sem montar lista.
+    Os CLOBs chegam como string junto com as linhas (sem read() por linha) e
+    são buscados em blocos de `arraysize` linhas; o uso de memória depende só
+    do tamanho do bloco, não da tabela.
+    Com `desde_id`, gera só os documentos de ID maior, em ordem crescente.
+    """
+    cur = conn.cursor()
+    try:
+        cur.arraysize = arraysize
+        cur.prefetchrows = prefetchrows
+        cur.outputtypehandler = clob_como_texto
+        if desde_id is None:
+            cur.execute(sql_listar_xmls(tabela))
+        else:
+            cur.execute(sql_xmls_desde(tabela), {"desde_id": desde_id})
+        for id_val, xml_val in cur:
+            yield id_val, texto_lob(xml_val)
+    finally:
+        cur.close()
+
+
+def iterar_xmls_intervalo(conn, tabela: str, id_de=None, id_ate=None, arraysize: int = 500,
+                          prefetchrows: int = 501):
+    """
+    Como iterar_xmls, mas só os IDs entre `id_de` e `id_ate` (inclusivos;
+    None = sem limite), em ordem crescente de ID.
+    """
+    sql, binds = sql_xmls_intervalo(tabela, id_de, id_ate)
+    cur = conn.cursor()
+    try:
+        cur.arraysize = arraysize
+        cur.prefetchrows = prefetchrows
+        cur.outputtypehandler = clob_como_texto
+        cur.execute(sql, binds)
+        for id_val, xml_val in cur:
+            yield id_val, texto_lob(xml_val)
+    finally:
+        cur.close()
+
+
+def contar_xmls(conn, tabela: str, id_de=None, id_ate=None):
+    """Quantidade de documentos entre `id_de` e `id_ate` (inclusivos; None = sem limite)"""
+    cur = conn.cursor()
+    try:
+        cur.execute(*sql_contar_xmls(tabela, id_de, id_ate))
+        return cur.fetchone()[0]
+    finally:
+        cur.close()
+
+
+def listar_xmls_pagina(conn, tabela: str, apos_id=None, limite: int = 200):
     """
-    sql = f"""
-        SELECT ID,
-               XMLSERIALIZE(CONTENT XML_CONTEUDO AS CLOB) AS XML_TEXTO
-        FROM {tabela}
-        ORDER BY ID DESC
+    Retorna uma página de tuplas (ID, xml_texto), em ordem decrescente de ID.
+    Paginação por chave: passe em `apos_id` o último ID da página anterior
+    (None para a primeira página). Usa o índice da PK e FETCH FIRST, então o
+    custo de cada página não depende do tamanho da tabela.
     """
+    sql, binds = sql_pagina_xmls(tabela, apos_id, limite)
     cur = conn.cursor()
     try:
-        cur.execute(sql)
-        rows = []
-        for r in cur.fetchall():
-            id_val = r[0]
-            xml_val = r[1]
-            if hasattr(xml_val, "read"):
-                xml_text = xml_val.read()
-            else:
-                xml_text = str(xml_val) if xml_val is not None else ""
-            rows.append((id_val, xml_text))
-        return rows
+        cur.arraysize = limite
+        cur.prefetchrows = limite + 1
+        cur.outputtypehandler = clob_como_texto
+        cur.execute(sql, binds)
+        return [(id_val, texto_lob(xml_val)) for id_val, xml_val in cur.fetchall()]
     finally:
         cur.close()
 
 
-# ---------- NOVA FUNÇÃO: LISTAR AGENTES ----------
-def listar_agentes(conn):
+def listar_previews_pagina(conn, tabela: str, apos_id=None, limite: int = 200, tamanho: int = 150):
+    """
+    Como listar_xmls_pagina, mas retorna (ID, preview) com apenas os primeiros
+    `tamanho` caracteres do XML (seguidos de "..." quando o documento é maior).
+    O corte é feito no servidor com DBMS_LOB.SUBSTR: só o trecho trafega pela rede.
+    O documento completo deve ser buscado com obter_xml quando necessário.
     """
-    Retorna lista de agentes cadastrados na tabela XML_AGENTES.
-    Faz o parse básico do XML para extrair Nome e TipoPessoa.
+    sql, binds = sql_pagina_previews(tabela, apos_id, limite, tamanho)
+    cur = conn.cursor()
+    try:
+        cur.arraysize = limite
+        cur.prefetchrows = limite + 1
+        cur.execute(sql, binds)
+        return [(id_val, montar_preview(trecho, tamanho)) for id_val, trecho in cur.fetchall()]
+    finally:
+        cur.close()
+
+
+def obter_xml(conn, tabela: str, id_val):
+    """Retorna o XML completo do registro com o ID informado (None se não existir)"""
+    cur = conn.cursor()
+    try:
+        cur.outputtypehandler = clob_como_texto
+        cur.execute(sql_obter_xml(tabela), {"id": id_val})
+        row = cur.fetchone()
+        return texto_lob(row[0]) if row else None
+    finally:
+        cur.close()
+
+
+# ---------- LOB EM PEDAÇOS ----------
+# Caracteres lidos por ida ao servidor (arredondado para múltiplo do chunk do LOB)
+TAMANHO_PEDACO_LOB = 256 * 1024
+
+
+def ler_lob_em_pedacos(lob, tamanho: int = TAMANHO_PEDACO_LOB):
+    """
+    Gera o conteúdo de um CLOB em pedaços de até `tamanho` caracteres, sem
+    montar o texto inteiro. Aceita também str (já lido) e None (vazio).
+    """
+    if lob is None:
+        return
+    if isinstance(lob, str):
+        for inicio in range(0, len(lob), tamanho):
+            yield lob[inicio:inicio + tamanho]
+        return
+    chunk = lob.getchunksize() or 1
+    tamanho = max(tamanho // chunk, 1) * chunk
+    deslocamento = 1    # offsets de LOB começam em 1
+    while True:
+        pedaco = lob.read(deslocamento, tamanho)
+        if not pedaco:
+            return
+        yield pedaco
+        # O Oracle conta offsets de CLOB em unidades UTF-16: caracteres fora
+        # do BMP (emoji, parte do CJK) valem 2, não 1 como em len()
+        deslocamento += len(pedaco.encode("utf-16-le")) // 2
+
+
+def transmitir_xml(conn, tabela: str, id_val, consumidor, tamanho: int = TAMANHO_PEDACO_LOB):
+    """
+    Lê o XML do registro em pedaços de `tamanho` caracteres e chama
+    consumidor(pedaco) para cada um; o documento inteiro nunca fica em memória.
+    Retorna o total de caracteres, ou None se o ID não existe.
+    """
+    cur = conn.cursor()
+    try:
+        # Sem outputtypehandler: a linha traz só o localizador do LOB
+        cur.execute(sql_obter_xml(tabela), {"id": id_val})
+        row = cur.fetchone()
+        if row is None:
+            return None
+        total = 0
+        for pedaco in ler_lob_em_pedacos(row[0], tamanho):
+            consumidor(pedaco)
+            total += len(pedaco)
+        return total
+    finally:
+        cur.close()
+
+
+def salvar_xml_em_arquivo(conn, tabela: str, id_val, caminho: str, tamanho: int = TAMANHO_PEDACO_LOB):
+    """
+    Grava o XML do registro em `caminho` (UTF-8) pedaço a pedaço.
+    O texto vai para `caminho`.parcial, que só substitui `caminho` no fim:
+    se o ID não existe ou a leitura falha, um arquivo já existente em
+    `caminho` não é tocado. Retorna o total de caracteres, ou None se o ID
+    não existe.
+    """
+    parcial = caminho + ".parcial"
+    try:
+        with open(parcial, "w", encoding="utf-8") as f:
+            total = transmitir_xml(conn, tabela, id_val, f.write, tamanho)
+    except Exception:
+        os.remove(parcial)
+        raise
+    if total is None:
+        os.remove(parcial)
+    else:
+        os.replace(parcial, caminho)
+    return total
+
+
+# ---------- BUSCA POR CONTEÚDO (Oracle Text) ----------
+def buscar_xmls(conn, tabela: str, termo: str, limite: int = 50, deslocamento: int = 0):
+    """
+    Busca documentos que contêm todas as palavras de `termo` (sem diferenciar
+    acentos nem maiúsculas). Retorna tuplas (ID, relevância, preview), da mais
+    à menos relevante; a página seguinte começa em `deslocamento` + `limite`.
+    Usa o índice Oracle Text da migração V003; sem ele, indexa a tabela em
+    memória (utils/indice_texto.py) e busca localmente.
+    """
+    consulta = sql_buscar_xmls(tabela, termo, limite, deslocamento, TAMANHO_PREVIEW)
+    if consulta is None:
+        return []
+    cur = conn.cursor()
+    try:
+        cur.arraysize = limite
+        cur.prefetchrows = limite + 1
+        cur.execute(*consulta)
+        return [(id_val, relevancia, montar_preview(trecho, TAMANHO_PREVIEW))
+                for id_val, relevancia, trecho in cur.fetchall()]
+    except oracledb.DatabaseError as e:
+        if not sem_indice_texto(e):
+            raise
+    finally:
+        cur.close()
+    return buscar_xmls_local(conn, tabela, termo, limite, deslocamento)
+
+
+def buscar_xmls_local(conn, tabela: str, termo: str, limite: int = 50, deslocamento: int = 0):
+    """Como buscar_xmls, no índice em memória (só lê do banco os documentos novos)"""
+    indice = indice_da_tabela(tabela)
+    indice.adicionar_varios(iterar_xmls(conn, tabela, desde_id=indice.ultimo_id or 0))
+    return indice.buscar(termo, limite, deslocamento)
+
+
+# ---------- CONSULTAS POR CAMPO (XMLIndex) ----------
+def buscar_agentes(conn, nome: str = None, documento: str = None, limite: int = 50):
+    """
+    Busca agentes pelo início do nome (sem diferenciar maiúsculas) e/ou pelo
+    CPF/CNPJ (com ou sem máscara), usando os índices de XML_AGENTES_CAMPOS.
+    Retorna dicionários no mesmo formato de listar_agentes.
+    """
+    consulta = sql_buscar_agentes(nome, documento, limite)
+    if consulta is None:
+        return []
+    cur = conn.cursor()
+    try:
+        cur.execute(*consulta)
+        return [agente_da_linha(linha) for linha in cur.fetchall()]
+    finally:
+        cur.close()
+
+
+def listar_contas_pagar(conn, agente_id=None, vencimento_de=None, vencimento_ate=None, limite: int = 500):
+    """
+    Lista contas a pagar filtrando por agente e/ou intervalo de vencimento
+    (datetime.date), usando os índices de XML_CONTAS_PAGAR_CAMPOS.
+    Retorna dicionários {"id", "agente_id", "cnpj_cpf", "data_vencimento"}.
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(*sql_listar_contas_pagar(agente_id, vencimento_de, vencimento_ate, limite))
+        return [conta_da_linha(linha) for linha in cur.fetchall()]
+    finally:
+        cur.close()
+
+
+# ---------- LISTAR AGENTES ----------
+def _listar_agentes_servidor(conn, desde_id=None):
+    """Projeta os campos no Oracle com XMLTABLE: só as colunas escalares trafegam"""
+    cur = conn.cursor()
+    try:
+        cur.arraysize = 1000
+        cur.outputtypehandler = clob_como_texto
+        cur.execute(*sql_listar_agentes(desde_id))
+        return [agente_da_linha(linha) for linha in cur]
+    finally:
+        cur.close()
+
+
+def _listar_agentes_cliente(conn, desde_id=None):
+    """
+    Busca os XMLs completos e faz o parse de cada um no cliente. Com
+    `desde_id`, só as linhas novas saem do banco (consulta pela PK).
+    """
+    linhas = iterar_xmls(conn, "XML_AGENTES", desde_id=desde_id)
+    agentes = [dados_agente(id_val, xml_text) for id_val, xml_text in linhas]
+    if desde_id is not None:
+        agentes.reverse()  # iterar_xmls com desde_id segue em ordem crescente de ID
+    return agentes
+
+
+@instrumentar("listar_agentes", linhas=len)
+def listar_agentes(conn, desde_id=None):
+    """
+    Retorna lista de agentes cadastrados na tabela XML_AGENTES, sem o XML.
+    Com `desde_id`, só os agentes de ID maior (atualização incremental, ver
+    utils/cache_agentes.py).
+    Os campos são extraídos no servidor (XMLTABLE); se o Oracle rejeitar a
+    extração (ex.: tag repetida ou valor maior que a coluna), cai para o
+    parse no cliente.
 
     Retorna lista de dicionários:
     [
-        {"id": 1, "nome": "Empresa XPTO", "tipo_pessoa": "Pessoa Jurídica", "xml": "<xml...>"},
-        {"id": 2, "nome": "João Silva", "tipo_pessoa": "Pessoa Física", "xml": "<xml...>"},
+        {"id": 1, "nome": "Empresa XPTO", "tipo_pessoa": "Pessoa Jurídica",
+         "documento": "12.345.678/0001-95", "email": "contato@xpto.com", "valido": True},
+        {"id": 2, "nome": "", "tipo_pessoa": "",
+         "documento": "", "email": "", "valido": False},
     ]
     """
-    agentes = []
     try:
-        cur = conn.cursor()
-        sql = """
-            SELECT ID, XMLSERIALIZE(CONTENT XML_CONTEUDO AS CLOB)
-            FROM XML_AGENTES
-            ORDER BY ID DESC
-        """
-        cur.execute(sql)
-
-        for id_val, xml_val in cur.fetchall():
-            if hasattr(xml_val, "read"):
-                xml_text = xml_val.read()
-            else:
-                xml_text = str(xml_val) if xml_val is not None else ""
-
-            nome = tipo_pessoa = ""
-            try:
-                root = ET.fromstring(xml_text)
-                nome = root.findtext("Nome", "").strip()
-                tipo_pessoa = root.findtext("TipoPessoa", "").strip()
-            except Exception:
-                nome = "[XML Inválido]"
-                tipo_pessoa = "Desconhecido"
-
-            agentes.append({
-                "id": id_val,
-                "nome": nome or "[Sem Nome]",
-                "tipo_pessoa": tipo_pessoa or "N/A",
-                "xml": xml_text
-            })
-
-        return agentes
-    finally:
-        cur.close()
\ No newline at end of file
+        return _listar_agentes_servidor(conn, desde_id)
+    except oracledb.DatabaseError:
+        return _listar_agentes_cliente(conn, desde_id)
@@ -0,0 +1,230 @@
+"""
+utils/exportacao.py
+Exportação em massa dos XMLs gravados (XML_AGENTES, XML_CONTAS_PAGAR),
+opcionalmente por intervalo de IDs, para um diretório (um arquivo por
+documento) ou para um único arquivo .zip, .tar.gz ou .tar.zst.
+
+Leitura e gravação andam juntas: a thread que chama exportar_xmls busca os
+documentos em blocos (iterar_xmls_intervalo) e os entrega, por uma fila
+limitada, às threads de gravação. Com a fila cheia a leitura espera, então
+a memória fica em alguns blocos, qualquer que seja o tamanho da tabela.
+Em diretório gravam várias threads; em arquivo compactado, uma só (o formato
+é sequencial), compactando um bloco enquanto o próximo é buscado.
+
+O .tar.zst depende do pacote opcional zstandard.
+"""
+
+import io
+import os
+import queue
+import tarfile
+import threading
+import time
+import zipfile
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+FORMATOS = ("diretorio", "zip", "tar.gz", "tar.zst")
+# Prefixo dos arquivos exportados: o mesmo do "Salvar como .xml" das telas
+PREFIXOS = {"XML_AGENTES": "agente", "XML_CONTAS_PAGAR": "conta_pagar"}
+
+TAMANHO_BLOCO = 500
+ESCRITORES_PADRAO = 4
+# Blocos lidos e ainda não gravados (limita a memória da exportação)
+BLOCOS_EM_ESPERA = 4
+
+
+def formato_do_destino(destino: str):
+    """Formato pela extensão do destino; sem extensão conhecida, diretório"""
+    nome = destino.lower()
+    if nome.endswith(".zip"):
+        return "zip"
+    if nome.endswith((".tar.gz", ".tgz")):
+        return "tar.gz"
+    if nome.endswith((".tar.zst", ".tzst")):
+        return "tar.zst"
+    return "diretorio"
+
+
+def nome_arquivo(tabela: str, id_val):
+    return f"{PREFIXOS.get(tabela.upper(), tabela.lower())}_{id_val}.xml"
+
+
+# ---------- DESTINOS ----------
+class _Diretorio:
+    """Um arquivo por documento; aceita gravações de várias threads"""
+    paralelo = True
+
+    def __init__(self, destino):
+        self.destino = destino
+        os.makedirs(destino, exist_ok=True)
+
+    def gravar(self, nome, dados):
+        with open(os.path.join(self.destino, nome), "wb") as f:
+            f.write(dados)
+
+    def fechar(self, concluido):
+        pass
+
+
+class _Arquivo:
+    """
+    Arquivo compactado, gravado em `destino`.parcial e renomeado só no fim:
+    uma exportação cancelada ou com erro não deixa um arquivo truncado.
+    """
+    paralelo = False
+
+    def __init__(self, destino):
+        self.destino = destino
+        self.parcial = destino + ".parcial"
+
+    def fechar(self, concluido):
+        try:
+            self._fechar()
+        except Exception:
+            os.remove(self.parcial)
+            raise
+        if concluido:
+            os.replace(self.parcial, self.destino)
+        else:
+            os.remove(self.parcial)
+
+
+class _Zip(_Arquivo):
+    def __init__(self, destino):
+        super().__init__(destino)
+        self.zip = zipfile.ZipFile(self.parcial, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def gravar(self, nome, dados):
+        info = zipfile.ZipInfo(nome, time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        self.zip.writestr(info, dados)
+
+    def _fechar(self):
+        self.zip.close()
+
+
+class _Tar(_Arquivo):
+    def __init__(self, destino, zstd=False):
+        super().__init__(destino)
+        self.compactador = None
+        if zstd:
+            if zstandard is None:
+                raise ValueError("O formato tar.zst requer o pacote zstandard (pip install zstandard).")
+            self.arquivo = open(self.parcial, "wb")
+            self.compactador = zstandard.ZstdCompressor().stream_writer(self.arquivo)
+            self.tar = tarfile.open(fileobj=self.compactador, mode="w|")
+        else:
+            self.tar = tarfile.open(self.parcial, "w:gz")
+
+    def gravar(self, nome, dados):
+        info = tarfile.TarInfo(nome)
+        info.size = len(dados)
+        info.mtime = int(time.time())
+        info.mode = 0o644
+        self.tar.addfile(info, io.BytesIO(dados))
+
+    def _fechar(self):
+        self.tar.close()
+        if self.compactador is not None:
+            self.compactador.close()
+            self.arquivo.close()
+
+
+def _abrir_destino(destino, formato):
+    if formato == "diretorio":
+        return _Diretorio(destino)
+    if formato == "zip":
+        return _Zip(destino)
+    if formato in ("tar.gz", "tar.zst"):
+        return _Tar(destino, zstd=formato == "tar.zst")
+    raise ValueError(f"Formato de exportação desconhecido: {formato} (opções: {', '.join(FORMATOS)})")
+
+
+# ---------- EXPORTAÇÃO ----------
+def _blocos(documentos, tamanho):
+    bloco = []
+    for doc in documentos:
+        bloco.append(doc)
+        if len(bloco) >= tamanho:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+
+def exportar_xmls(conn, tabela: str, destino: str, formato: str = None, id_de=None, id_ate=None,
+                  tamanho_bloco: int = TAMANHO_BLOCO, escritores: int = ESCRITORES_PADRAO, controle=None):
+    """
+    Exporta os XMLs de `tabela` (IDs entre `id_de` e `id_ate`, inclusivos;
+    None = sem limite) para `destino`, em ordem crescente de ID.
+    `formato` é um de FORMATOS (padrão: pela extensão de `destino`).
+    `controle` (opcional, ver xml_screens/tarefas.py) recebe o progresso e
+    pode cancelar a exportação entre um bloco e outro.
+    Retorna {"exportados", "bytes", "destino"}.
+    """
+    # Importado aqui: a linha de comando lê FORMATOS sem carregar o driver Oracle
+    from utils.db_utils import contar_xmls, iterar_xmls_intervalo
+
+    formato = formato or formato_do_destino(destino)
+    total = contar_xmls(conn, tabela, id_de, id_ate) if controle is not None else 0
+    saida = _abrir_destino(destino, formato)
+
+    fila = queue.Queue(maxsize=BLOCOS_EM_ESPERA)
+    parar = threading.Event()
+    erros = []
+    trava = threading.Lock()
+    gravados = {"exportados": 0, "bytes": 0}
+
+    def gravar():
+        while True:
+            bloco = fila.get()
+            if bloco is None:
+                return
+            # Depois de um erro ou cancelamento só esvazia a fila
+            if parar.is_set():
+                continue
+            try:
+                num_bytes = 0
+                for id_val, xml_texto in bloco:
+                    dados = (xml_texto or "").encode("utf-8")
+                    saida.gravar(nome_arquivo(tabela, id_val), dados)
+                    num_bytes += len(dados)
+                with trava:
+                    gravados["exportados"] += len(bloco)
+                    gravados["bytes"] += num_bytes
+            except Exception as e:
+                erros.append(e)
+                parar.set()
+
+    quantidade = max(escritores, 1) if saida.paralelo else 1
+    threads = [threading.Thread(target=gravar, name=f"exportar-xmls-{i}", daemon=True) for i in range(quantidade)]
+    for thread in threads:
+        thread.start()
+
+    documentos = iterar_xmls_intervalo(conn, tabela, id_de, id_ate, tamanho_bloco, tamanho_bloco + 1)
+    concluido = False
+    try:
+        for bloco in _blocos(documentos, tamanho_bloco):
+            if parar.is_set():
+                break
+            fila.put(bloco)
+            if controle is not None:
+                feito = gravados["exportados"]
+                controle.progresso(feito, total, f"{feito} de {total} XML(s) exportados")
+        concluido = not parar.is_set()
+    finally:
+        documentos.close()
+        if not concluido:
+            parar.set()
+        for _ in threads:
+            fila.put(None)
+        for thread in threads:
+            thread.join()
+        saida.fechar(concluido and not erros)
+    if erros:
+        raise erros[0]
+    return dict(gravados, destino=destino)
@@ -0,0 +1,239 @@
+"""
+utils/importacao.py
+Importação em massa de arquivos XML (Agente e ContaPagar) de um diretório ou
+de um arquivo .zip/.tar.gz/.tar.zst para o Oracle.
+
+Cada documento é identificado pela tag raiz, convertido em registro,
+normalizado e validado com as mesmas regras das telas (preparar_bloco de
+utils/pipeline.py) e gravado como a tela gravaria (gerar_xml_pretty).
+O parse e a validação rodam em vários processos, em blocos de arquivos;
+enquanto isso este processo lê os próximos arquivos e grava os documentos
+válidos em lotes com array DML (salvar_xmls_lote), um commit por lote.
+Arquivos rejeitados, na leitura, na validação ou pelo Oracle, vão para um
+relatório CSV (arquivo;etapa;motivo).
+"""
+
+import csv
+import os
+import tarfile
+import xml.etree.ElementTree as ET
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from utils.exportacao import formato_do_destino
+from utils.pipeline import TIPOS, preparar_bloco
+from utils.xml_utils import gerar_xml_pretty
+
+TABELAS = {"agente": "XML_AGENTES", "conta_pagar": "XML_CONTAS_PAGAR"}
+# Tag raiz -> tipo
+TIPOS_POR_RAIZ = {root_tag: tipo for tipo, (root_tag, _, _) in TIPOS.items()}
+
+TAMANHO_BLOCO_PADRAO = 500
+TAMANHO_LOTE_PADRAO = 500
+
+ETAPA_LEITURA = "leitura"
+ETAPA_VALIDACAO = "validacao"
+ETAPA_GRAVACAO = "gravacao"
+
+
+# ---------- LEITURA DOS ARQUIVOS ----------
+def _eh_xml(nome):
+    return nome.lower().endswith(".xml")
+
+
+def _ler_diretorio(origem):
+    for raiz, diretorios, arquivos in os.walk(origem):
+        diretorios.sort()
+        for nome in sorted(arquivos):
+            if _eh_xml(nome):
+                caminho = os.path.join(raiz, nome)
+                with open(caminho, "rb") as f:
+                    yield os.path.relpath(caminho, origem), f.read()
+
+
+def _ler_zip(origem):
+    with zipfile.ZipFile(origem) as arquivo:
+        for info in arquivo.infolist():
+            if not info.is_dir() and _eh_xml(info.filename):
+                yield info.filename, arquivo.read(info)
+
+
+def _ler_tar(tar):
+    # Modo stream: o arquivo compactado é lido uma única vez, do início ao fim
+    for membro in tar:
+        if membro.isfile() and _eh_xml(membro.name):
+            yield membro.name, tar.extractfile(membro).read()
+
+
+def ler_arquivos(origem):
+    """
+    Gera (nome, conteúdo em bytes) de cada arquivo .xml de `origem`: um
+    diretório (com subdiretórios) ou um arquivo .zip, .tar.gz ou .tar.zst.
+    """
+    if os.path.isdir(origem):
+        yield from _ler_diretorio(origem)
+        return
+    formato = formato_do_destino(origem)
+    if formato == "zip":
+        yield from _ler_zip(origem)
+    elif formato == "tar.gz":
+        with tarfile.open(origem, "r|gz") as tar:
+            yield from _ler_tar(tar)
+    elif formato == "tar.zst":
+        if zstandard is None:
+            raise ValueError("O formato tar.zst requer o pacote zstandard (pip install zstandard).")
+        with open(origem, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as leitor:
+            with tarfile.open(fileobj=leitor, mode="r|") as tar:
+                yield from _ler_tar(tar)
+    else:
+        raise ValueError(f"Origem não é um diretório nem um arquivo .zip/.tar.gz/.tar.zst: {origem}")
+
+
+# ---------- PARSE E VALIDAÇÃO (nos processos) ----------
+def registro_do_xml(conteudo):
+    """
+    Converte o documento em (tipo, registro) pela tag raiz; os campos são os
+    elementos filhos. ValueError se o XML é inválido ou a raiz é desconhecida.
+    """
+    try:
+        raiz = ET.fromstring(conteudo)
+    except ET.ParseError as e:
+        raise ValueError(f"XML inválido: {e}") from None
+    tipo = TIPOS_POR_RAIZ.get(raiz.tag)
+    if tipo is None:
+        raise ValueError(f"Tag raiz desconhecida: <{raiz.tag}> (esperado: {', '.join(TIPOS_POR_RAIZ)})")
+    return tipo, {filho.tag: filho.text or "" for filho in raiz}
+
+
+def processar_arquivos(bloco, tipo_esperado=None, validar=True):
+    """
+    Faz o parse, normaliza e valida um bloco de (nome, conteúdo).
+    Retorna (documentos, rejeitados): {tipo: [(nome, xml)]} com os XMLs
+    regerados e [(nome, etapa, motivo)].
+    """
+    por_tipo = {}
+    rejeitados = []
+    for nome, conteudo in bloco:
+        try:
+            tipo, registro = registro_do_xml(conteudo)
+        except ValueError as e:
+            rejeitados.append((nome, ETAPA_LEITURA, str(e)))
+            continue
+        if tipo_esperado and tipo != tipo_esperado:
+            rejeitados.append((nome, ETAPA_LEITURA, f"Documento <{TIPOS[tipo][0]}> em importação de {tipo_esperado}"))
+            continue
+        por_tipo.setdefault(tipo, []).append((nome, registro))
+
+    documentos = {}
+    for tipo, registros in por_tipo.items():
+        root_tag = TIPOS[tipo][0]
+        validos, invalidos = preparar_bloco(tipo, registros, validar)
+        rejeitados.extend((nome, ETAPA_VALIDACAO, motivo) for nome, motivo in invalidos)
+        gerados = documentos[tipo] = []
+        for nome, dados in validos:
+            try:
+                gerados.append((nome, gerar_xml_pretty(root_tag, dados)))
+            except (ValueError, TypeError) as e:
+                rejeitados.append((nome, ETAPA_VALIDACAO, str(e)))
+    return documentos, rejeitados
+
+
+def _blocos(arquivos, tamanho_bloco):
+    arquivos = iter(arquivos)
+    while True:
+        bloco = list(islice(arquivos, tamanho_bloco))
+        if not bloco:
+            return
+        yield bloco
+
+
+# ---------- IMPORTAÇÃO ----------
+def importar_xmls(conn, origem, relatorio=None, tipo=None, processos=None, tamanho_bloco=TAMANHO_BLOCO_PADRAO,
+                  tamanho_lote=TAMANHO_LOTE_PADRAO, validar=True, ao_rejeitar=None):
+    """
+    Importa os arquivos .xml de `origem` (ver ler_arquivos) para XML_AGENTES
+    e XML_CONTAS_PAGAR, conforme a tag raiz de cada documento; com `tipo`
+    ("agente" ou "conta_pagar"), documentos do outro tipo são rejeitados.
+
+    `processos` padrão: os.cpu_count(); com 1 tudo roda neste processo. No
+    máximo 2 blocos de `tamanho_bloco` arquivos por processo ficam em memória.
+    Os válidos são gravados em lotes de `tamanho_lote` (um commit por lote).
+    Os rejeitados vão para o CSV `relatorio` (se informado) e para
+    `ao_rejeitar(nome, etapa, motivo)`.
+
+    Retorna {"lidos": int, "gravados": {tabela: int}, "rejeitados": int}.
+    """
+    # Importado aqui: o parse nos processos não precisa do driver Oracle
+    from utils.db_utils import salvar_xmls_lote
+
+    if tipo is not None and tipo not in TIPOS:
+        raise ValueError(f"Tipo desconhecido: {tipo!r}")
+    processos = processos or os.cpu_count() or 1
+    resumo = {"lidos": 0, "gravados": {}, "rejeitados": 0}
+    pendentes_gravacao = {t: [] for t in TIPOS}
+    saida_relatorio = open(relatorio, "w", encoding="utf-8", newline="") if relatorio else None
+    escritor = csv.writer(saida_relatorio, delimiter=";") if saida_relatorio else None
+    if escritor:
+        escritor.writerow(("arquivo", "etapa", "motivo"))
+
+    def rejeitar(nome, etapa, motivo):
+        resumo["rejeitados"] += 1
+        if escritor:
+            escritor.writerow((nome, etapa, motivo))
+        if ao_rejeitar:
+            ao_rejeitar(nome, etapa, motivo)
+
+    def gravar(tipo_doc):
+        docs = pendentes_gravacao[tipo_doc]
+        pendentes_gravacao[tipo_doc] = []
+        tabela = TABELAS[tipo_doc]
+        erros = salvar_xmls_lote(conn, tabela, [xml for _, xml in docs], tamanho_lote)
+        for (nome, _), erro in zip(docs, erros):
+            if erro is None:
+                resumo["gravados"][tabela] = resumo["gravados"].get(tabela, 0) + 1
+            else:
+                rejeitar(nome, ETAPA_GRAVACAO, erro)
+
+    def consumir(resultado):
+        documentos, rejeitados = resultado
+        for nome, etapa, motivo in rejeitados:
+            rejeitar(nome, etapa, motivo)
+        for tipo_doc, docs in documentos.items():
+            pendentes_gravacao[tipo_doc].extend(docs)
+            if len(pendentes_gravacao[tipo_doc]) >= tamanho_lote:
+                gravar(tipo_doc)
+
+    def contados(arquivos):
+        for arquivo in arquivos:
+            resumo["lidos"] += 1
+            yield arquivo
+
+    try:
+        blocos = _blocos(contados(ler_arquivos(origem)), tamanho_bloco)
+        if processos == 1:
+            for bloco in blocos:
+                consumir(processar_arquivos(bloco, tipo, validar))
+        else:
+            with ProcessPoolExecutor(max_workers=processos) as executor:
+                pendentes = deque()
+                for bloco in blocos:
+                    pendentes.append(executor.submit(processar_arquivos, bloco, tipo, validar))
+                    # Janela limitada: grava o resultado mais antigo antes de enviar mais blocos
+                    while len(pendentes) >= 2 * processos:
+                        consumir(pendentes.popleft().result())
+                while pendentes:
+                    consumir(pendentes.popleft().result())
+        for tipo_doc, docs in pendentes_gravacao.items():
+            if docs:
+                gravar(tipo_doc)
+    finally:
+        if saida_relatorio:
+            saida_relatorio.close()
+    return resumo
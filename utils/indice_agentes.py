@@ -0,0 +1,118 @@
+"""
+utils/indice_agentes.py
+Índice em memória para a busca incremental de agentes.
+
+Os nomes são normalizados (sem acentos, minúsculos, espaços simples) e
+indexados por trigramas; buscas com menos de 3 caracteres usam o prefixo das
+palavras do nome. CPF/CNPJ são indexados só pelos caracteres (sem máscara),
+com busca exata. O índice não muda depois de construído e pode ser lido de
+qualquer thread.
+"""
+
+import bisect
+import re
+import unicodedata
+
+LIMITE_RESULTADOS = 500
+
+
+def normalizar_texto(texto: str) -> str:
+    """Remove acentos, converte para minúsculas e reduz espaços a um só"""
+    decomposto = unicodedata.normalize("NFKD", texto or "")
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return " ".join(sem_acentos.casefold().split())
+
+
+def chave_documento(documento: str) -> str:
+    """CPF/CNPJ sem máscara (CNPJ alfanumérico em maiúsculas)"""
+    return re.sub(r"[^0-9A-Za-z]", "", documento or "").upper()
+
+
+def parece_documento(termo: str) -> bool:
+    """True se o termo só tem dígitos e caracteres de máscara de CPF/CNPJ"""
+    return bool(re.fullmatch(r"[\d.\-/\s]*\d[\d.\-/\s]*", termo or ""))
+
+
+def _trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceAgentes:
+    """
+    Índice dos agentes (dicionários de listar_agentes). Os resultados saem
+    na ordem da lista recebida (a do cache: ID decrescente).
+    """
+
+    def __init__(self, agentes):
+        self._agentes = list(agentes)
+        self._nomes = []
+        self._trigramas = {}        # trigrama -> posições (crescentes) em _agentes
+        self._palavras = []         # (palavra, posição), ordenada para busca por prefixo
+        self._documentos = {}       # documento sem máscara -> posições
+
+        for posicao, agente in enumerate(self._agentes):
+            nome = normalizar_texto(agente["nome"])
+            self._nomes.append(nome)
+            for trigrama in _trigramas(nome):
+                self._trigramas.setdefault(trigrama, []).append(posicao)
+            for palavra in set(nome.split()):
+                self._palavras.append((palavra, posicao))
+            documento = chave_documento(agente["documento"])
+            if documento:
+                self._documentos.setdefault(documento, []).append(posicao)
+        self._palavras.sort()
+
+    def __len__(self):
+        return len(self._agentes)
+
+    def todos(self):
+        return list(self._agentes)
+
+    def buscar(self, termo: str, limite: int = LIMITE_RESULTADOS):
+        """
+        Agentes cujo CPF/CNPJ é igual ao termo ou cujo nome contém o termo
+        (termos curtos: nomes com alguma palavra começando pelo termo).
+        Termo vazio retorna todos.
+        """
+        termo = (termo or "").strip()
+        if not termo:
+            return self.todos()
+
+        documento = chave_documento(termo)
+        if documento in self._documentos:
+            return [self._agentes[p] for p in self._documentos[documento][:limite]]
+        if parece_documento(termo):
+            return []
+
+        consulta = normalizar_texto(termo)
+        if len(consulta) < 3:
+            posicoes = self._por_prefixo(consulta)
+        else:
+            posicoes = self._por_trigramas(consulta, limite)
+        return [self._agentes[p] for p in posicoes[:limite]]
+
+    def _por_prefixo(self, prefixo):
+        posicoes = set()
+        inicio = bisect.bisect_left(self._palavras, (prefixo,))
+        for palavra, posicao in self._palavras[inicio:]:
+            if not palavra.startswith(prefixo):
+                break
+            posicoes.add(posicao)
+        return sorted(posicoes)
+
+    def _por_trigramas(self, consulta, limite):
+        # Parte da lista do trigrama mais raro e confirma cada candidato no nome
+        listas = []
+        for trigrama in _trigramas(consulta):
+            lista = self._trigramas.get(trigrama)
+            if lista is None:
+                return []
+            listas.append(lista)
+        candidatos = min(listas, key=len)
+        encontrados = []
+        for posicao in candidatos:
+            if consulta in self._nomes[posicao]:
+                encontrados.append(posicao)
+                if len(encontrados) >= limite:
+                    break
+        return encontrados
@@ -0,0 +1,126 @@
+"""
+utils/indice_texto.py
+Índice invertido em memória para a busca por conteúdo dos XMLs, usado
+quando o banco não tem o índice Oracle Text (Scripts/migracoes/V003) e em
+testes sem banco.
+
+Segue as regras da busca no Oracle: só o texto dos elementos é indexado,
+sem acentos nem maiúsculas, e todas as palavras do termo devem aparecer.
+A relevância é TF-IDF (não é igual ao SCORE do Oracle, mas ordena do
+mesmo jeito: mais ocorrências de palavras raras primeiro).
+"""
+
+import math
+import re
+import threading
+import xml.etree.ElementTree as ET
+
+from utils.consultas import montar_preview
+from utils.indice_agentes import normalizar_texto
+
+TAMANHO_PREVIEW = 150
+
+_PALAVRA = re.compile(r"\w+")
+_TAG = re.compile(r"<[^>]*>")
+
+
+def texto_do_xml(xml_texto: str) -> str:
+    """Texto dos elementos do XML (sem tags); XML inválido tem as tags removidas"""
+    try:
+        return " ".join(ET.fromstring(xml_texto).itertext())
+    except ET.ParseError:
+        return _TAG.sub(" ", xml_texto or "")
+
+
+def palavras(texto: str):
+    """Palavras normalizadas do texto (mesma regra para documentos e termos)"""
+    return _PALAVRA.findall(normalizar_texto(texto))
+
+
+class IndiceTexto:
+    """Índice invertido de uma tabela de XMLs; seguro entre threads"""
+
+    def __init__(self, tamanho_preview=TAMANHO_PREVIEW):
+        self.tamanho_preview = tamanho_preview
+        self._trava = threading.RLock()
+        self._postagens = {}    # palavra -> {id: ocorrências}
+        self._previews = {}     # id -> preview
+        self._ultimo_id = None
+
+    @property
+    def ultimo_id(self):
+        return self._ultimo_id
+
+    def __len__(self):
+        return len(self._previews)
+
+    def adicionar(self, id_val, xml_texto):
+        """Indexa um documento (um ID já indexado é substituído)"""
+        ocorrencias = {}
+        for palavra in palavras(texto_do_xml(xml_texto)):
+            ocorrencias[palavra] = ocorrencias.get(palavra, 0) + 1
+        preview = montar_preview((xml_texto or "")[:self.tamanho_preview + 1], self.tamanho_preview)
+        with self._trava:
+            if id_val in self._previews:
+                self.remover(id_val)
+            for palavra, quantidade in ocorrencias.items():
+                self._postagens.setdefault(palavra, {})[id_val] = quantidade
+            self._previews[id_val] = preview
+            if self._ultimo_id is None or id_val > self._ultimo_id:
+                self._ultimo_id = id_val
+
+    def adicionar_varios(self, documentos):
+        """Indexa tuplas (ID, xml_texto); retorna quantos foram indexados"""
+        total = 0
+        for id_val, xml_texto in documentos:
+            self.adicionar(id_val, xml_texto)
+            total += 1
+        return total
+
+    def remover(self, id_val):
+        with self._trava:
+            if self._previews.pop(id_val, None) is None:
+                return
+            for palavra in list(self._postagens):
+                documentos = self._postagens[palavra]
+                if documentos.pop(id_val, None) is not None and not documentos:
+                    del self._postagens[palavra]
+
+    def buscar(self, termo: str, limite: int = 50, deslocamento: int = 0):
+        """
+        Documentos com todas as palavras do termo, do mais ao menos relevante
+        (empate: ID maior primeiro). Retorna tuplas (ID, relevância, preview),
+        como db_utils.buscar_xmls.
+        """
+        consulta = set(palavras(termo))
+        if not consulta:
+            return []
+        with self._trava:
+            listas = []
+            for palavra in consulta:
+                documentos = self._postagens.get(palavra)
+                if not documentos:
+                    return []
+                listas.append(documentos)
+            listas.sort(key=len)
+            total = len(self._previews)
+            pesos = [math.log(1 + total / len(documentos)) for documentos in listas]
+
+            resultados = []
+            for id_val in listas[0]:
+                if all(id_val in documentos for documentos in listas[1:]):
+                    relevancia = sum(peso * documentos[id_val] for peso, documentos in zip(pesos, listas))
+                    resultados.append((id_val, relevancia))
+            resultados.sort(key=lambda r: (-r[1], -r[0]))
+            pagina = resultados[deslocamento:deslocamento + limite]
+            return [(id_val, round(relevancia, 4), self._previews[id_val]) for id_val, relevancia in pagina]
+
+
+# Índices por tabela, usados pela busca de db_utils/db_async sem Oracle Text
+_INDICES = {}
+_TRAVA_INDICES = threading.Lock()
+
+
+def indice_da_tabela(tabela: str) -> IndiceTexto:
+    with _TRAVA_INDICES:
+        return _INDICES.setdefault(tabela, IndiceTexto())
@@ -0,0 +1,236 @@
+"""
+utils/metricas.py
+Instrumentação das operações mais usadas: tempo, linhas e bytes por
+operação, log de operações lentas e exportação no formato texto do
+Prometheus (para o textfile collector do node_exporter).
+
+Ativação: variável de ambiente GERADOR_XML_METRICAS=1 ou chave "metricas"
+do config.json ({"ativo": true, "limite_lento_ms": 500,
+"log_lentas": "operacoes_lentas.log", "prometheus": "metricas.prom"}).
+
+Custo desligado: o decorador `instrumentar` devolve a própria função quando
+as métricas estão desligadas no momento da importação do módulo
+instrumentado, então configurar() deve ser chamado antes de importar
+db_utils/xml_utils (a interface faz isso; os módulos de banco e as telas só
+são importados depois). As fases internas (`fase`) consultam a chave a cada
+uso e custam só uma verificação quando desligadas.
+"""
+
+import functools
+import logging
+import os
+import threading
+import time
+
+VARIAVEL_ATIVACAO = "GERADOR_XML_METRICAS"
+LIMITE_LENTO_PADRAO_MS = 500
+# Limites (segundos) dos buckets do histograma exportado
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+PREFIXO_PROMETHEUS = "gerador_xml"
+
+LOG_LENTAS = logging.getLogger("gerador_xml.lentas")
+
+_ativo = os.environ.get(VARIAVEL_ATIVACAO, "").strip().lower() in ("1", "true", "sim")
+_limite_lento = LIMITE_LENTO_PADRAO_MS / 1000
+_trava = threading.Lock()
+_metricas = {}
+
+
+def ativo():
+    return _ativo
+
+
+def configurar(cfg=None):
+    """
+    Aplica a seção "metricas" do config.json (a variável de ambiente continua
+    valendo se a chave "ativo" não for informada).
+    """
+    global _ativo, _limite_lento
+    cfg = cfg or {}
+    if "ativo" in cfg:
+        _ativo = bool(cfg["ativo"])
+    _limite_lento = float(cfg.get("limite_lento_ms", LIMITE_LENTO_PADRAO_MS)) / 1000
+    arquivo_log = cfg.get("log_lentas")
+    if arquivo_log and not any(getattr(h, "baseFilename", None) == os.path.abspath(arquivo_log)
+                               for h in LOG_LENTAS.handlers):
+        handler = logging.FileHandler(arquivo_log, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        LOG_LENTAS.addHandler(handler)
+        LOG_LENTAS.setLevel(logging.INFO)
+
+
+# ---------- REGISTRO ----------
+class Metrica:
+    """Acumulado de uma operação"""
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.chamadas = 0
+        self.erros = 0
+        self.lentas = 0
+        self.segundos = 0.0
+        self.maximo = 0.0
+        self.linhas = 0
+        self.bytes = 0
+        self.buckets = [0] * len(BUCKETS)
+
+    def como_dict(self):
+        return {
+            "operacao": self.nome,
+            "chamadas": self.chamadas,
+            "erros": self.erros,
+            "lentas": self.lentas,
+            "segundos": self.segundos,
+            "media_ms": self.segundos / self.chamadas * 1000 if self.chamadas else 0.0,
+            "maximo_ms": self.maximo * 1000,
+            "linhas": self.linhas,
+            "bytes": self.bytes,
+        }
+
+
+def registrar(nome, segundos, linhas=None, num_bytes=None, erro=False):
+    """Soma uma execução da operação `nome` e registra no log se passou do limite"""
+    with _trava:
+        metrica = _metricas.get(nome)
+        if metrica is None:
+            metrica = _metricas[nome] = Metrica(nome)
+        metrica.chamadas += 1
+        metrica.segundos += segundos
+        metrica.maximo = max(metrica.maximo, segundos)
+        if erro:
+            metrica.erros += 1
+        if linhas:
+            metrica.linhas += linhas
+        if num_bytes:
+            metrica.bytes += num_bytes
+        for i, limite in enumerate(BUCKETS):
+            if segundos <= limite:
+                metrica.buckets[i] += 1
+                break
+        lenta = segundos >= _limite_lento
+        if lenta:
+            metrica.lentas += 1
+    if lenta:
+        LOG_LENTAS.warning("lenta: %s %.1f ms linhas=%s bytes=%s%s", nome, segundos * 1000,
+                           linhas if linhas is not None else "-", num_bytes if num_bytes is not None else "-",
+                           " (erro)" if erro else "")
+
+
+def tamanho_bytes(texto):
+    """Tamanho em UTF-8 do texto (0 sem calcular quando as métricas estão desligadas)"""
+    if not _ativo or not texto:
+        return 0
+    return len(texto.encode("utf-8"))
+
+
+def instrumentar(nome, linhas=None, num_bytes=None):
+    """
+    Decorador: registra tempo, erros e, opcionalmente, linhas e bytes do
+    resultado (`linhas(resultado)`, `num_bytes(resultado)`).
+    Com as métricas desligadas retorna a função sem alteração.
+    """
+    def decorador(funcao):
+        if not _ativo:
+            return funcao
+
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                resultado = funcao(*args, **kwargs)
+            except Exception:
+                registrar(nome, time.perf_counter() - inicio, erro=True)
+                raise
+            decorrido = time.perf_counter() - inicio
+            registrar(nome, decorrido,
+                      linhas(resultado) if linhas else None,
+                      num_bytes(resultado) if num_bytes else None)
+            return resultado
+        return medida
+    return decorador
+
+
+class _Fase:
+    __slots__ = ("nome", "linhas", "num_bytes", "inicio")
+
+    def __init__(self, nome, linhas, num_bytes):
+        self.nome = nome
+        self.linhas = linhas
+        self.num_bytes = num_bytes
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        registrar(self.nome, time.perf_counter() - self.inicio, self.linhas, self.num_bytes, erro=tipo is not None)
+        return False
+
+
+class _FaseDesligada:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        return False
+
+
+_FASE_DESLIGADA = _FaseDesligada()
+
+
+def fase(nome, linhas=None, num_bytes=None):
+    """Context manager que mede um trecho (ex.: execute e commit de salvar_xml)"""
+    if not _ativo:
+        return _FASE_DESLIGADA
+    return _Fase(nome, linhas, num_bytes)
+
+
+# ---------- CONSULTA E EXPORTAÇÃO ----------
+def instantaneo():
+    """Lista de dicionários com o acumulado de cada operação, por nome"""
+    with _trava:
+        return [_metricas[nome].como_dict() for nome in sorted(_metricas)]
+
+
+def zerar():
+    with _trava:
+        _metricas.clear()
+
+
+def texto_prometheus():
+    """Métricas no formato texto de exposição do Prometheus"""
+    p = PREFIXO_PROMETHEUS
+    with _trava:
+        metricas = [_metricas[nome] for nome in sorted(_metricas)]
+        linhas = [
+            f"# HELP {p}_operacao_segundos Duração das operações instrumentadas.",
+            f"# TYPE {p}_operacao_segundos histogram",
+        ]
+        for m in metricas:
+            acumulado = 0
+            for limite, quantidade in zip(BUCKETS, m.buckets):
+                acumulado += quantidade
+                linhas.append(f'{p}_operacao_segundos_bucket{{operacao="{m.nome}",le="{limite}"}} {acumulado}')
+            linhas.append(f'{p}_operacao_segundos_bucket{{operacao="{m.nome}",le="+Inf"}} {m.chamadas}')
+            linhas.append(f'{p}_operacao_segundos_sum{{operacao="{m.nome}"}} {m.segundos:.6f}')
+            linhas.append(f'{p}_operacao_segundos_count{{operacao="{m.nome}"}} {m.chamadas}')
+        for campo, descricao in (("linhas", "Linhas lidas ou gravadas."),
+                                 ("bytes", "Bytes de XML gravados, lidos ou gerados."),
+                                 ("erros", "Execuções que terminaram com exceção."),
+                                 ("lentas", "Execuções acima do limite de operação lenta.")):
+            linhas.append(f"# HELP {p}_operacao_{campo}_total {descricao}")
+            linhas.append(f"# TYPE {p}_operacao_{campo}_total counter")
+            for m in metricas:
+                linhas.append(f'{p}_operacao_{campo}_total{{operacao="{m.nome}"}} {getattr(m, campo)}')
+    return "\n".join(linhas) + "\n"
+
+
+def exportar_prometheus(caminho):
+    """Grava o arquivo .prom de uma vez (arquivo temporário + rename), como o textfile collector exige"""
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(texto_prometheus())
+    os.replace(temporario, caminho)
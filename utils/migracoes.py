@@ -0,0 +1,123 @@
+"""
+utils/migracoes.py
+Executor das migrações versionadas em Scripts/migracoes.
+
+Cada arquivo segue o padrão V<numero>__<descricao>.sql e contém comandos
+separados por uma linha com apenas "/". As versões aplicadas ficam
+registradas na tabela SCHEMA_MIGRACOES; rodar de novo só aplica o que falta.
+Objetos que já existem (criados à mão ou por uma execução interrompida)
+não impedem a migração de ser concluída.
+
+Uso: python -m utils.migracoes <tns> <usuario>
+"""
+
+import os
+import re
+import sys
+from getpass import getpass
+
+import oracledb
+
+DIRETORIO_PADRAO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "Scripts", "migracoes")
+TABELA_CONTROLE = "SCHEMA_MIGRACOES"
+
+# ORA-00955: nome já usado; ORA-01408: colunas já indexadas; ORA-01430: coluna já existe
+ERROS_JA_EXISTE = {955, 1408, 1430}
+
+_PADRAO_ARQUIVO = re.compile(r"^V(\d+)__(\w+)\.sql$", re.IGNORECASE)
+
+
+def listar_migracoes(diretorio=None):
+    """Retorna lista ordenada de tuplas (versao, nome_arquivo, caminho)"""
+    diretorio = diretorio or DIRETORIO_PADRAO
+    migracoes = []
+    for nome in os.listdir(diretorio):
+        m = _PADRAO_ARQUIVO.match(nome)
+        if m:
+            migracoes.append((int(m.group(1)), nome, os.path.join(diretorio, nome)))
+    return sorted(migracoes)
+
+
+def ler_comandos(caminho):
+    """Divide o script em comandos (separados por linhas com apenas "/"), sem comentários"""
+    with open(caminho, "r", encoding="utf-8") as f:
+        conteudo = f.read()
+    comandos = []
+    for bloco in re.split(r"^\s*/\s*$", conteudo, flags=re.MULTILINE):
+        linhas = [l for l in bloco.splitlines() if not l.strip().startswith("--")]
+        comando = "\n".join(linhas).strip()
+        if comando:
+            comandos.append(comando)
+    return comandos
+
+
+def _executar_tolerante(cur, comando):
+    """Executa o comando ignorando erros de objeto já existente"""
+    try:
+        cur.execute(comando)
+    except oracledb.DatabaseError as e:
+        erro, = e.args
+        if erro.code not in ERROS_JA_EXISTE:
+            raise
+
+
+def migracoes_aplicadas(conn):
+    """Cria a tabela de controle se preciso e retorna o conjunto de versões já aplicadas"""
+    cur = conn.cursor()
+    try:
+        _executar_tolerante(cur, f"""
+            CREATE TABLE {TABELA_CONTROLE} (
+              VERSAO NUMBER PRIMARY KEY,
+              ARQUIVO VARCHAR2(200) NOT NULL,
+              APLICADA_EM TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL
+            )
+        """)
+        cur.execute(f"SELECT VERSAO FROM {TABELA_CONTROLE}")
+        return {int(versao) for versao, in cur.fetchall()}
+    finally:
+        cur.close()
+
+
+def aplicar_migracoes(conn, diretorio=None, ao_aplicar=None):
+    """
+    Aplica, em ordem, as migrações ainda não registradas.
+    `ao_aplicar(nome_arquivo)` é chamado antes de cada migração.
+    Retorna a lista de arquivos aplicados nesta execução.
+    """
+    aplicadas = migracoes_aplicadas(conn)
+    executadas = []
+    cur = conn.cursor()
+    try:
+        for versao, nome, caminho in listar_migracoes(diretorio):
+            if versao in aplicadas:
+                continue
+            if ao_aplicar:
+                ao_aplicar(nome)
+            for comando in ler_comandos(caminho):
+                _executar_tolerante(cur, comando)
+            cur.execute(
+                f"INSERT INTO {TABELA_CONTROLE} (VERSAO, ARQUIVO) VALUES (:versao, :arquivo)",
+                {"versao": versao, "arquivo": nome},
+            )
+            conn.commit()
+            executadas.append(nome)
+        return executadas
+    finally:
+        cur.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(2)
+
+    from utils.db_utils import conectar_oracle, desconectar_oracle
+
+    tns, usuario = sys.argv[1], sys.argv[2]
+    conn = conectar_oracle(usuario, getpass("Senha: "), tns)
+    try:
+        executadas = aplicar_migracoes(conn, ao_aplicar=lambda nome: print(f"Aplicando {nome}..."))
+        print(f"{len(executadas)} migração(ões) aplicada(s).")
+    finally:
+        desconectar_oracle(conn)
@@ -0,0 +1,171 @@
+"""
+utils/pipeline.py
+Geração em paralelo (vários processos) para arquivos CSV/JSONL grandes.
+
+A entrada é dividida em blocos; cada bloco é normalizado, validado e
+serializado em um processo do pool. Os blocos são consumidos na ordem em que
+foram lidos, então a saída é sempre a mesma, qualquer que seja o número de
+processos. A saída vai para um único stream ou para arquivos por bloco
+(shards), gravados pelos próprios processos.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from utils.registros import registro_jsonl
+from utils.xml_utils import funcao_escrita, gerar_xml_pretty, normalizar_agente, normalizar_conta_pagar
+
+# tipo -> (root tag, normalizador, nome da validação em lote de utils/validacao.py)
+TIPOS = {
+    "agente": ("Agente", normalizar_agente, "verificar_agentes_lote"),
+    "conta_pagar": ("ContaPagar", normalizar_conta_pagar, "verificar_contas_pagar_lote"),
+}
+
+TAMANHO_BLOCO_PADRAO = 2000
+
+
+def nome_shard(diretorio, prefixo, numero):
+    return os.path.join(diretorio, f"{prefixo}_{numero:06d}.xml")
+
+
+def _validacao():
+    # Importado aqui: utils.validacao carrega o NumPy, desnecessário sem validação
+    from utils import validacao
+    return validacao
+
+
+def descrever_erro(codigo):
+    return f"[{codigo}] {_validacao().mensagem(codigo)}"
+
+
+def preparar_bloco(tipo, bloco, validar=True):
+    """
+    Converte e normaliza um bloco de (linha, registro) e valida o bloco
+    inteiro de uma vez; o registro pode ser um dicionário ou uma linha JSONL
+    ainda sem parse. Retorna (validos, rejeitados): listas de (linha, dados)
+    e de (linha, mensagem).
+    """
+    _, normalizar, nome_validacao = TIPOS[tipo]
+    normalizados = []
+    rejeitados = []
+    for linha, registro in bloco:
+        try:
+            if isinstance(registro, str):
+                registro = registro_jsonl(registro)
+            normalizados.append((linha, normalizar(registro)))
+        except ValueError as e:
+            rejeitados.append((linha, str(e)))
+    if not validar:
+        return normalizados, rejeitados
+
+    verificar_lote = getattr(_validacao(), nome_validacao)
+    codigos = verificar_lote([dados for _, dados in normalizados])
+    validos = []
+    for (linha, dados), codigo in zip(normalizados, codigos):
+        if codigo is None:
+            validos.append((linha, dados))
+        else:
+            rejeitados.append((linha, descrever_erro(codigo)))
+    rejeitados.sort()
+    return validos, rejeitados
+
+
+def processar_bloco(tipo, bloco, validar=True, caminho_shard=None):
+    """
+    Prepara (preparar_bloco) e serializa um bloco de (linha, registro).
+    Retorna (xml, gerados, rejeitados): `xml` é o texto concatenado do bloco,
+    ou None quando gravado em `caminho_shard`; `rejeitados` é a lista de
+    (linha, mensagem).
+    """
+    root_tag = TIPOS[tipo][0]
+    validos, rejeitados = preparar_bloco(tipo, bloco, validar)
+    partes = []
+    for linha, dados in validos:
+        try:
+            partes.append(gerar_xml_pretty(root_tag, dados))
+        except (ValueError, TypeError) as e:
+            rejeitados.append((linha, str(e)))
+    rejeitados.sort()
+
+    if caminho_shard is None:
+        return "".join(partes), len(partes), rejeitados
+    if partes:
+        with open(caminho_shard, "w", encoding="utf-8", newline="\n") as f:
+            f.write("".join(partes))
+    return None, len(partes), rejeitados
+
+
+def _blocos(registros, tamanho_bloco):
+    registros = iter(registros)
+    while True:
+        bloco = list(islice(registros, tamanho_bloco))
+        if not bloco:
+            return
+        yield bloco
+
+
+def gerar_paralelo(tipo, registros, destino=None, diretorio_shards=None, prefixo_shard=None,
+                   processos=None, tamanho_bloco=TAMANHO_BLOCO_PADRAO, validar=True, ao_rejeitar=None):
+    """
+    Gera os XMLs de `registros` (iterável de (linha, registro)) em paralelo.
+    Prefira ler_registros(..., bruto=True): o parse do JSONL também é feito
+    nos processos, e só texto trafega entre eles.
+
+    Informe `destino` (stream de texto/binário ou socket, ver escrever_xmls_lote)
+    para uma saída única, ou `diretorio_shards` para um arquivo por bloco
+    (<prefixo>_000001.xml, ...; blocos sem nenhum documento válido não geram
+    arquivo). `processos` padrão: os.cpu_count(); com 1 tudo roda neste processo.
+    No máximo 2 blocos por processo ficam em memória ao mesmo tempo.
+    `ao_rejeitar(linha, mensagem)` é chamado para cada registro rejeitado.
+
+    Retorna {"gerados": int, "rejeitados": int, "shards": [caminhos]}.
+    """
+    if (destino is None) == (diretorio_shards is None):
+        raise ValueError("Informe destino ou diretorio_shards (apenas um).")
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo desconhecido: {tipo!r}")
+    processos = processos or os.cpu_count() or 1
+    prefixo_shard = prefixo_shard or TIPOS[tipo][0]
+    if diretorio_shards is not None:
+        os.makedirs(diretorio_shards, exist_ok=True)
+
+    resumo = {"gerados": 0, "rejeitados": 0, "shards": []}
+    escrever = funcao_escrita(destino) if destino is not None else None
+
+    def consumir(numero, resultado):
+        xml, gerados, rejeitados = resultado
+        resumo["gerados"] += gerados
+        resumo["rejeitados"] += len(rejeitados)
+        if ao_rejeitar:
+            for linha, mensagem in rejeitados:
+                ao_rejeitar(linha, mensagem)
+        if xml is not None:
+            if xml:
+                escrever(xml)
+        elif gerados:
+            resumo["shards"].append(nome_shard(diretorio_shards, prefixo_shard, numero))
+
+    def argumentos(numero, bloco):
+        caminho = nome_shard(diretorio_shards, prefixo_shard, numero) if diretorio_shards else None
+        return tipo, bloco, validar, caminho
+
+    blocos = enumerate(_blocos(registros, tamanho_bloco), 1)
+    if processos == 1:
+        for numero, bloco in blocos:
+            consumir(numero, processar_bloco(*argumentos(numero, bloco)))
+        return resumo
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        pendentes = deque()
+        for numero, bloco in blocos:
+            pendentes.append((numero, executor.submit(processar_bloco, *argumentos(numero, bloco))))
+            # Janela limitada: consome o mais antigo antes de enviar mais blocos
+            while len(pendentes) >= 2 * processos:
+                numero_antigo, futuro = pendentes.popleft()
+                consumir(numero_antigo, futuro.result())
+        while pendentes:
+            numero_antigo, futuro = pendentes.popleft()
+            consumir(numero_antigo, futuro.result())
+    return resumo
@@ -0,0 +1,69 @@
+"""
+utils/registros.py
+Leitura de registros (dicionários) de arquivos CSV e JSONL, sob demanda.
+As colunas/chaves devem ter os nomes das tags do XML (Nome, CPF, Valor...).
+"""
+
+import csv
+import json
+import os
+import sys
+
+FORMATOS = ("csv", "jsonl")
+
+
+def detectar_formato(caminho):
+    """Deduz o formato pela extensão do arquivo ("csv" ou "jsonl")"""
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    if extensao in (".csv", ".txt"):
+        return "csv"
+    raise ValueError(f"Não foi possível deduzir o formato de {caminho!r}; informe csv ou jsonl.")
+
+
+def _abrir(caminho):
+    if caminho == "-":
+        return sys.stdin, False
+    # utf-8-sig ignora o BOM gravado pelo Excel
+    return open(caminho, "r", encoding="utf-8-sig", newline=""), True
+
+
+def registro_jsonl(linha, numero=None):
+    """Converte uma linha JSONL em dicionário (ValueError se não for um objeto JSON)"""
+    prefixo = f"linha {numero}: " if numero is not None else ""
+    try:
+        registro = json.loads(linha)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{prefixo}JSON inválido ({e.msg})") from None
+    if not isinstance(registro, dict):
+        raise ValueError(f"{prefixo}esperado um objeto JSON")
+    return registro
+
+
+def ler_registros(caminho, formato=None, delimitador=",", bruto=False):
+    """
+    Gera tuplas (numero_linha, registro) do arquivo ("-" para a entrada padrão).
+    Linhas em branco do JSONL são ignoradas; uma linha JSON inválida levanta
+    ValueError indicando o número da linha.
+    Com bruto=True as linhas JSONL saem como texto, sem parse (ver
+    registro_jsonl), para que a conversão seja feita por quem as consome.
+    """
+    if formato is None:
+        formato = "jsonl" if caminho == "-" else detectar_formato(caminho)
+    arquivo, fechar = _abrir(caminho)
+    try:
+        if formato == "csv":
+            leitor = csv.DictReader(arquivo, delimiter=delimitador)
+            for registro in leitor:
+                yield leitor.line_num, registro
+        elif formato == "jsonl":
+            for numero, linha in enumerate(arquivo, 1):
+                if not linha.strip():
+                    continue
+                yield numero, linha if bruto else registro_jsonl(linha, numero)
+        else:
+            raise ValueError(f"Formato desconhecido: {formato!r} (use {', '.join(FORMATOS)})")
+    finally:
+        if fechar:
+            arquivo.close()
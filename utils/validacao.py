@@ -0,0 +1,258 @@
+"""
+utils/validacao.py
+Regras de validação de agentes e contas a pagar, sem depender de widgets.
+As telas (TelaAgente.validar_campos e TelaContasPagar.validar_campos), a
+linha de comando e o pipeline usam as mesmas funções.
+
+Cada regra tem um código (ERRO_*) e uma mensagem (MENSAGENS):
+  verificar_agente / verificar_conta_pagar   -> código do primeiro erro ou None
+  validar_agente / validar_conta_pagar       -> mensagem do primeiro erro ou None
+  verificar_agentes_lote / verificar_contas_pagar_lote
+                                             -> um código (ou None) por registro
+
+CPF e CNPJ são conferidos pelos dígitos verificadores (o CNPJ também no
+formato alfanumérico: 12 caracteres 0-9/A-Z e 2 dígitos). Em lote, a conta dos
+dígitos é feita de uma vez para a coluna inteira com NumPy, se instalado
+(sem NumPy, registro a registro, com o mesmo resultado).
+"""
+
+import re
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from utils.xml_utils import PESSOA_FISICA
+
+# ---------- CÓDIGOS DE ERRO ----------
+ERRO_NOME_OBRIGATORIO = "NOME_OBRIGATORIO"
+ERRO_CPF_INCOMPLETO = "CPF_INCOMPLETO"
+ERRO_CPF_INVALIDO = "CPF_INVALIDO"
+ERRO_CNPJ_INCOMPLETO = "CNPJ_INCOMPLETO"
+ERRO_CNPJ_INVALIDO = "CNPJ_INVALIDO"
+ERRO_TELEFONE_OBRIGATORIO = "TELEFONE_OBRIGATORIO"
+ERRO_EMAIL_OBRIGATORIO = "EMAIL_OBRIGATORIO"
+ERRO_EMAIL_INVALIDO = "EMAIL_INVALIDO"
+ERRO_AGENTE_OBRIGATORIO = "AGENTE_OBRIGATORIO"
+ERRO_DESCRICAO_OBRIGATORIA = "DESCRICAO_OBRIGATORIA"
+ERRO_VALOR_OBRIGATORIO = "VALOR_OBRIGATORIO"
+ERRO_VALOR_NAO_POSITIVO = "VALOR_NAO_POSITIVO"
+ERRO_VALOR_NAO_NUMERICO = "VALOR_NAO_NUMERICO"
+ERRO_DATA_EMISSAO_INCOMPLETA = "DATA_EMISSAO_INCOMPLETA"
+ERRO_DATA_EMISSAO_INVALIDA = "DATA_EMISSAO_INVALIDA"
+ERRO_DATA_VENCIMENTO_INCOMPLETA = "DATA_VENCIMENTO_INCOMPLETA"
+ERRO_DATA_VENCIMENTO_INVALIDA = "DATA_VENCIMENTO_INVALIDA"
+
+MENSAGENS = {
+    ERRO_NOME_OBRIGATORIO: "O campo Nome é obrigatório.",
+    ERRO_CPF_INCOMPLETO: "CPF inválido ou incompleto.",
+    ERRO_CPF_INVALIDO: "CPF inválido (dígitos verificadores não conferem).",
+    ERRO_CNPJ_INCOMPLETO: "CNPJ inválido ou incompleto.",
+    ERRO_CNPJ_INVALIDO: "CNPJ inválido (dígitos verificadores não conferem).",
+    ERRO_TELEFONE_OBRIGATORIO: "Telefone é obrigatório.",
+    ERRO_EMAIL_OBRIGATORIO: "E-mail é obrigatório.",
+    ERRO_EMAIL_INVALIDO: "E-mail inválido.",
+    ERRO_AGENTE_OBRIGATORIO: "Selecione um agente antes de continuar.",
+    ERRO_DESCRICAO_OBRIGATORIA: "O campo Descrição é obrigatório.",
+    ERRO_VALOR_OBRIGATORIO: "O campo Valor é obrigatório.",
+    ERRO_VALOR_NAO_POSITIVO: "O valor deve ser maior que zero.",
+    ERRO_VALOR_NAO_NUMERICO: "O campo Valor deve conter apenas números.",
+    ERRO_DATA_EMISSAO_INCOMPLETA: "Data de Emissão é obrigatória e deve estar completa (dd/mm/aaaa).",
+    ERRO_DATA_EMISSAO_INVALIDA: "Data de Emissão está em formato inválido. Use dd/mm/aaaa.",
+    ERRO_DATA_VENCIMENTO_INCOMPLETA: "Data de Vencimento é obrigatória e deve estar completa (dd/mm/aaaa).",
+    ERRO_DATA_VENCIMENTO_INVALIDA: "Data de Vencimento está em formato inválido. Use dd/mm/aaaa.",
+}
+
+_EMAIL = re.compile(r"^[\w\.-]+@[\w\.-]+\.\w+$")
+# Máscaras aceitas em CPF/CNPJ (".", "-", "/" e espaço); qualquer outro
+# caractere torna o documento incompleto
+_SEM_MASCARA = str.maketrans("", "", ".-/ ")
+
+_PESOS_CPF = (tuple(range(10, 1, -1)), tuple(range(11, 1, -1)))
+_PESOS_CNPJ = ((5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2), (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2))
+
+# tipo de documento -> (formato sem máscara, pesos, erro incompleto, erro inválido)
+_DOCUMENTOS = {
+    "CPF": (re.compile(r"[0-9]{11}"), _PESOS_CPF, ERRO_CPF_INCOMPLETO, ERRO_CPF_INVALIDO),
+    "CNPJ": (re.compile(r"[0-9A-Z]{12}[0-9]{2}"), _PESOS_CNPJ, ERRO_CNPJ_INCOMPLETO, ERRO_CNPJ_INVALIDO),
+}
+
+
+def mensagem(codigo):
+    """Mensagem exibida ao usuário para o código de erro (None se não houver erro)"""
+    return MENSAGENS.get(codigo, codigo) if codigo else None
+
+
+# ---------- CPF / CNPJ ----------
+def _digito(digitos, pesos):
+    resto = sum(d * p for d, p in zip(digitos, pesos)) % 11
+    return 0 if resto < 2 else 11 - resto
+
+
+def verificar_documento(valor, tipo="CPF"):
+    """Código de erro do CPF/CNPJ (com ou sem máscara) ou None se válido"""
+    formato, (pesos1, pesos2), incompleto, invalido = _DOCUMENTOS[tipo]
+    numeros = (valor or "").translate(_SEM_MASCARA).upper()
+    if not formato.fullmatch(numeros):
+        return incompleto
+    # Letras do CNPJ alfanumérico valem o código ASCII menos 48 (A = 17)
+    digitos = [ord(c) - 48 for c in numeros]
+    if len(set(digitos)) == 1:
+        return invalido
+    if digitos[-2] != _digito(digitos, pesos1) or digitos[-1] != _digito(digitos, pesos2):
+        return invalido
+    return None
+
+
+def cpf_valido(valor):
+    return verificar_documento(valor, "CPF") is None
+
+
+def cnpj_valido(valor):
+    return verificar_documento(valor, "CNPJ") is None
+
+
+def _verificar_documentos_numpy(valores, tipo):
+    _, (pesos1, pesos2), incompleto, invalido = _DOCUMENTOS[tipo]
+    tamanho = len(pesos2) + 1
+    # Só a retirada da máscara é feita por valor (str.replace, em C); o resto
+    # é conta sobre a matriz (registros x caracteres) com o código de cada caractere.
+    # Uma coluna a mais identifica valores maiores que o documento; 0 = preenchimento.
+    limpos = [v.replace(".", "").replace("-", "").replace("/", "").replace(" ", "") for v in valores]
+    if tipo == "CNPJ":
+        limpos = [v.upper() for v in limpos]
+    codigos = np.array(limpos, dtype=f"U{tamanho + 1}").view(np.uint32).reshape(len(limpos), tamanho + 1)
+    digitos = codigos[:, :tamanho].astype(np.int32) - 48
+    eh_digito = (digitos >= 0) & (digitos <= 9)
+    if tipo == "CNPJ":
+        # Letras (A = 17 ... Z = 42) só nas 12 primeiras posições
+        eh_letra = (digitos[:, :12] >= 17) & (digitos[:, :12] <= 42)
+        completo = (eh_digito[:, :12] | eh_letra).all(axis=1) & eh_digito[:, 12:].all(axis=1)
+    else:
+        completo = eh_digito.all(axis=1)
+    completo &= codigos[:, tamanho] == 0
+
+    def digito(pesos):
+        resto = (digitos[:, :len(pesos)] * np.array(pesos, dtype=np.int32)).sum(axis=1) % 11
+        return np.where(resto < 2, 0, 11 - resto)
+
+    confere = (
+        (digitos[:, -2] == digito(pesos1))
+        & (digitos[:, -1] == digito(pesos2))
+        & (digitos != digitos[:, :1]).any(axis=1)
+    )
+    codigos_erro = np.where(completo, np.where(confere, None, invalido), incompleto)
+    return codigos_erro.tolist()
+
+
+def verificar_documentos(valores, tipo="CPF"):
+    """
+    Confere uma coluna inteira de CPFs ou CNPJs.
+    Retorna uma lista com o código de erro (ou None) de cada valor, na ordem.
+    """
+    valores = ["" if v is None else str(v) for v in valores]
+    if not valores:
+        return []
+    if np is not None:
+        return _verificar_documentos_numpy(valores, tipo)
+    return [verificar_documento(v, tipo) for v in valores]
+
+
+# ---------- AGENTE ----------
+def _tipo_documento(dados):
+    return "CPF" if dados.get("TipoPessoa") == PESSOA_FISICA else "CNPJ"
+
+
+def _verificar_contato(dados):
+    if not dados.get("Telefone", "").strip().replace("(", "").replace(")", "").replace("-", "").replace(" ", ""):
+        return ERRO_TELEFONE_OBRIGATORIO
+    email = dados.get("Email", "").strip()
+    if not email:
+        return ERRO_EMAIL_OBRIGATORIO
+    if not _EMAIL.match(email):
+        return ERRO_EMAIL_INVALIDO
+    return None
+
+
+def verificar_agente(dados):
+    """Código do primeiro erro do agente (formato de normalizar_agente) ou None"""
+    if not dados.get("Nome", "").strip():
+        return ERRO_NOME_OBRIGATORIO
+    tipo = _tipo_documento(dados)
+    return verificar_documento(dados.get(tipo, ""), tipo) or _verificar_contato(dados)
+
+
+def validar_agente(dados):
+    """Mensagem do primeiro erro do agente ou None"""
+    return mensagem(verificar_agente(dados))
+
+
+def verificar_agentes_lote(lista_dados):
+    """
+    Valida vários agentes; CPFs e CNPJs são conferidos por coluna.
+    Retorna um código de erro (ou None) por registro, na ordem, igual a
+    chamar verificar_agente em cada um.
+    """
+    lista_dados = list(lista_dados)
+    erros_documento = [None] * len(lista_dados)
+    for tipo in _DOCUMENTOS:
+        posicoes = [i for i, dados in enumerate(lista_dados) if _tipo_documento(dados) == tipo]
+        coluna = verificar_documentos([lista_dados[i].get(tipo, "") for i in posicoes], tipo)
+        for i, erro in zip(posicoes, coluna):
+            erros_documento[i] = erro
+
+    codigos = []
+    for dados, erro_documento in zip(lista_dados, erros_documento):
+        if not dados.get("Nome", "").strip():
+            codigos.append(ERRO_NOME_OBRIGATORIO)
+        else:
+            codigos.append(erro_documento or _verificar_contato(dados))
+    return codigos
+
+
+# ---------- CONTA A PAGAR ----------
+_DATAS = (
+    ("DataEmissao", ERRO_DATA_EMISSAO_INCOMPLETA, ERRO_DATA_EMISSAO_INVALIDA),
+    ("DataVencimento", ERRO_DATA_VENCIMENTO_INCOMPLETA, ERRO_DATA_VENCIMENTO_INVALIDA),
+)
+
+
+def verificar_conta_pagar(dados):
+    """Código do primeiro erro da conta a pagar (formato de normalizar_conta_pagar) ou None"""
+    if not dados.get("AgenteID", "").strip():
+        return ERRO_AGENTE_OBRIGATORIO
+
+    if not dados.get("Descricao", "").strip():
+        return ERRO_DESCRICAO_OBRIGATORIA
+
+    valor_txt = dados.get("Valor", "").strip()
+    if not valor_txt:
+        return ERRO_VALOR_OBRIGATORIO
+    try:
+        if float(valor_txt.replace(",", ".")) <= 0:
+            return ERRO_VALOR_NAO_POSITIVO
+    except ValueError:
+        return ERRO_VALOR_NAO_NUMERICO
+
+    for campo, incompleta, invalida in _DATAS:
+        data_txt = dados.get(campo, "").strip()
+        if not data_txt or "_" in data_txt:
+            return incompleta
+        try:
+            datetime.strptime(data_txt, "%d/%m/%Y")
+        except ValueError:
+            return invalida
+
+    return None
+
+
+def validar_conta_pagar(dados):
+    """Mensagem do primeiro erro da conta a pagar ou None"""
+    return mensagem(verificar_conta_pagar(dados))
+
+
+def verificar_contas_pagar_lote(lista_dados):
+    """Um código de erro (ou None) por conta a pagar, na ordem"""
+    return [verificar_conta_pagar(dados) for dados in lista_dados]
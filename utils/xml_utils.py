@@ -1,12 +1,257 @@
-from xml.etree.ElementTree import Element, SubElement, tostring
-from xml.dom.minidom import parseString
+import io
+import re
+from functools import lru_cache
+from xml.dom.minidom import Document
 
+from utils.metricas import instrumentar, tamanho_bytes
 
+_DECLARACAO = '<?xml version="1.0" ?>\n'
+_INDENTACAO = "  "
+
+# Caracteres que o XML 1.0 não aceita (o parse do minidom rejeitava esses valores)
+_INVALIDOS = "\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff"
+_CARACTERES_INVALIDOS = re.compile(f"[{_INVALIDOS}]")
+# Qualquer caractere que exija tratamento (escape, normalização ou erro)
+_PRECISA_TRATAR = re.compile(f"[&<>\"\r{_INVALIDOS}]")
+
+# Campos, na ordem em que as telas montam os dicionários
+# (TelaAgente.gerar_xml e TelaContasPagar.gerar_xml)
+CAMPOS_AGENTE_PF = ("Nome", "TipoPessoa", "TipoAgente", "Endereco", "Telefone", "Email", "CPF")
+CAMPOS_AGENTE_PJ = ("Nome", "TipoPessoa", "TipoAgente", "Endereco", "Telefone", "Email", "CNPJ")
+CAMPOS_CONTA_PAGAR = (
+    "AgenteID", "AgenteNome", "CNPJ_CPF", "EmailAgente",
+    "Descricao", "Valor", "DataEmissao", "DataVencimento",
+)
+
+
+PESSOA_FISICA = "Pessoa Física"
+PESSOA_JURIDICA = "Pessoa Jurídica"
+
+
+def _valor_campo(registro, campo):
+    """Valor do campo no registro (chave exata ou sem diferenciar maiúsculas), como texto"""
+    valor = registro.get(campo)
+    if valor is None:
+        campo_minusculo = campo.lower()
+        for chave, v in registro.items():
+            if isinstance(chave, str) and chave.lower() == campo_minusculo:
+                valor = v
+                break
+    return "" if valor is None else str(valor).strip()
+
+
+def normalizar_agente(registro):
+    """
+    Monta, a partir de um registro lido de arquivo (CSV/JSONL), o dicionário
+    do agente no mesmo formato e ordem de TelaAgente.gerar_xml.
+    Sem TipoPessoa, o tipo é deduzido do documento informado.
+    """
+    dados = {campo: _valor_campo(registro, campo) for campo in CAMPOS_AGENTE_PF[:-1]}
+    cpf = _valor_campo(registro, "CPF")
+    cnpj = _valor_campo(registro, "CNPJ")
+    if not dados["TipoPessoa"]:
+        dados["TipoPessoa"] = PESSOA_JURIDICA if cnpj and not cpf else PESSOA_FISICA
+    if dados["TipoPessoa"] == PESSOA_FISICA:
+        dados["CPF"] = cpf
+    else:
+        dados["CNPJ"] = cnpj
+    return dados
+
+
+def normalizar_conta_pagar(registro):
+    """Monta o dicionário da conta a pagar no formato e ordem de TelaContasPagar.gerar_xml"""
+    dados = {campo: _valor_campo(registro, campo) for campo in CAMPOS_CONTA_PAGAR}
+    dados["Valor"] = dados["Valor"].replace(",", ".")
+    return dados
+
+
+def _minidom_escapa_aspas():
+    """Verifica se o minidom desta versão do Python escapa aspas em nós de texto"""
+    saida = io.StringIO()
+    Document().createTextNode('"').writexml(saida)
+    return saida.getvalue() != '"'
+
+
+_ESCAPA_ASPAS = _minidom_escapa_aspas()
+
+
+def _escapar_texto(texto):
+    """Escapa o texto de um elemento exatamente como o antigo round trip ElementTree + minidom"""
+    if not isinstance(texto, str):
+        raise TypeError(f"não é possível serializar {texto!r} (tipo {type(texto).__name__})")
+    if not _PRECISA_TRATAR.search(texto):
+        return texto
+    if _CARACTERES_INVALIDOS.search(texto):
+        raise ValueError(f"caractere inválido para XML em {texto!r}")
+    if "\r" in texto:
+        # O parser XML normaliza quebras de linha para \n
+        texto = texto.replace("\r\n", "\n").replace("\r", "\n")
+    if "&" in texto:
+        texto = texto.replace("&", "&amp;")
+    if "<" in texto:
+        texto = texto.replace("<", "&lt;")
+    if _ESCAPA_ASPAS and '"' in texto:
+        texto = texto.replace('"', "&quot;")
+    if ">" in texto:
+        texto = texto.replace(">", "&gt;")
+    return texto
+
+
+@lru_cache(maxsize=None)
+def _tags_raiz(root_tag):
+    """Abertura, fechamento e forma vazia do elemento raiz (calculados uma vez por tag)"""
+    return (f"{_DECLARACAO}<{root_tag}>\n", f"</{root_tag}>\n", f"{_DECLARACAO}<{root_tag}/>\n")
+
+
+@lru_cache(maxsize=1024)
+def _tags_campo(chave):
+    """Abertura, fechamento e forma vazia de um campo indentado"""
+    return (f"{_INDENTACAO}<{chave}>", f"</{chave}>\n", f"{_INDENTACAO}<{chave}/>\n")
+
+
+def _partes_xml(root_tag, dados_dict):
+    """Lista de trechos que, concatenados, formam o XML formatado"""
+    abertura, fechamento, vazio = _tags_raiz(root_tag)
+    if not dados_dict:
+        return [vazio]
+    partes = [abertura]
+    for chave, valor in dados_dict.items():
+        texto = _escapar_texto(valor or "")
+        abre, fecha, campo_vazio = _tags_campo(chave)
+        if texto:
+            partes += (abre, texto, fecha)
+        else:
+            partes.append(campo_vazio)
+    partes.append(fechamento)
+    return partes
+
+
+# ---------- SERIALIZADORES PRÉ-COMPILADOS ----------
+class SerializadorXml:
+    """
+    Serializador de um root tag com campos fixos, em ordem fixa.
+    As tags são montadas uma única vez, já unidas ao fechamento do campo
+    anterior; o documento sai de uma única passada pelos valores, que só
+    escapa os que precisam, e de um único join. Dicionários com outras chaves
+    caem no caminho genérico.
+    """
+
+    def __init__(self, root_tag, campos):
+        self.root_tag = root_tag
+        self.campos = tuple(campos)
+        abertura, fechamento, _ = _tags_raiz(root_tag)
+        tags = [_tags_campo(campo) for campo in self.campos]
+        # Por campo: (abertura, forma vazia), cada uma indexada pelo campo
+        # anterior ter valor (1: o fechamento dele vem junto) ou não (0)
+        self._trechos = []
+        antes, fecha_anterior = abertura, ""
+        for abre, fecha, campo_vazio in tags:
+            self._trechos.append((
+                (antes + abre, antes + fecha_anterior + abre),
+                (antes + campo_vazio, antes + fecha_anterior + campo_vazio),
+            ))
+            antes, fecha_anterior = "", fecha
+        self._fim = (fechamento, fecha_anterior + fechamento)
+
+    def __call__(self, dados_dict):
+        if not dados_dict or tuple(dados_dict) != self.campos:
+            return "".join(_partes_xml(self.root_tag, dados_dict))
+        return self._serializar(dados_dict.values())
+
+    def _serializar(self, valores):
+        """Monta o documento a partir dos valores, já na ordem de `campos`"""
+        partes = []
+        adicionar = partes.append
+        aberto = 0
+        for (abre, campo_vazio), valor in zip(self._trechos, valores):
+            if valor:
+                # Teste barato; o que não passar (inclusive \n e \t) vai para _escapar_texto
+                if not (valor.__class__ is str and valor.isprintable() and "&" not in valor
+                        and "<" not in valor and ">" not in valor and '"' not in valor):
+                    valor = _escapar_texto(valor)
+                adicionar(abre[aberto])
+                adicionar(valor)
+                aberto = 1
+            else:
+                adicionar(campo_vazio[aberto])
+                aberto = 0
+        adicionar(self._fim[aberto])
+        return "".join(partes)
+
+
+_SERIALIZADORES = {}
+
+
+def registrar_serializador(root_tag, campos):
+    """Compila (uma vez) e registra o serializador de um root tag com os campos informados"""
+    chave = (root_tag, tuple(campos))
+    serializador = _SERIALIZADORES.get(chave)
+    if serializador is None:
+        serializador = _SERIALIZADORES[chave] = SerializadorXml(root_tag, campos)
+    return serializador
+
+
+def obter_serializador(root_tag, campos):
+    """Retorna o serializador registrado para o root tag e campos, ou None"""
+    return _SERIALIZADORES.get((root_tag, tuple(campos)))
+
+
+registrar_serializador("Agente", CAMPOS_AGENTE_PF)
+registrar_serializador("Agente", CAMPOS_AGENTE_PJ)
+registrar_serializador("ContaPagar", CAMPOS_CONTA_PAGAR)
+
+
+def escrever_xml_pretty(saida, root_tag, dados_dict):
+    """Escreve em um stream de texto o XML formatado, em uma única passada"""
+    saida.write(gerar_xml_pretty(root_tag, dados_dict))
+
+
+@instrumentar("gerar_xml_pretty", num_bytes=tamanho_bytes)
 def gerar_xml_pretty(root_tag, dados_dict):
     """Gera XML formatado com indentação bonita"""
-    root = Element(root_tag)
-    for chave, valor in dados_dict.items():
-        SubElement(root, chave).text = valor or ""
-    xml_bytes = tostring(root, 'utf-8')
-    xml_pretty = parseString(xml_bytes).toprettyxml(indent="  ")
-    return xml_pretty
+    serializador = _SERIALIZADORES.get((root_tag, tuple(dados_dict)))
+    if serializador is not None and dados_dict:
+        return serializador._serializar(dados_dict.values())
+    return "".join(_partes_xml(root_tag, dados_dict))
+
+
+# ---------- GERAÇÃO EM LOTE ----------
+def gerar_xmls_lote(root_tag, registros):
+    """
+    Gera sob demanda um XML formatado para cada dicionário de `registros`.
+    Aceita qualquer iterável (inclusive geradores); nada é acumulado em memória.
+    """
+    for dados in registros:
+        yield gerar_xml_pretty(root_tag, dados)
+
+
+def funcao_escrita(destino):
+    """Retorna uma função que grava texto no destino (stream de texto, stream binário ou socket)"""
+    if hasattr(destino, "sendall"):
+        return lambda texto: destino.sendall(texto.encode("utf-8"))
+    if isinstance(destino, io.TextIOBase):
+        return destino.write
+    return lambda texto: destino.write(texto.encode("utf-8"))
+
+
+def escrever_xmls_lote(destino, root_tag, registros, tamanho_buffer=64 * 1024):
+    """
+    Grava em sequência os XMLs de `registros` no destino (arquivo aberto ou socket).
+    Os documentos são acumulados até `tamanho_buffer` caracteres antes de cada escrita.
+    Retorna a quantidade de documentos gravados.
+    """
+    escrever = funcao_escrita(destino)
+    buffer = []
+    tamanho = 0
+    total = 0
+    for xml in gerar_xmls_lote(root_tag, registros):
+        buffer.append(xml)
+        tamanho += len(xml)
+        total += 1
+        if tamanho >= tamanho_buffer:
+            escrever("".join(buffer))
+            buffer.clear()
+            tamanho = 0
+    if buffer:
+        escrever("".join(buffer))
+    return total
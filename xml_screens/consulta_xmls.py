@@ -0,0 +1,257 @@
+"""
+xml_screens/consulta_xmls.py
+Janela de consulta dos XMLs gravados, compartilhada pelas telas de Agente e
+de Contas a Pagar.
+
+A tabela é um QTableView sobre um modelo que busca as páginas sob demanda
+(canFetchMore/fetchMore) em segundo plano; o botão "Ver XML" é apenas
+desenhado por um delegate, sem um widget por linha. Assim a janela abre
+com a primeira página e a rolagem não depende da quantidade de linhas.
+O campo de busca troca a listagem pelos resultados de buscar_xmls (por
+conteúdo, do mais ao menos relevante), carregados da mesma forma. O botão
+"Exportar XMLs..." abre a exportação em massa da tabela.
+"""
+
+from array import array
+
+from PyQt5.QtCore import QAbstractTableModel, QEvent, QModelIndex, Qt, pyqtSignal
+from PyQt5.QtWidgets import (
+    QAbstractItemView, QApplication, QDialog, QHBoxLayout, QHeaderView, QLabel,
+    QLineEdit, QMessageBox, QPushButton, QStyle, QStyledItemDelegate,
+    QStyleOptionButton, QTableView, QVBoxLayout
+)
+
+from utils.db_utils import buscar_xmls, listar_previews_pagina
+from xml_screens.exportacao_xmls import abrir_exportacao_xmls
+
+# Quantidade de XMLs buscados por vez na consulta
+TAMANHO_PAGINA = 500
+
+COLUNA_ID, COLUNA_PREVIEW, COLUNA_ACOES = range(3)
+
+
+class ModeloPreviews(QAbstractTableModel):
+    """Modelo (ID, preview) de uma tabela de XMLs, carregado página a página"""
+    falhou = pyqtSignal(object)
+    pagina_carregada = pyqtSignal()
+
+    CABECALHOS = ("ID", "Preview", "Ações")
+
+    def __init__(self, tarefas, pool, tabela, tamanho_pagina=TAMANHO_PAGINA, parent=None):
+        super().__init__(parent)
+        self._tarefas = tarefas
+        self._pool = pool
+        self._tabela = tabela
+        self._tamanho_pagina = tamanho_pagina
+        # IDs em array compacto; previews em lista (um objeto por linha, nenhum por célula)
+        self._ids = array("q")
+        self._previews = []
+        self._apos_id = None
+        self._fim = False
+        self._tarefa = None
+        self._termo = ""
+        # Respostas de cargas anteriores a uma nova busca são descartadas
+        self._geracao = 0
+
+    @property
+    def fim(self):
+        return self._fim
+
+    @property
+    def termo(self):
+        return self._termo
+
+    def id_da_linha(self, linha):
+        return self._ids[linha]
+
+    # ---------- QAbstractTableModel ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.CABECALHOS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        linha, coluna = index.row(), index.column()
+        if role == Qt.DisplayRole:
+            if coluna == COLUNA_ID:
+                return str(self._ids[linha])
+            if coluna == COLUNA_PREVIEW:
+                return self._previews[linha]
+            return "Ver XML"
+        if role == Qt.ToolTipRole and coluna == COLUNA_PREVIEW:
+            return self._previews[linha]
+        if role == Qt.TextAlignmentRole and coluna == COLUNA_ID:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, secao, orientacao, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientacao == Qt.Horizontal:
+            return self.CABECALHOS[secao]
+        return super().headerData(secao, orientacao, role)
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    # ---------- CARGA SOB DEMANDA ----------
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._fim and self._tarefa is None
+
+    def fetchMore(self, parent=QModelIndex()):
+        """Chamado pela view ao chegar no fim da tabela: busca a próxima página em segundo plano"""
+        if not self.canFetchMore(parent):
+            return
+        if self._termo:
+            # Busca paginada por deslocamento: a ordem é por relevância, não por ID
+            funcao, args = buscar_xmls, (self._tabela, self._termo, self._tamanho_pagina, len(self._ids))
+        else:
+            funcao, args = listar_previews_pagina, (self._tabela, self._apos_id, self._tamanho_pagina)
+        geracao = self._geracao
+        self._tarefa = self._tarefas.executar_com_conexao(
+            self._pool, funcao, *args,
+            ao_concluir=self._da_geracao(geracao, self._incluir_pagina),
+            ao_falhar=self._da_geracao(geracao, self._falha),
+            ao_finalizar=self._da_geracao(geracao, self._finalizada),
+        )
+
+    def _da_geracao(self, geracao, callback):
+        """Envolve o callback para ignorar respostas de uma carga já substituída"""
+        def chamar(*args):
+            if self._geracao == geracao:
+                callback(*args)
+        return chamar
+
+    def cancelar(self):
+        """Descarta a página pendente (ex.: janela fechada)"""
+        if self._tarefa:
+            self._tarefa.cancelar()
+
+    def buscar(self, termo):
+        """Troca o conteúdo pelos resultados da busca por `termo` (vazio: listagem por ID)"""
+        self.cancelar()
+        self._geracao += 1
+        self.beginResetModel()
+        self._ids = array("q")
+        self._previews = []
+        self._apos_id = None
+        self._fim = False
+        self._tarefa = None
+        self._termo = (termo or "").strip()
+        self.endResetModel()
+        self.fetchMore()
+
+    def _incluir_pagina(self, linhas):
+        if self._termo:
+            linhas = [(id_val, preview) for id_val, _, preview in linhas]
+        if linhas:
+            inicio = len(self._ids)
+            self.beginInsertRows(QModelIndex(), inicio, inicio + len(linhas) - 1)
+            self._ids.extend(id_val for id_val, _ in linhas)
+            self._previews.extend(preview for _, preview in linhas)
+            self.endInsertRows()
+            self._apos_id = linhas[-1][0]
+        self._fim = len(linhas) < self._tamanho_pagina
+
+    def _falha(self, erro):
+        # Para a carga automática: a view pediria a mesma página de novo em seguida
+        self._fim = True
+        self.falhou.emit(erro)
+
+    def _finalizada(self):
+        self._tarefa = None
+        self.pagina_carregada.emit()
+
+
+class DelegateBotao(QStyledItemDelegate):
+    """Desenha um botão na célula e emite `clicado(linha)` ao clicar nele"""
+    clicado = pyqtSignal(int)
+
+    def __init__(self, texto, parent=None):
+        super().__init__(parent)
+        self.texto = texto
+
+    def paint(self, painter, option, index):
+        botao = QStyleOptionButton()
+        botao.rect = option.rect.adjusted(4, 2, -4, -2)
+        botao.text = self.texto
+        botao.state = QStyle.State_Enabled | QStyle.State_Raised
+        estilo = option.widget.style() if option.widget else QApplication.style()
+        estilo.drawControl(QStyle.CE_PushButton, botao, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton
+                and option.rect.contains(event.pos())):
+            self.clicado.emit(index.row())
+            return True
+        return False
+
+
+def abrir_consulta_xmls(tela, titulo, tabela, ao_ver_xml, tamanho_pagina=TAMANHO_PAGINA):
+    """
+    Abre a janela de consulta dos XMLs de `tabela`. `ao_ver_xml(id)` é chamado
+    pelo botão "Ver XML", por duplo clique ou Enter na linha.
+    """
+    dialog = QDialog(tela)
+    dialog.setWindowTitle(titulo)
+    layout = QVBoxLayout()
+
+    modelo = ModeloPreviews(tela.parent.tarefas, tela.parent.pool, tabela, tamanho_pagina, dialog)
+
+    view = QTableView()
+    view.setModel(modelo)
+    view.setSelectionBehavior(QAbstractItemView.SelectRows)
+    view.setSelectionMode(QAbstractItemView.SingleSelection)
+    view.setWordWrap(False)
+    # Altura fixa: a view não precisa medir cada linha para rolar
+    view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    view.verticalHeader().setDefaultSectionSize(28)
+    view.verticalHeader().hide()
+    view.setColumnWidth(COLUNA_ID, 80)
+    view.setColumnWidth(COLUNA_PREVIEW, 480)
+    view.setColumnWidth(COLUNA_ACOES, 150)
+
+    delegate = DelegateBotao("Ver XML", view)
+    view.setItemDelegateForColumn(COLUNA_ACOES, delegate)
+    delegate.clicado.connect(lambda linha: ao_ver_xml(modelo.id_da_linha(linha)))
+    view.activated.connect(lambda index: ao_ver_xml(modelo.id_da_linha(index.row())))
+
+    campo_busca = QLineEdit()
+    campo_busca.setPlaceholderText("Buscar no conteúdo dos XMLs (Enter)")
+    campo_busca.setClearButtonEnabled(True)
+    campo_busca.returnPressed.connect(lambda: modelo.buscar(campo_busca.text()))
+
+    def ao_editar_busca(texto):
+        # Limpar o campo volta para a listagem completa
+        if not texto and modelo.termo:
+            modelo.buscar("")
+
+    campo_busca.textChanged.connect(ao_editar_busca)
+
+    status = QLabel("Carregando...")
+
+    def atualizar_status():
+        total = modelo.rowCount()
+        descricao = "resultado(s)" if modelo.termo else "XML(s)"
+        status.setText(f"{total} {descricao}" + ("" if modelo.fim else " carregados - role para ver mais"))
+
+    modelo.pagina_carregada.connect(atualizar_status)
+    modelo.falhou.connect(lambda e: QMessageBox.critical(dialog, "Erro", f"Erro ao consultar XMLs:\n{e}"))
+    dialog.finished.connect(modelo.cancelar)
+    modelo.fetchMore()
+
+    btn_exportar = QPushButton("Exportar XMLs...")
+    btn_exportar.clicked.connect(lambda: abrir_exportacao_xmls(dialog, tela, tabela))
+
+    rodape = QHBoxLayout()
+    rodape.addWidget(status)
+    rodape.addStretch()
+    rodape.addWidget(btn_exportar)
+
+    layout.addWidget(campo_busca)
+    layout.addWidget(view)
+    layout.addLayout(rodape)
+    dialog.setLayout(layout)
+    dialog.resize(800, 500)
+    dialog.exec_()
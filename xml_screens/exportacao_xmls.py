@@ -0,0 +1,106 @@
+"""
+xml_screens/exportacao_xmls.py
+Diálogo de exportação em massa dos XMLs de uma tabela (utils/exportacao.py),
+aberto pela janela de consulta. A exportação roda em segundo plano, com
+progresso e botão de cancelar.
+"""
+
+from PyQt5.QtCore import QRegExp
+from PyQt5.QtGui import QRegExpValidator
+from PyQt5.QtWidgets import (
+    QComboBox, QDialog, QFileDialog, QFormLayout, QHBoxLayout, QLineEdit,
+    QMessageBox, QPushButton, QVBoxLayout
+)
+
+from utils.exportacao import PREFIXOS, exportar_xmls
+
+# Rótulo -> (formato, extensão, filtro do QFileDialog)
+FORMATOS_TELA = {
+    "Diretório (um arquivo por XML)": ("diretorio", "", None),
+    "Arquivo .zip": ("zip", ".zip", "Arquivos zip (*.zip)"),
+    "Arquivo .tar.gz": ("tar.gz", ".tar.gz", "Arquivos tar.gz (*.tar.gz *.tgz)"),
+    "Arquivo .tar.zst": ("tar.zst", ".tar.zst", "Arquivos tar.zst (*.tar.zst *.tzst)"),
+}
+
+
+def abrir_exportacao_xmls(parent, tela, tabela):
+    """Abre o diálogo de exportação dos XMLs de `tabela` (tela: tela de origem, com parent.pool)"""
+    dialog = QDialog(parent)
+    dialog.setWindowTitle(f"Exportar XMLs - {tabela}")
+
+    formato = QComboBox()
+    formato.addItems(list(FORMATOS_TELA))
+    destino = QLineEdit()
+    btn_escolher = QPushButton("Escolher...")
+    id_de = QLineEdit()
+    id_ate = QLineEdit()
+    for campo in (id_de, id_ate):
+        campo.setValidator(QRegExpValidator(QRegExp(r"\d*")))
+        campo.setPlaceholderText("sem limite")
+
+    def escolher_destino():
+        _, extensao, filtro = FORMATOS_TELA[formato.currentText()]
+        if filtro is None:
+            caminho = QFileDialog.getExistingDirectory(dialog, "Diretório de destino")
+        else:
+            sugestao = f"{PREFIXOS.get(tabela, tabela.lower())}{extensao}"
+            caminho, _ = QFileDialog.getSaveFileName(dialog, "Arquivo de destino", sugestao, filtro)
+        if caminho:
+            destino.setText(caminho)
+
+    btn_escolher.clicked.connect(escolher_destino)
+    formato.currentIndexChanged.connect(lambda _: destino.clear())
+
+    linha_destino = QHBoxLayout()
+    linha_destino.addWidget(destino)
+    linha_destino.addWidget(btn_escolher)
+
+    campos = QFormLayout()
+    campos.addRow("Formato:", formato)
+    campos.addRow("Destino:", linha_destino)
+    campos.addRow("ID inicial:", id_de)
+    campos.addRow("ID final:", id_ate)
+
+    btn_exportar = QPushButton("Exportar")
+    btn_fechar = QPushButton("Fechar")
+    btn_fechar.clicked.connect(dialog.reject)
+
+    def exportar():
+        caminho = destino.text().strip()
+        if not caminho:
+            QMessageBox.warning(dialog, "Erro", "Escolha o destino da exportação.")
+            return
+        inicio = int(id_de.text()) if id_de.text() else None
+        fim = int(id_ate.text()) if id_ate.text() else None
+        if inicio is not None and fim is not None and inicio > fim:
+            QMessageBox.warning(dialog, "Erro", "O ID inicial é maior que o ID final.")
+            return
+
+        def concluir(resumo):
+            QMessageBox.information(dialog, "Exportação concluída",
+                                    f"{resumo['exportados']} XML(s) exportados para:\n{resumo['destino']}")
+            dialog.accept()
+
+        btn_exportar.setEnabled(False)
+        tela.parent.tarefas.executar_com_progresso(
+            dialog, "Exportando XMLs...", exportar_xmls, tabela, caminho,
+            FORMATOS_TELA[formato.currentText()][0], inicio, fim,
+            pool=tela.parent.pool,
+            ao_concluir=concluir,
+            ao_falhar=lambda e: QMessageBox.critical(dialog, "Erro", f"Erro ao exportar XMLs:\n{e}"),
+            ao_finalizar=lambda: btn_exportar.setEnabled(True),
+        )
+
+    btn_exportar.clicked.connect(exportar)
+
+    botoes = QHBoxLayout()
+    botoes.addStretch()
+    botoes.addWidget(btn_exportar)
+    botoes.addWidget(btn_fechar)
+
+    layout = QVBoxLayout()
+    layout.addLayout(campos)
+    layout.addLayout(botoes)
+    dialog.setLayout(layout)
+    dialog.resize(520, 0)
+    dialog.exec_()
@@ -0,0 +1,91 @@
+"""
+xml_screens/painel_metricas.py
+Painel com as métricas das operações instrumentadas (utils/metricas.py),
+atualizado a cada segundo enquanto estiver aberto.
+"""
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import (
+    QDialog, QFileDialog, QHBoxLayout, QLabel, QMessageBox, QPushButton,
+    QTableWidget, QTableWidgetItem, QVBoxLayout
+)
+
+from utils import metricas
+
+INTERVALO_ATUALIZACAO_MS = 1000
+
+COLUNAS = (
+    ("Operação", "operacao", "{}"),
+    ("Chamadas", "chamadas", "{}"),
+    ("Média (ms)", "media_ms", "{:.1f}"),
+    ("Máximo (ms)", "maximo_ms", "{:.1f}"),
+    ("Linhas", "linhas", "{}"),
+    ("Bytes", "bytes", "{}"),
+    ("Erros", "erros", "{}"),
+    ("Lentas", "lentas", "{}"),
+)
+
+
+def abrir_painel_metricas(janela):
+    dialog = QDialog(janela)
+    dialog.setWindowTitle("Métricas")
+    layout = QVBoxLayout()
+
+    if not metricas.ativo():
+        layout.addWidget(QLabel(
+            "Métricas desligadas.\n"
+            f"Defina {metricas.VARIAVEL_ATIVACAO}=1 ou \"metricas\": {{\"ativo\": true}} "
+            "no config.json e abra o programa de novo."
+        ))
+
+    table = QTableWidget()
+    table.setColumnCount(len(COLUNAS))
+    table.setHorizontalHeaderLabels([titulo for titulo, _, _ in COLUNAS])
+    table.setEditTriggers(QTableWidget.NoEditTriggers)
+    table.verticalHeader().hide()
+    table.setColumnWidth(0, 200)
+
+    def atualizar():
+        linhas = metricas.instantaneo()
+        table.setRowCount(len(linhas))
+        for i, linha in enumerate(linhas):
+            for j, (_, campo, formato) in enumerate(COLUNAS):
+                table.setItem(i, j, QTableWidgetItem(formato.format(linha[campo])))
+
+    def zerar():
+        metricas.zerar()
+        atualizar()
+
+    def exportar():
+        caminho, _ = QFileDialog.getSaveFileName(dialog, "Exportar métricas", "metricas.prom",
+                                                 "Prometheus (*.prom);;Todos (*)")
+        if not caminho:
+            return
+        try:
+            metricas.exportar_prometheus(caminho)
+        except OSError as e:
+            QMessageBox.critical(dialog, "Erro", f"Falha ao exportar:\n{e}")
+
+    btn_zerar = QPushButton("Zerar")
+    btn_exportar = QPushButton("Exportar Prometheus...")
+    btn_fechar = QPushButton("Fechar")
+    btn_zerar.clicked.connect(zerar)
+    btn_exportar.clicked.connect(exportar)
+    btn_fechar.clicked.connect(dialog.accept)
+
+    botoes = QHBoxLayout()
+    botoes.addWidget(btn_zerar)
+    botoes.addWidget(btn_exportar)
+    botoes.addStretch()
+    botoes.addWidget(btn_fechar)
+
+    temporizador = QTimer(dialog)
+    temporizador.timeout.connect(atualizar)
+    temporizador.start(INTERVALO_ATUALIZACAO_MS)
+    atualizar()
+
+    layout.addWidget(table)
+    layout.addLayout(botoes)
+    dialog.setLayout(layout)
+    dialog.resize(850, 400)
+    dialog.exec_()
@@ -0,0 +1,200 @@
+"""
+xml_screens/selecao_agente.py
+Janela "Selecionar Agente" com busca incremental.
+
+A busca filtra pelo índice em memória do cache de agentes (nome por
+trigramas/prefixo, CPF/CNPJ exato) enquanto o usuário digita, com um pequeno
+atraso para não filtrar a cada tecla. Até o índice ficar pronto, a busca é
+feita no banco (buscar_agentes, que usa os índices de XML_AGENTES_CAMPOS);
+com mais agentes que o limite do cache, a busca é sempre no banco.
+"""
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer
+from PyQt5.QtWidgets import (
+    QAbstractItemView, QDialog, QHBoxLayout, QHeaderView, QLabel, QLineEdit,
+    QMessageBox, QPushButton, QTableView, QVBoxLayout
+)
+
+from utils.cache_agentes import CACHE_AGENTES
+from utils.db_utils import buscar_agentes
+from utils.indice_agentes import LIMITE_RESULTADOS, parece_documento
+
+# Espera após a última tecla antes de filtrar
+ATRASO_BUSCA_MS = 200
+
+
+class ModeloAgentes(QAbstractTableModel):
+    """Lista de agentes (dicionários de listar_agentes) exibida na seleção"""
+
+    CABECALHOS = ("ID", "Nome", "Tipo", "CPF/CNPJ")
+    CAMPOS = ("id", "nome", "tipo_pessoa", "documento")
+    # Textos exibidos no lugar de campos vazios (só na tela; o agente guarda o valor do XML)
+    VAZIOS = {"nome": "[Sem Nome]", "tipo_pessoa": "N/A"}
+    INVALIDOS = {"nome": "[XML Inválido]", "tipo_pessoa": "Desconhecido"}
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._agentes = []
+
+    def definir(self, agentes):
+        self.beginResetModel()
+        self._agentes = agentes
+        self.endResetModel()
+
+    def agente(self, linha):
+        return self._agentes[linha]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._agentes)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.CABECALHOS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role == Qt.DisplayRole:
+            agente = self._agentes[index.row()]
+            campo = self.CAMPOS[index.column()]
+            if not agente["valido"] and campo in self.INVALIDOS:
+                return self.INVALIDOS[campo]
+            return str(agente[campo]) or self.VAZIOS.get(campo, "")
+        return None
+
+    def headerData(self, secao, orientacao, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientacao == Qt.Horizontal:
+            return self.CABECALHOS[secao]
+        return super().headerData(secao, orientacao, role)
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+
+def abrir_selecao_agente(tela, ao_selecionar):
+    """Abre a seleção de agentes; `ao_selecionar(agente)` recebe o agente escolhido"""
+    tarefas, pool = tela.parent.tarefas, tela.parent.pool
+
+    dialog = QDialog(tela)
+    dialog.setWindowTitle("Selecionar Agente")
+    layout = QVBoxLayout()
+
+    campo_busca = QLineEdit()
+    campo_busca.setPlaceholderText("Buscar por nome ou CPF/CNPJ")
+    campo_busca.setClearButtonEnabled(True)
+
+    modelo = ModeloAgentes(dialog)
+    view = QTableView()
+    view.setModel(modelo)
+    view.setSelectionBehavior(QAbstractItemView.SelectRows)
+    view.setSelectionMode(QAbstractItemView.SingleSelection)
+    view.setWordWrap(False)
+    view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    view.verticalHeader().hide()
+    view.setColumnWidth(0, 80)
+    view.setColumnWidth(1, 250)
+    view.setColumnWidth(2, 120)
+    view.setColumnWidth(3, 150)
+
+    status = QLabel()
+
+    # O índice do cache já serve enquanto o cache é atualizado em segundo plano
+    estado = {
+        "indice": CACHE_AGENTES.indice() if CACHE_AGENTES.carregado else None,
+        "consulta": 0,
+        "busca": None,
+        "carga": None,
+    }
+
+    def filtrar():
+        termo = campo_busca.text()
+        if estado["indice"] is not None:
+            agentes = estado["indice"].buscar(termo)
+            modelo.definir(agentes)
+            status.setText(f"{len(agentes)} de {len(estado['indice'])} agente(s)")
+            return
+        buscar_no_servidor(termo.strip())
+
+    def buscar_no_servidor(termo):
+        estado["consulta"] += 1
+        numero = estado["consulta"]
+        if estado["busca"]:
+            estado["busca"].cancelar()
+        if not termo:
+            modelo.definir([])
+            # Acima de LIMITE_AGENTES o cache não guarda os agentes: a busca fica sempre no banco
+            status.setText("Digite o nome ou CPF/CNPJ para buscar" if CACHE_AGENTES.excedido
+                           else "Carregando agentes...")
+            return
+        nome, documento = (None, termo) if parece_documento(termo) else (termo, None)
+        status.setText("Buscando...")
+        estado["busca"] = tarefas.executar_com_conexao(
+            pool, buscar_agentes, nome=nome, documento=documento, limite=LIMITE_RESULTADOS,
+            ao_concluir=lambda agentes: exibir_do_servidor(numero, agentes),
+            ao_falhar=lambda e: status.setText(f"Erro na busca: {e}"),
+        )
+
+    def exibir_do_servidor(numero, agentes):
+        # Descarta respostas de buscas já substituídas (ou tornadas inúteis pelo índice)
+        if numero != estado["consulta"] or estado["indice"] is not None:
+            return
+        modelo.definir(agentes)
+        status.setText(f"{len(agentes)} agente(s) encontrados no banco")
+
+    def indice_carregado(indice):
+        if indice is None:
+            # Cache excedido: a busca continua no banco
+            if not campo_busca.text().strip():
+                buscar_no_servidor("")
+            return
+        if indice is estado["indice"]:
+            return
+        estado["indice"] = indice
+        filtrar()
+
+    def falha_carga(e):
+        if estado["indice"] is None:
+            QMessageBox.critical(dialog, "Erro", f"Erro ao consultar agentes:\n{e}")
+
+    def ao_fechar():
+        for chave in ("busca", "carga"):
+            if estado[chave]:
+                estado[chave].cancelar()
+
+    temporizador = QTimer(dialog)
+    temporizador.setSingleShot(True)
+    temporizador.setInterval(ATRASO_BUSCA_MS)
+    temporizador.timeout.connect(filtrar)
+    campo_busca.textChanged.connect(temporizador.start)
+
+    def on_select():
+        index = view.currentIndex()
+        if not index.isValid():
+            QMessageBox.warning(dialog, "Atenção", "Selecione um agente da lista.")
+            return
+        ao_selecionar(modelo.agente(index.row()))
+        dialog.accept()
+
+    view.activated.connect(lambda _: on_select())
+
+    btn_selecionar = QPushButton("Selecionar")
+    btn_cancelar = QPushButton("Cancelar")
+    btn_selecionar.clicked.connect(on_select)
+    btn_cancelar.clicked.connect(dialog.reject)
+
+    botoes = QHBoxLayout()
+    botoes.addWidget(btn_selecionar)
+    botoes.addWidget(btn_cancelar)
+
+    layout.addWidget(campo_busca)
+    layout.addWidget(view)
+    layout.addWidget(status)
+    layout.addLayout(botoes)
+    dialog.setLayout(layout)
+    dialog.resize(650, 450)
+    dialog.finished.connect(ao_fechar)
+
+    # Só busca no banco os agentes gravados desde a última abertura
+    estado["carga"] = tarefas.executar_com_conexao(
+        pool, CACHE_AGENTES.atualizar_indice, ao_concluir=indice_carregado, ao_falhar=falha_carga,
+    )
+    filtrar()
+    campo_busca.setFocus()
+    dialog.exec_()
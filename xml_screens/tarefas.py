@@ -0,0 +1,212 @@
+"""
+xml_screens/tarefas.py
+Execução de operações de banco e de XML fora da thread da interface.
+
+As funções rodam no QThreadPool; o resultado, o erro e o progresso chegam
+de volta por sinais, sempre tratados na thread da interface. A função pode
+receber um parâmetro `controle` (ControleTarefa) para reportar progresso,
+entregar resultados parciais (ex.: pedaços de um XML grande) e verificar se
+o usuário cancelou.
+"""
+
+import inspect
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt5.QtWidgets import QProgressDialog
+
+
+def _aceita_controle(funcao):
+    """Indica se a função declara o parâmetro `controle`"""
+    try:
+        return "controle" in inspect.signature(funcao).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def _com_conexao(pool, funcao):
+    """Envolve funcao(conn, ...) para rodar com uma conexão emprestada do pool"""
+    # Importado aqui: carregar o driver Oracle não deve atrasar a abertura da janela
+    from utils.db_utils import emprestar_conexao
+
+    repassar_controle = _aceita_controle(funcao)
+
+    def com_conexao(*args, controle=None, **kwargs):
+        if repassar_controle:
+            kwargs["controle"] = controle
+        with emprestar_conexao(pool) as conn:
+            return funcao(conn, *args, **kwargs)
+
+    return com_conexao
+
+
+class TarefaCancelada(Exception):
+    """Lançada por ControleTarefa.verificar quando a tarefa foi cancelada"""
+
+
+class SinaisTarefa(QObject):
+    """Sinais emitidos pela tarefa (a partir da thread de trabalho)"""
+    progresso = pyqtSignal(int, int, str)   # feito, total (0 = indeterminado), mensagem
+    parcial = pyqtSignal(object)            # resultado parcial entregue pela função
+    concluida = pyqtSignal(object)          # valor retornado pela função
+    falhou = pyqtSignal(object)             # exceção lançada pela função
+    cancelada = pyqtSignal()
+    finalizada = pyqtSignal()               # sempre emitido por último
+
+
+class ControleTarefa:
+    """Canal entre a função em execução e a interface: progresso e cancelamento"""
+
+    def __init__(self, sinais):
+        self._sinais = sinais
+        self._cancelado = threading.Event()
+
+    @property
+    def cancelado(self):
+        return self._cancelado.is_set()
+
+    def cancelar(self):
+        self._cancelado.set()
+
+    def verificar(self):
+        """Interrompe a função (TarefaCancelada) se o cancelamento foi pedido"""
+        if self._cancelado.is_set():
+            raise TarefaCancelada()
+
+    def progresso(self, feito, total=0, mensagem=""):
+        """Reporta progresso e interrompe a função se o cancelamento foi pedido"""
+        self._sinais.progresso.emit(int(feito), int(total), mensagem)
+        self.verificar()
+
+    def entregar(self, dados):
+        """Envia um resultado parcial à interface e interrompe a função se o cancelamento foi pedido"""
+        self._sinais.parcial.emit(dados)
+        self.verificar()
+
+
+class Tarefa(QRunnable):
+    """Executa funcao(*args, **kwargs) em uma thread do QThreadPool"""
+
+    def __init__(self, funcao, *args, **kwargs):
+        super().__init__()
+        # O Python controla o tempo de vida do objeto (ver GerenciadorTarefas)
+        self.setAutoDelete(False)
+        self.funcao = funcao
+        self.args = args
+        self.kwargs = kwargs
+        self.sinais = SinaisTarefa()
+        self.controle = ControleTarefa(self.sinais)
+        if _aceita_controle(funcao):
+            self.kwargs["controle"] = self.controle
+
+    def cancelar(self):
+        self.controle.cancelar()
+
+    def run(self):
+        try:
+            self.controle.verificar()
+            resultado = self.funcao(*self.args, **self.kwargs)
+        except TarefaCancelada:
+            self.sinais.cancelada.emit()
+        except Exception as e:
+            if self.controle.cancelado:
+                self.sinais.cancelada.emit()
+            else:
+                self.sinais.falhou.emit(e)
+        else:
+            if self.controle.cancelado:
+                self.sinais.cancelada.emit()
+            else:
+                self.sinais.concluida.emit(resultado)
+        finally:
+            self.sinais.finalizada.emit()
+
+
+class GerenciadorTarefas(QObject):
+    """Dispara tarefas no QThreadPool e entrega os resultados na thread da interface"""
+
+    def __init__(self, parent=None, thread_pool=None):
+        super().__init__(parent)
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self._ativas = set()
+
+    def executar(self, funcao, *args, ao_concluir=None, ao_falhar=None, ao_progredir=None,
+                 ao_receber=None, ao_cancelar=None, ao_finalizar=None, **kwargs):
+        """
+        Executa funcao(*args, **kwargs) em segundo plano e retorna a Tarefa.
+        Callbacks (todos opcionais, chamados na thread da interface):
+          ao_concluir(resultado), ao_falhar(exceção), ao_progredir(feito, total, mensagem),
+          ao_receber(dados) - cada controle.entregar(dados), na ordem,
+          ao_cancelar(), ao_finalizar() - este último sempre, depois dos demais.
+        """
+        tarefa = Tarefa(funcao, *args, **kwargs)
+        sinais = tarefa.sinais
+        if ao_concluir:
+            sinais.concluida.connect(ao_concluir, Qt.QueuedConnection)
+        if ao_falhar:
+            sinais.falhou.connect(ao_falhar, Qt.QueuedConnection)
+        if ao_progredir:
+            sinais.progresso.connect(ao_progredir, Qt.QueuedConnection)
+        if ao_receber:
+            sinais.parcial.connect(ao_receber, Qt.QueuedConnection)
+        if ao_cancelar:
+            sinais.cancelada.connect(ao_cancelar, Qt.QueuedConnection)
+        if ao_finalizar:
+            sinais.finalizada.connect(ao_finalizar, Qt.QueuedConnection)
+        sinais.finalizada.connect(lambda: self._ativas.discard(tarefa), Qt.QueuedConnection)
+
+        self._ativas.add(tarefa)
+        self.thread_pool.start(tarefa)
+        return tarefa
+
+    def executar_com_conexao(self, pool, funcao, *args, **kwargs):
+        """
+        Como executar, mas chama funcao(conn, *args, **kwargs) com uma conexão
+        emprestada do pool durante a execução.
+        """
+        return self.executar(_com_conexao(pool, funcao), *args, **kwargs)
+
+    def executar_com_progresso(self, janela, titulo, funcao, *args, pool=None, ao_concluir=None,
+                               ao_falhar=None, ao_cancelar=None, ao_finalizar=None, **kwargs):
+        """
+        Executa a tarefa exibindo um QProgressDialog com botão de cancelar.
+        `funcao` deve aceitar o parâmetro `controle` para reportar o progresso.
+        Se `pool` for informado, funcao recebe uma conexão emprestada como
+        primeiro argumento (como em executar_com_conexao).
+        """
+        if pool is not None:
+            funcao = _com_conexao(pool, funcao)
+        dialogo = QProgressDialog(titulo, "Cancelar", 0, 0, janela)
+        dialogo.setWindowTitle(titulo)
+        dialogo.setWindowModality(Qt.WindowModal)
+        dialogo.setMinimumDuration(300)
+        dialogo.setAutoClose(False)
+        dialogo.setAutoReset(False)
+
+        def ao_progredir(feito, total, mensagem):
+            dialogo.setMaximum(max(total, 0))
+            dialogo.setValue(min(feito, total) if total else 0)
+            if mensagem:
+                dialogo.setLabelText(mensagem)
+
+        def finalizar():
+            dialogo.close()
+            if ao_finalizar:
+                ao_finalizar()
+
+        tarefa = self.executar(
+            funcao, *args,
+            ao_concluir=ao_concluir, ao_falhar=ao_falhar, ao_progredir=ao_progredir,
+            ao_cancelar=ao_cancelar, ao_finalizar=finalizar, **kwargs,
+        )
+        dialogo.canceled.connect(tarefa.cancelar)
+        return tarefa
+
+    def cancelar_todas(self):
+        for tarefa in list(self._ativas):
+            tarefa.cancelar()
+
+    def aguardar(self, timeout_ms=5000):
+        """Cancela as tarefas em andamento e espera o QThreadPool esvaziar"""
+        self.cancelar_todas()
+        return self.thread_pool.waitForDone(timeout_ms)
@@ -0,0 +1,117 @@
+"""
+xml_screens/visualizador_xml.py
+Janela de visualização de um XML gravado, compartilhada pelas telas de
+Agente e de Contas a Pagar.
+
+O documento é lido do banco em pedaços (db_utils.transmitir_xml) em segundo
+plano e cada pedaço é acrescentado ao fim de um QPlainTextEdit assim que
+chega: a janela abre na hora, a interface continua respondendo com
+documentos de vários megabytes e o texto nunca vira uma única string Python.
+"Salvar como .xml" grava do banco direto no arquivo, também em pedaços.
+"""
+
+from PyQt5.QtGui import QTextCursor
+from PyQt5.QtWidgets import (
+    QApplication, QDialog, QFileDialog, QHBoxLayout, QLabel, QMessageBox,
+    QPlainTextEdit, QPushButton, QVBoxLayout
+)
+
+from utils.db_utils import salvar_xml_em_arquivo, transmitir_xml
+
+
+def abrir_visualizador_xml(tela, tabela, id_val, nome_arquivo, transmitir=None):
+    """
+    Abre o XML `id_val` de `tabela` (nome_arquivo: sugestão do "Salvar como").
+    `transmitir(conn, id_val, consumidor)` substitui a leitura direta do
+    banco, por exemplo CACHE_AGENTES.transmitir_xml.
+    """
+    tarefas = tela.parent.tarefas
+    pool = tela.parent.pool
+    if transmitir is None:
+        def transmitir(conn, id_val, consumidor):
+            return transmitir_xml(conn, tabela, id_val, consumidor)
+
+    dlg = QDialog(tela)
+    dlg.setWindowTitle(f"Visualizar XML - ID {id_val}")
+    layout = QVBoxLayout()
+
+    txt = QPlainTextEdit()
+    txt.setReadOnly(True)
+    txt.setLineWrapMode(QPlainTextEdit.NoWrap)
+    # Sem histórico de desfazer: cada pedaço inserido ficaria guardado nele
+    txt.setUndoRedoEnabled(False)
+    layout.addWidget(txt)
+
+    status = QLabel("Carregando...")
+    layout.addWidget(status)
+
+    botoes = QHBoxLayout()
+    btn_copiar = QPushButton("Copiar XML")
+    btn_copiar.setEnabled(False)
+    btn_salvar_arquivo = QPushButton("Salvar como .xml")
+    btn_fechar = QPushButton("Fechar")
+
+    cursor = QTextCursor(txt.document())
+    carregados = 0
+
+    def acrescentar(pedaco):
+        nonlocal carregados
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(pedaco)
+        carregados += len(pedaco)
+        status.setText(f"Carregando... {carregados:,} caracteres")
+
+    def concluir(total):
+        if total is None:
+            QMessageBox.warning(dlg, "Aviso", f"XML ID {id_val} não encontrado.")
+            dlg.reject()
+            return
+        status.setText(f"{total:,} caracteres")
+        btn_copiar.setEnabled(True)
+
+    def falhar(e):
+        status.setText("Falha ao carregar o XML.")
+        QMessageBox.critical(dlg, "Erro", f"Erro ao buscar XML:\n{e}")
+
+    def ler(conn, id_val, controle=None):
+        return transmitir(conn, id_val, controle.entregar)
+
+    def copiar():
+        app = QApplication.instance()
+        if app:
+            app.clipboard().setText(txt.toPlainText())
+            QMessageBox.information(dlg, "Copiado", "XML copiado para a área de transferência!")
+        else:
+            QMessageBox.warning(dlg, "Erro", "Não foi possível acessar a área de transferência.")
+
+    def salvar_arquivo():
+        fname, _ = QFileDialog.getSaveFileName(dlg, "Salvar XML", nome_arquivo, "Arquivos XML (*.xml)")
+        if not fname:
+            return
+        btn_salvar_arquivo.setEnabled(False)
+        tarefas.executar_com_conexao(
+            pool, salvar_xml_em_arquivo, tabela, id_val, fname,
+            ao_concluir=lambda _: QMessageBox.information(dlg, "Salvo", f"Arquivo salvo em:\n{fname}"),
+            ao_falhar=lambda e: QMessageBox.critical(dlg, "Erro", f"Falha ao salvar arquivo:\n{e}"),
+            ao_finalizar=lambda: btn_salvar_arquivo.setEnabled(True),
+        )
+
+    btn_copiar.clicked.connect(copiar)
+    btn_salvar_arquivo.clicked.connect(salvar_arquivo)
+    btn_fechar.clicked.connect(dlg.close)
+
+    botoes.addWidget(btn_copiar)
+    botoes.addWidget(btn_salvar_arquivo)
+    botoes.addStretch()
+    botoes.addWidget(btn_fechar)
+    layout.addLayout(botoes)
+    dlg.setLayout(layout)
+    dlg.resize(700, 550)
+
+    tarefa = tarefas.executar_com_conexao(
+        pool, ler, id_val,
+        ao_receber=acrescentar, ao_concluir=concluir, ao_falhar=falhar,
+    )
+    # Fechar a janela interrompe a leitura no próximo pedaço
+    dlg.finished.connect(tarefa.cancelar)
+    dlg.exec_()
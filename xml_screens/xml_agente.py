@@ -1,15 +1,16 @@
 # xml_screens/xml_agente.py
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QLineEdit, QTextEdit, QPushButton,
-    QComboBox, QMessageBox, QTableWidget, QTableWidgetItem, QHBoxLayout,
-    QDialog, QApplication, QFileDialog
+    QComboBox, QMessageBox, QHBoxLayout
 )
-from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QRegExpValidator
 from PyQt5.QtCore import QRegExp
 from utils.xml_utils import gerar_xml_pretty
-from utils.db_utils import salvar_xml, listar_xmls
-import re
+from utils.validacao import validar_agente
+from utils.db_utils import salvar_xml
+from utils.cache_agentes import CACHE_AGENTES
+from xml_screens.consulta_xmls import abrir_consulta_xmls
+from xml_screens.visualizador_xml import abrir_visualizador_xml
 
 
 class TelaAgente(QWidget):
@@ -119,42 +120,8 @@ class TelaAgente(QWidget):
 
     # ---------------------------------------------------------------------
 
-    def validar_campos(self):
-        """Valida todos os campos antes de gerar/salvar XML"""
-        tipo = self.tipo_pessoa.currentText()
-
-        if not self.nome.text().strip():
-            return "O campo Nome é obrigatório."
-
-        if tipo == "Pessoa Física":
-            cpf = self.cpf.text().strip().replace(".", "").replace("-", "")
-            if len(cpf) != 11:
-                return "CPF inválido ou incompleto."
-        else:
-            cnpj = self.cnpj.text().strip().replace(".", "").replace("/", "").replace("-", "")
-            if len(cnpj) != 14:
-                return "CNPJ inválido ou incompleto."
-
-        if not self.telefone.text().strip().replace("(", "").replace(")", "").replace("-", "").replace(" ", ""):
-            return "Telefone é obrigatório."
-
-        if not self.email.text().strip():
-            return "E-mail é obrigatório."
-
-        if not re.match(r"^[\w\.-]+@[\w\.-]+\.\w+$", self.email.text().strip()):
-            return "E-mail inválido."
-
-        return None  # Nenhum erro
-
-    # ---------------------------------------------------------------------
-
-    def gerar_xml(self):
-        """Gera o XML do agente validando os dados"""
-        erro = self.validar_campos()
-        if erro:
-            QMessageBox.warning(self, "Erro de validação", erro)
-            return
-
+    def dados_formulario(self):
+        """Dicionário do agente montado a partir dos campos da tela"""
         tipo_pessoa = self.tipo_pessoa.currentText()
         dados = {
             "Nome": self.nome.text().strip(),
@@ -169,7 +136,22 @@ class TelaAgente(QWidget):
             dados["CPF"] = self.cpf.text().strip()
         else:
             dados["CNPJ"] = self.cnpj.text().strip()
+        return dados
+
+    def validar_campos(self):
+        """Valida todos os campos antes de gerar/salvar XML (regras em utils/validacao.py)"""
+        return validar_agente(self.dados_formulario())
+
+    # ---------------------------------------------------------------------
+
+    def gerar_xml(self):
+        """Gera o XML do agente validando os dados"""
+        erro = self.validar_campos()
+        if erro:
+            QMessageBox.warning(self, "Erro de validação", erro)
+            return
 
+        dados = self.dados_formulario()
         xml_pretty = gerar_xml_pretty("Agente", dados)
         self.xml_preview.setPlainText(xml_pretty)
         QMessageBox.information(self, "Sucesso", "XML gerado com sucesso!")
@@ -178,7 +160,7 @@ class TelaAgente(QWidget):
 
     def salvar_xml(self):
         """Salva o XML no banco Oracle"""
-        if not getattr(self.parent, "conn", None):
+        if not getattr(self.parent, "pool", None):
             QMessageBox.warning(self, "Erro", "Conecte-se ao Oracle primeiro!")
             return
 
@@ -187,105 +169,27 @@ class TelaAgente(QWidget):
             QMessageBox.warning(self, "Erro", "Nenhum XML gerado para salvar.")
             return
 
-        try:
-            salvar_xml(self.parent.conn, "XML_AGENTES", xml_conteudo)
-            QMessageBox.information(self, "Sucesso", "XML salvo no banco com sucesso!")
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro ao salvar XML:\n{e}")
+        self.btn_salvar.setEnabled(False)
+        self.parent.tarefas.executar_com_conexao(
+            self.parent.pool, salvar_xml, "XML_AGENTES", xml_conteudo,
+            ao_concluir=lambda _: QMessageBox.information(self, "Sucesso", "XML salvo no banco com sucesso!"),
+            ao_falhar=lambda e: QMessageBox.critical(self, "Erro", f"Erro ao salvar XML:\n{e}"),
+            ao_finalizar=lambda: self.btn_salvar.setEnabled(True),
+        )
 
     # ---------------------------------------------------------------------
 
     def consultar_xmls(self):
-        """Lista os XMLs gravados no Oracle"""
-        if not getattr(self.parent, "conn", None):
+        """Lista os XMLs gravados no Oracle (uma página por vez, sob demanda)"""
+        if not getattr(self.parent, "pool", None):
             QMessageBox.warning(self, "Erro", "Conecte-se ao Oracle primeiro!")
             return
 
-        try:
-            rows = listar_xmls(self.parent.conn, "XML_AGENTES")
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro ao consultar XMLs:\n{e}")
-            return
-
-        dialog = QDialog(self)
-        dialog.setWindowTitle("XMLs de Agentes Gravados")
-        layout = QVBoxLayout()
-
-        table = QTableWidget()
-        table.setColumnCount(3)
-        table.setHorizontalHeaderLabels(["ID", "Preview", "Ações"])
-        table.setRowCount(len(rows))
-        table.setColumnWidth(0, 80)
-        table.setColumnWidth(1, 300)
-        table.setColumnWidth(2, 150)
-
-        for i, (id_val, xml_val) in enumerate(rows):
-            xml_texto = xml_val if xml_val is not None else ""
-            item_id = QTableWidgetItem(str(id_val))
-            item_id.setFlags(item_id.flags() ^ Qt.ItemIsEditable)
-            table.setItem(i, 0, item_id)
-
-            preview_text = (xml_texto[:150] + "...") if len(xml_texto) > 150 else xml_texto
-            item_preview = QTableWidgetItem(preview_text)
-            item_preview.setFlags(item_preview.flags() ^ Qt.ItemIsEditable)
-            table.setItem(i, 1, item_preview)
-
-            btn = QPushButton("Ver XML")
-            btn.clicked.connect(lambda _, x=xml_texto, idv=id_val: self.ver_xml(idv, x))
-            table.setCellWidget(i, 2, btn)
-
-        layout.addWidget(table)
-        dialog.setLayout(layout)
-        dialog.resize(800, 500)
-        dialog.exec_()
+        abrir_consulta_xmls(self, "XMLs de Agentes Gravados", "XML_AGENTES", self.ver_xml)
 
     # ---------------------------------------------------------------------
 
-    def ver_xml(self, id_val, xml_texto):
-        """Abre janela com o XML completo + botões de copiar/salvar"""
-        dlg = QDialog(self)
-        dlg.setWindowTitle(f"Visualizar XML - ID {id_val}")
-        layout = QVBoxLayout()
-
-        txt = QTextEdit()
-        txt.setPlainText(xml_texto)
-        txt.setReadOnly(True)
-        layout.addWidget(txt)
-
-        botoes = QHBoxLayout()
-        btn_copiar = QPushButton("Copiar XML")
-        btn_salvar_arquivo = QPushButton("Salvar como .xml")
-        btn_fechar = QPushButton("Fechar")
-
-        def copiar():
-            app = QApplication.instance()
-            if app:
-                app.clipboard().setText(xml_texto)
-                QMessageBox.information(dlg, "Copiado", "XML copiado para a área de transferência!")
-            else:
-                QMessageBox.warning(dlg, "Erro", "Não foi possível acessar a área de transferência.")
-
-        def salvar_arquivo():
-            fname, _ = QFileDialog.getSaveFileName(dlg, "Salvar XML", f"agente_{id_val}.xml", "Arquivos XML (*.xml)")
-            if fname:
-                try:
-                    with open(fname, "w", encoding="utf-8") as f:
-                        f.write(xml_texto)
-                    QMessageBox.information(dlg, "Salvo", f"Arquivo salvo em:\n{fname}")
-                except Exception as e:
-                    QMessageBox.critical(dlg, "Erro", f"Falha ao salvar arquivo:\n{e}")
-
-        btn_copiar.clicked.connect(copiar)
-        btn_salvar_arquivo.clicked.connect(salvar_arquivo)
-        btn_fechar.clicked.connect(dlg.close)
-
-        botoes.addWidget(btn_copiar)
-        botoes.addWidget(btn_salvar_arquivo)
-        botoes.addStretch()
-        botoes.addWidget(btn_fechar)
-
-        layout.addLayout(botoes)
-        dlg.setLayout(layout)
-        dlg.resize(700, 550)
-        dlg.exec_()
+    def ver_xml(self, id_val):
+        """Exibe o XML completo pelo ID, carregado aos pedaços (via cache de agentes)"""
+        abrir_visualizador_xml(self, "XML_AGENTES", id_val, f"agente_{id_val}.xml", CACHE_AGENTES.transmitir_xml)
         
\ No newline at end of file
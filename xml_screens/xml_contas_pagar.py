@@ -1,16 +1,16 @@
 # xml_screens/xml_contas_pagar.py
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QLineEdit, QTextEdit, QPushButton,
-    QMessageBox, QDialog, QHBoxLayout, QTableWidget, QTableWidgetItem,
-    QFileDialog, QApplication
+    QMessageBox, QHBoxLayout
 )
-from PyQt5.QtCore import Qt, QRegExp
+from PyQt5.QtCore import QRegExp
 from PyQt5.QtGui import QRegExpValidator
 from utils.xml_utils import gerar_xml_pretty
-from utils.db_utils import salvar_xml, listar_xmls, listar_agentes
-import xml.etree.ElementTree as ET
-import re
-from datetime import datetime
+from utils.validacao import validar_conta_pagar
+from utils.db_utils import salvar_xml
+from xml_screens.consulta_xmls import abrir_consulta_xmls
+from xml_screens.selecao_agente import abrir_selecao_agente
+from xml_screens.visualizador_xml import abrir_visualizador_xml
 
 
 class TelaContasPagar(QWidget):
@@ -21,11 +21,6 @@ class TelaContasPagar(QWidget):
         self.parent = parent
         layout = QVBoxLayout()
 
-        if getattr(self.parent, "conn", None):
-            agentes = listar_agentes(self.parent.conn)
-            for agente in agentes:
-                self.combo_agente.addItem(f"{agente['nome']} ({agente['tipo_pessoa']})", agente["id"])
-
         # Campos principais
         self.agente_id = None  # Armazena o ID do agente selecionado
         self.agente_nome = QLineEdit()
@@ -99,108 +94,40 @@ class TelaContasPagar(QWidget):
     # ---------------------------------------------------------------------
     def selecionar_agente(self):
         """Abre lista de agentes cadastrados para vincular à conta"""
-        if not getattr(self.parent, "conn", None):
+        if not getattr(self.parent, "pool", None):
             QMessageBox.warning(self, "Erro", "Conecte-se ao Oracle primeiro!")
             return
 
-        try:
-            agentes = listar_xmls(self.parent.conn, "XML_AGENTES")
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro ao consultar agentes:\n{e}")
-            return
-
-        dialog = QDialog(self)
-        dialog.setWindowTitle("Selecionar Agente")
-        layout = QVBoxLayout()
-
-        table = QTableWidget()
-        table.setColumnCount(3)
-        table.setHorizontalHeaderLabels(["ID", "Nome", "Tipo"])
-        table.setRowCount(len(agentes))
-        table.setColumnWidth(0, 80)
-        table.setColumnWidth(1, 250)
-        table.setColumnWidth(2, 150)
-
-        for i, (id_val, xml_val) in enumerate(agentes):
-            xml_texto = xml_val if xml_val is not None else ""
-            try:
-                root = ET.fromstring(xml_texto)
-                nome = root.findtext("Nome", "")
-                tipo = root.findtext("TipoPessoa", "")
-            except ET.ParseError:
-                nome = "[XML inválido]"
-                tipo = "N/A"
-
-            table.setItem(i, 0, QTableWidgetItem(str(id_val)))
-            table.setItem(i, 1, QTableWidgetItem(nome))
-            table.setItem(i, 2, QTableWidgetItem(tipo))
-
-        def on_select():
-            row = table.currentRow()
-            if row < 0:
-                QMessageBox.warning(dialog, "Atenção", "Selecione um agente da lista.")
-                return
-            id_val = int(table.item(row, 0).text())
-            xml_texto = agentes[row][1]
-            self.preencher_dados_agente(id_val, xml_texto)
-            dialog.accept()
-
-        btn_selecionar = QPushButton("Selecionar")
-        btn_cancelar = QPushButton("Cancelar")
-        btn_selecionar.clicked.connect(on_select)
-        btn_cancelar.clicked.connect(dialog.reject)
-
-        botoes = QHBoxLayout()
-        botoes.addWidget(btn_selecionar)
-        botoes.addWidget(btn_cancelar)
-
-        layout.addWidget(table)
-        layout.addLayout(botoes)
-        dialog.setLayout(layout)
-        dialog.resize(600, 400)
-        dialog.exec_()
+        abrir_selecao_agente(self, self.preencher_dados_agente)
 
     # ---------------------------------------------------------------------
-    def preencher_dados_agente(self, id_val, xml_texto):
-        """Preenche campos com base no XML do agente selecionado"""
-        try:
-            root = ET.fromstring(xml_texto)
-            self.agente_id = id_val
-            self.agente_nome.setText(root.findtext("Nome", ""))
-            self.agente_cnpj.setText(root.findtext("CNPJ", root.findtext("CPF", "")))
-            self.agente_email.setText(root.findtext("Email", ""))
-        except ET.ParseError:
+    def preencher_dados_agente(self, agente):
+        """Preenche campos com base nos dados do agente selecionado (ver listar_agentes)"""
+        if not agente["valido"]:
             QMessageBox.critical(self, "Erro", "Falha ao ler XML do agente selecionado.")
+            return
+        self.agente_id = agente["id"]
+        self.agente_nome.setText(agente["nome"])
+        self.agente_cnpj.setText(agente["documento"])
+        self.agente_email.setText(agente["email"])
 
     # ---------------------------------------------------------------------
+    def dados_formulario(self):
+        """Dicionário da conta a pagar montado a partir dos campos da tela"""
+        return {
+            "AgenteID": str(self.agente_id) if self.agente_id else "",
+            "AgenteNome": self.agente_nome.text().strip(),
+            "CNPJ_CPF": self.agente_cnpj.text().strip(),
+            "EmailAgente": self.agente_email.text().strip(),
+            "Descricao": self.descricao.text().strip(),
+            "Valor": self.valor.text().strip().replace(",", "."),
+            "DataEmissao": self.data_emissao.text().strip(),
+            "DataVencimento": self.data_vencimento.text().strip(),
+        }
+
     def validar_campos(self):
-        """Valida campos obrigatórios"""
-        if not self.agente_id:
-            return "Selecione um agente antes de continuar."
-
-        if not self.descricao.text().strip():
-            return "O campo Descrição é obrigatório."
-
-        if not self.valor.text().strip():
-            return "O campo Valor é obrigatório."
-
-        try:
-            valor = float(self.valor.text().replace(",", "."))
-            if valor <= 0:
-                return "O valor deve ser maior que zero."
-        except ValueError:
-            return "O campo Valor deve conter apenas números."
-
-        for campo, nome in [(self.data_emissao, "Data de Emissão"), (self.data_vencimento, "Data de Vencimento")]:
-            data_txt = campo.text().strip()
-            if not data_txt or "_" in data_txt:
-                return f"{nome} é obrigatória e deve estar completa (dd/mm/aaaa)."
-            try:
-                datetime.strptime(data_txt, "%d/%m/%Y")
-            except ValueError:
-                return f"{nome} está em formato inválido. Use dd/mm/aaaa."
-
-        return None
+        """Valida campos obrigatórios (regras em utils/validacao.py)"""
+        return validar_conta_pagar(self.dados_formulario())
 
     # ---------------------------------------------------------------------
     def gerar_xml(self):
@@ -210,17 +137,7 @@ class TelaContasPagar(QWidget):
             QMessageBox.warning(self, "Erro de validação", erro)
             return
 
-        dados = {
-            "AgenteID": str(self.agente_id),
-            "AgenteNome": self.agente_nome.text().strip(),
-            "CNPJ_CPF": self.agente_cnpj.text().strip(),
-            "EmailAgente": self.agente_email.text().strip(),
-            "Descricao": self.descricao.text().strip(),
-            "Valor": self.valor.text().strip().replace(",", "."),
-            "DataEmissao": self.data_emissao.text().strip(),
-            "DataVencimento": self.data_vencimento.text().strip(),
-        }
-
+        dados = self.dados_formulario()
         xml_pretty = gerar_xml_pretty("ContaPagar", dados)
         self.xml_preview.setPlainText(xml_pretty)
         QMessageBox.information(self, "Sucesso", "XML gerado com sucesso!")
@@ -228,7 +145,7 @@ class TelaContasPagar(QWidget):
     # ---------------------------------------------------------------------
     def salvar_xml(self):
         """Salva XML no Oracle"""
-        if not getattr(self.parent, "conn", None):
+        if not getattr(self.parent, "pool", None):
             QMessageBox.warning(self, "Erro", "Conecte-se ao Oracle primeiro!")
             return
 
@@ -237,97 +154,25 @@ class TelaContasPagar(QWidget):
             QMessageBox.warning(self, "Erro", "Nenhum XML gerado para salvar.")
             return
 
-        try:
-            salvar_xml(self.parent.conn, "XML_CONTAS_PAGAR", xml_conteudo)
-            QMessageBox.information(self, "Sucesso", "XML salvo no banco com sucesso!")
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro ao salvar XML:\n{e}")
+        self.btn_salvar.setEnabled(False)
+        self.parent.tarefas.executar_com_conexao(
+            self.parent.pool, salvar_xml, "XML_CONTAS_PAGAR", xml_conteudo,
+            ao_concluir=lambda _: QMessageBox.information(self, "Sucesso", "XML salvo no banco com sucesso!"),
+            ao_falhar=lambda e: QMessageBox.critical(self, "Erro", f"Erro ao salvar XML:\n{e}"),
+            ao_finalizar=lambda: self.btn_salvar.setEnabled(True),
+        )
 
     # ---------------------------------------------------------------------
     def consultar_xmls(self):
-        """Consulta XMLs de Contas a Pagar"""
-        if not getattr(self.parent, "conn", None):
+        """Consulta XMLs de Contas a Pagar (uma página por vez, sob demanda)"""
+        if not getattr(self.parent, "pool", None):
             QMessageBox.warning(self, "Erro", "Conecte-se ao Oracle primeiro!")
             return
 
-        try:
-            rows = listar_xmls(self.parent.conn, "XML_CONTAS_PAGAR")
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro ao consultar XMLs:\n{e}")
-            return
-
-        dialog = QDialog(self)
-        dialog.setWindowTitle("XMLs de Contas a Pagar Gravados")
-        layout = QVBoxLayout()
-
-        table = QTableWidget()
-        table.setColumnCount(3)
-        table.setHorizontalHeaderLabels(["ID", "Preview", "Ações"])
-        table.setRowCount(len(rows))
-        table.setColumnWidth(0, 80)
-        table.setColumnWidth(1, 300)
-        table.setColumnWidth(2, 150)
-
-        for i, (id_val, xml_val) in enumerate(rows):
-            xml_texto = xml_val if xml_val is not None else ""
-            item_id = QTableWidgetItem(str(id_val))
-            item_id.setFlags(item_id.flags() ^ Qt.ItemIsEditable)
-            table.setItem(i, 0, item_id)
-
-            preview_text = (xml_texto[:150] + "...") if len(xml_texto) > 150 else xml_texto
-            item_preview = QTableWidgetItem(preview_text)
-            item_preview.setFlags(item_preview.flags() ^ Qt.ItemIsEditable)
-            table.setItem(i, 1, item_preview)
-
-            btn = QPushButton("Ver XML")
-            btn.clicked.connect(lambda _, x=xml_texto, idv=id_val: self.ver_xml(idv, x))
-            table.setCellWidget(i, 2, btn)
-
-        layout.addWidget(table)
-        dialog.setLayout(layout)
-        dialog.resize(800, 500)
-        dialog.exec_()
+        abrir_consulta_xmls(self, "XMLs de Contas a Pagar Gravados", "XML_CONTAS_PAGAR", self.ver_xml)
 
     # ---------------------------------------------------------------------
-    def ver_xml(self, id_val, xml_texto):
-        """Exibe XML completo com opção de copiar/salvar"""
-        dlg = QDialog(self)
-        dlg.setWindowTitle(f"Visualizar XML - ID {id_val}")
-        layout = QVBoxLayout()
-
-        txt = QTextEdit()
-        txt.setPlainText(xml_texto)
-        txt.setReadOnly(True)
-        layout.addWidget(txt)
-
-        botoes = QHBoxLayout()
-        btn_copiar = QPushButton("Copiar XML")
-        btn_salvar_arquivo = QPushButton("Salvar como .xml")
-        btn_fechar = QPushButton("Fechar")
-
-        def copiar():
-            app = QApplication.instance()
-            if app:
-                app.clipboard().setText(xml_texto)
-                QMessageBox.information(dlg, "Copiado", "XML copiado para a área de transferência!")
-
-        def salvar_arquivo():
-            fname, _ = QFileDialog.getSaveFileName(dlg, "Salvar XML", f"conta_pagar_{id_val}.xml", "Arquivos XML (*.xml)")
-            if fname:
-                with open(fname, "w", encoding="utf-8") as f:
-                    f.write(xml_texto)
-                QMessageBox.information(dlg, "Salvo", f"Arquivo salvo em:\n{fname}")
-
-        btn_copiar.clicked.connect(copiar)
-        btn_salvar_arquivo.clicked.connect(salvar_arquivo)
-        btn_fechar.clicked.connect(dlg.close)
-
-        botoes.addWidget(btn_copiar)
-        botoes.addWidget(btn_salvar_arquivo)
-        botoes.addStretch()
-        botoes.addWidget(btn_fechar)
-        layout.addLayout(botoes)
-        dlg.setLayout(layout)
-        dlg.resize(700, 550)
-        dlg.exec_()
+    def ver_xml(self, id_val):
+        """Exibe o XML completo pelo ID, carregado aos pedaços"""
+        abrir_visualizador_xml(self, "XML_CONTAS_PAGAR", id_val, f"conta_pagar_{id_val}.xml")
         
\ No newline at end of file